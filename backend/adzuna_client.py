@@ -0,0 +1,104 @@
+import json
+import os
+import httpx
+from llm_client import SingleFlight
+from resilience import CircuitBreaker, Resilience
+from response_cache import ResponseCache, make_cache_key
+
+# --- Adzuna job market client ---
+# One keep-alive connection pool for every Adzuna call, explicit timeouts,
+# retries on 429/5xx, and a TTL cache keyed by the query parameters so the
+# CareerInsights page doesn't repeat identical lookups on every view.
+# ADZUNA_API_BASE can point at a local stub server for testing.
+ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
+ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
+ADZUNA_COUNTRY = os.getenv("ADZUNA_COUNTRY", "in")  # India
+ADZUNA_API_BASE = os.getenv("ADZUNA_API_BASE", "https://api.adzuna.com/v1/api/jobs")
+ADZUNA_TIMEOUT = float(os.getenv("ADZUNA_TIMEOUT", "10"))
+ADZUNA_CONNECT_TIMEOUT = float(os.getenv("ADZUNA_CONNECT_TIMEOUT", "5"))
+ADZUNA_MAX_CONNECTIONS = int(os.getenv("ADZUNA_MAX_CONNECTIONS", "20"))
+ADZUNA_SEARCH_TTL = int(os.getenv("ADZUNA_SEARCH_TTL", str(30 * 60)))
+ADZUNA_STATIC_TTL = int(os.getenv("ADZUNA_STATIC_TTL", str(24 * 3600)))  # categories, locations
+ADZUNA_CACHE_SIZE = int(os.getenv("ADZUNA_CACHE_SIZE", "1000"))
+
+
+class AdzunaClient:
+    def __init__(self, base_url=ADZUNA_API_BASE, country=ADZUNA_COUNTRY, app_id=None, app_key=None, cache_size=ADZUNA_CACHE_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.country = country
+        self.app_id = app_id if app_id is not None else ADZUNA_APP_ID
+        self.app_key = app_key if app_key is not None else ADZUNA_APP_KEY
+        # Memory-only cache; entries are small and cheap to refetch after a restart
+        self.cache = ResponseCache(None, ttl=ADZUNA_SEARCH_TTL, memory_size=cache_size, disk_size=0)
+        self.flight = SingleFlight()
+        self.resilience = Resilience("adzuna", max_retries=2, default_deadline=ADZUNA_TIMEOUT * 2, breaker=CircuitBreaker())
+        self.requests_sent = 0
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(ADZUNA_TIMEOUT, connect=ADZUNA_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=ADZUNA_MAX_CONNECTIONS, max_keepalive_connections=ADZUNA_MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def _fetch(self, path, params=None, ttl=ADZUNA_SEARCH_TTL):
+        """GET {base}/{country}/{path}; returns the decoded body, or None on failure. Successes are cached."""
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        # Credentials are left out of the key; they are the same for every call
+        key = make_cache_key(self.country, path, json.dumps(params, sort_keys=True))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def send():
+            query = {"app_id": self.app_id, "app_key": self.app_key, "content-type": "application/json", **params}
+            self.requests_sent += 1
+            resp = await self._get_client().get(f"{self.base_url}/{self.country}/{path}", params=query)
+            resp.raise_for_status()
+            return resp.json()
+
+        async def run():
+            try:
+                data = await self.resilience.call(send, site=path.split("/")[0])
+            except Exception as e:
+                print(f"Adzuna request failed ({path}): {e}")
+                return None
+            self.cache.set(key, data, ttl=ttl)
+            return data
+
+        return await self.flight.do(key, run)
+
+    async def search_page(self, what, where, page=1, results=None):
+        """Raw search response ({"count": total postings, "results": [...]}), or None on failure."""
+        return await self._fetch(f"search/{page}", {"what": what, "where": where, "results_per_page": results})
+
+    async def search(self, what, where, results=None):
+        data = await self.search_page(what, where, 1, results)
+        return (data or {}).get("results", [])
+
+    async def categories(self):
+        data = await self._fetch("categories", ttl=ADZUNA_STATIC_TTL)
+        return (data or {}).get("results", [])
+
+    async def locations(self, tag="1"):
+        """One level of the location tree; pass a location tag to list its children."""
+        data = await self._fetch(f"locations/{tag}", ttl=ADZUNA_STATIC_TTL)
+        return (data or {}).get("results", [])
+
+    def stats(self):
+        return {
+            "requests_sent": self.requests_sent,
+            "cache": self.cache.stats(),
+            "single_flight": self.flight.stats(),
+            "resilience": self.resilience.stats(),
+        }
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+adzuna = AdzunaClient()
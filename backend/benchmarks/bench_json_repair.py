@@ -0,0 +1,198 @@
+"""Compare the streaming JSON repair parser with the regex chain it replaced.
+
+Usage (from backend/):
+    python benchmarks/bench_json_repair.py [--repeat N]
+
+The corpus in malformed_replies.jsonl is hand-built: Groq-style replies
+written to cover the usual ways models break JSON (prose and code fences
+around the payload, single quotes, trailing/missing commas, unquoted keys,
+comments and truncation at max_tokens). A reply counts as recovered when the parsed value
+equals the expected value (or, for cases without one, when a non-empty value
+of the right type comes back).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_repair import repair_json  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "malformed_replies.jsonl")
+
+
+# --- Legacy chain (as it was in main.py before the streaming parser) ---
+def clean_json_string(json_str):
+    # Remove markdown code block markers
+    json_str = re.sub(r"^```json|```$", "", json_str, flags=re.MULTILINE).strip()
+    # Replace single quotes with double quotes
+    json_str = json_str.replace("'", '"')
+    # Remove trailing commas before } or ]
+    json_str = re.sub(r",\s*([}\]])", r"\1", json_str)
+    # Insert missing commas between objects in arrays
+    json_str = re.sub(r"}(\s*){", r"},\1{", json_str)
+    # Remove newlines between objects in arrays
+    json_str = re.sub(r"]\s*\[", "], [", json_str)
+    # Remove any double commas
+    json_str = re.sub(r",\s*,", ",", json_str)
+    # Remove any comma before closing array
+    json_str = re.sub(r",\s*]", "]", json_str)
+    return json_str
+
+def truncate_to_last_complete_json(json_str):
+    # Find the last closing curly or square bracket
+    last_curly = json_str.rfind('}')
+    last_square = json_str.rfind(']')
+    last = max(last_curly, last_square)
+    if last != -1:
+        return json_str[:last+1], (last != len(json_str)-1)
+    return json_str, False
+
+def remove_incomplete_objects(json_str):
+    # Always remove the last object in each array, regardless of completeness
+    def fix_array(match):
+        arr = match.group(0)
+        # Find all objects in the array
+        objects = list(re.finditer(r'\{[^\}]*\}', arr))
+        if len(objects) > 1:
+            # Remove the last object
+            last_obj = objects[-1]
+            arr = arr[:last_obj.start()] + ']'  # Remove from last object to end, close array
+            # Remove any trailing comma
+            arr = re.sub(r',\s*]', ']', arr)
+        return arr
+    # Apply to all arrays in the JSON string
+    json_str = re.sub(r'\[[^\]]*\]', fix_array, json_str, flags=re.MULTILINE)
+    return json_str
+
+def extract_valid_objects(json_str):
+    # For each array, extract all valid {...} objects and reconstruct the array
+    def fix_array(match):
+        arr = match.group(0)
+        objs = re.findall(r'\{[^\{\}]*\}', arr)
+        return '[' + ','.join(objs) + ']'
+    # Replace each array with only its valid objects
+    json_str = re.sub(r'\[[^\]]*\]', fix_array, json_str)
+    return json_str
+
+def fallback_parse_arrays(json_str):
+    arrays = {}
+    for key in ['videos', 'video_tutorials', 'articles', 'courses', 'online_courses', 'books', 'tools']:
+        match = re.search(rf'"{key}"\s*:\s*(\[[^\]]*\])', json_str)
+        if match:
+            arr_str = match.group(1)
+            try:
+                arr = json.loads(arr_str)
+                arrays[key] = arr
+            except Exception:
+                arrays[key] = []
+        else:
+            arrays[key] = []
+    arrays['error'] = "Partial results: failed to parse full response, but some arrays were recovered."
+    return arrays
+
+
+def legacy_parse_json_from_response(text):
+    try:
+        # Try to extract JSON from markdown/code block if present
+        if '```json' in text:
+            text = text.split('```json')[1].split('```')[0].strip()
+        elif '```' in text:
+            text = text.split('```')[1].split('```')[0].strip()
+        return json.loads(text)
+    except Exception as e:
+        # Try to clean/truncate and re-parse
+        try:
+            cleaned = clean_json_string(text)
+            return json.loads(cleaned)
+        except Exception:
+            try:
+                truncated = truncate_to_last_complete_json(text)
+                return json.loads(truncated)
+            except Exception:
+                raise
+
+
+def legacy_parse(text):
+    try:
+        return legacy_parse_json_from_response(text)
+    except Exception:
+        # The /api/get-resources chain
+        json_str = clean_json_string(text)
+        json_str, _ = truncate_to_last_complete_json(json_str)
+        json_str = extract_valid_objects(json_str)
+        return json.loads(json_str)
+
+
+# --- Benchmark ---
+def recovered(value, expect):
+    if expect is None:
+        return isinstance(value, (dict, list)) and len(value) > 0
+    return value == expect
+
+
+def run(name, parse, cases, repeat):
+    ok = 0
+    failures = []
+    for case in cases:
+        try:
+            value = parse(case["reply"])
+        except Exception:
+            value = None
+        if recovered(value, case["expect"]):
+            ok += 1
+        else:
+            failures.append(case["name"])
+    total_bytes = sum(len(c["reply"]) for c in cases) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            try:
+                parse(case["reply"])
+            except Exception:
+                pass
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} recovered {ok}/{len(cases)}  "
+          f"{total_bytes / elapsed / 1e6:6.2f} MB/s  {elapsed * 1000 / (repeat * len(cases)):.3f} ms/reply")
+    for failure in failures:
+        print(f"           not recovered: {failure}")
+
+
+def best_time(parse, text, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        try:
+            parse(text)
+        except Exception:
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def scaling():
+    # Unterminated nested arrays: the shape where the regex chain goes superlinear
+    print("\nunterminated nested arrays (ms)")
+    print(f"{'size':>8} {'legacy':>10} {'streaming':>10}")
+    for n in (1000, 2000, 4000, 8000):
+        text = '{"videos": ' + '["a", ' * n
+        print(f"{len(text):>8} {best_time(legacy_parse, text) * 1000:>10.2f} {best_time(repair_json, text) * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    with open(CORPUS) as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    run("legacy", legacy_parse, cases, args.repeat)
+    run("streaming", repair_json, cases, args.repeat)
+    scaling()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Compare bounded-read link checks with the full-download checks they replaced.
+
+Usage (from backend/):
+    python benchmarks/bench_link_check.py [--repeat N]
+
+Synthetic pages are served by `python -m http.server` in a subprocess (so its
+CPU is not counted; it ignores Range, so the bounded reader has to cut the
+stream itself). For each page we report bytes downloaded and client CPU per
+check, then a pure in-memory comparison of the phrase matching step.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from link_checker import ERROR_MATCHER, ERROR_PHRASES, LinkChecker  # noqa: E402
+
+WORDS = ("learn build course module lesson video chapter python data model "
+         "practice project guide intro advanced skill topic example").split()
+
+
+def make_page(size, phrase=None):
+    random.seed(size)
+    body = []
+    length = 0
+    while length < size:
+        line = " ".join(random.choice(WORDS) for _ in range(12))
+        body.append(f"<p>{line}</p>")
+        length += len(line) + 8
+    if phrase:
+        body.insert(3, f"<h1>{phrase.title()}</h1>")
+    return "<html><head><title>Page</title></head><body>" + "\n".join(body) + "</body></html>"
+
+
+PAGES = {
+    "article_40k.html": make_page(40 * 1024),
+    "course_300k.html": make_page(300 * 1024),
+    "video_1m.html": make_page(1024 * 1024),
+    "removed_200k.html": make_page(200 * 1024, phrase="this course is no longer available"),
+}
+
+
+# --- Legacy check (as it was before bounded reads) ---
+async def legacy_check(client, url):
+    resp = await client.get(url)
+    if resp.status_code != 200:
+        return False, resp.num_bytes_downloaded
+    html = resp.text.lower()
+    if len(html.strip()) < 100:
+        return False, resp.num_bytes_downloaded
+    for phrase in ERROR_PHRASES:
+        if phrase in html:
+            return False, resp.num_bytes_downloaded
+    return True, resp.num_bytes_downloaded
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run(base, repeat):
+    print(f"{'page':<20}{'verdict':>9}{'legacy KB':>11}{'legacy ms':>11}{'bounded KB':>12}{'bounded ms':>12}")
+    async with httpx.AsyncClient(timeout=10) as client:
+        checker = LinkChecker()
+        for name in PAGES:
+            url = f"{base}/{name}"
+            start = time.process_time()
+            for _ in range(repeat):
+                legacy_ok, legacy_bytes = await legacy_check(client, url)
+            legacy_cpu = (time.process_time() - start) / repeat
+            checker.bytes_read = 0
+            start = time.process_time()
+            for _ in range(repeat):
+                ok, _, _ = await checker._check(url)
+            bounded_cpu = (time.process_time() - start) / repeat
+            bounded_bytes = checker.bytes_read / repeat
+            verdict = "same" if ok == legacy_ok else "DIFF"
+            print(f"{name:<20}{verdict:>9}{legacy_bytes / 1024:>11.1f}{legacy_cpu * 1000:>11.2f}"
+                  f"{bounded_bytes / 1024:>12.1f}{bounded_cpu * 1000:>12.2f}")
+        await checker.aclose()
+
+
+def bench_matching(repeat):
+    print("\nIn-memory phrase matching per page (CPU ms):")
+    print(f"{'page':<20}{'lower + 30 scans (full)':>25}{'bounded (first 64 KB)':>25}")
+    for name, page in PAGES.items():
+        start = time.process_time()
+        for _ in range(repeat):
+            html = page.lower()
+            any(phrase in html for phrase in ERROR_PHRASES)
+        legacy = (time.process_time() - start) / repeat
+        start = time.process_time()
+        for _ in range(repeat):
+            ERROR_MATCHER.scan(page[:64 * 1024].lower())
+        bounded = (time.process_time() - start) / repeat
+        print(f"{name:<20}{legacy * 1000:>25.2f}{bounded * 1000:>25.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as root:
+        for name, page in PAGES.items():
+            with open(os.path.join(root, name), "w") as f:
+                f.write(page)
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1", "--directory", root],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(50):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            asyncio.run(run(f"http://127.0.0.1:{port}", args.repeat))
+        finally:
+            server.terminate()
+            server.wait()
+    bench_matching(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
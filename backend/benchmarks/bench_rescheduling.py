@@ -0,0 +1,145 @@
+"""Shift and recalculate on large planners: the old per-object loops vs scheduling.py.
+
+Usage (from backend/):
+    python benchmarks/bench_rescheduling.py [--tasks N] [--paths P] [--per-day C] [--repeat R]
+
+A throwaway SQLite database gets one user with P skill paths of N tasks each
+(7 per week, one per day, every third task complete, the first quarter of each
+path overdue). Each case runs on a fresh copy of it:
+  - shift: move the pending tasks of a path's first week (POST /planner/shift_pending)
+  - shift (big week): the same for a path whose first week holds N/2 tasks
+  - recalculate: reschedule every overdue task of the user (POST /roadmap/recalculate)
+The "old" column reproduces the previous code (load every task as an ORM object,
+find the maximum in Python, assign dates one object at a time); "new" calls the
+endpoint functions. Reported figures are the best of R runs in milliseconds.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+SEED_PATH = os.path.join(_tmpdir.name, "seed.db")
+RUN_PATH = os.path.join(_tmpdir.name, "run.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{RUN_PATH}"
+os.environ.setdefault("JOB_WORKER_ENABLED", "0")
+os.environ.setdefault("LINK_SWEEPER_ENABLED", "0")
+os.environ.setdefault("MARKET_SCHEDULER_ENABLED", "0")
+
+from sqlalchemy import text  # noqa: E402
+import main  # noqa: E402
+from main import PlannerDB, SkillPathDB  # noqa: E402
+
+
+def seed(tasks, paths):
+    today = date.today()
+    first_day = today - timedelta(days=tasks // 4)
+    with main.engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, email) VALUES (1, 'bench@example.com')"))
+        conn.execute(text("INSERT INTO skill_paths (id, user_id, title) VALUES (:id, 1, :t)"),
+                     [{"id": p, "t": f"Path {p}"} for p in range(1, paths + 2)])
+        rows = []
+        for p in range(1, paths + 1):
+            for t in range(tasks):
+                rows.append({"p": p, "w": t // 7 + 1, "d": f"Task {t}", "s": "complete" if t % 3 == 0 else "pending",
+                             "due": (first_day + timedelta(days=t)).isoformat()})
+        # The extra path's first week is half of the path
+        big = paths + 1
+        for t in range(tasks):
+            rows.append({"p": big, "w": 1 if t < tasks // 2 else t // 7 + 1, "d": f"Task {t}",
+                         "s": "complete" if t % 3 == 0 else "pending", "due": (today + timedelta(days=t)).isoformat()})
+        conn.execute(text(
+            "INSERT INTO planner (skill_path_id, week, description, status, due_date) VALUES (:p, :w, :d, :s, :due)"
+        ), rows)
+    main.engine.dispose()
+    shutil.copy(RUN_PATH, SEED_PATH)
+    return big
+
+
+def old_shift(db, skill_path_id, week):
+    week_tasks = db.query(PlannerDB).filter_by(skill_path_id=skill_path_id, week=week).all()
+    pending_tasks = [t for t in week_tasks if t.status != "complete"]
+    all_tasks = db.query(PlannerDB).filter_by(skill_path_id=skill_path_id).all()
+    latest_due = None
+    for t in all_tasks:
+        if t.due_date and (latest_due is None or t.due_date > latest_due):
+            latest_due = t.due_date
+    for t in pending_tasks:
+        latest_due = latest_due + timedelta(days=1)
+        t.due_date = latest_due
+        db.add(t)
+    db.commit()
+
+
+def old_recalculate(db, user_id):
+    missed_tasks = db.query(PlannerDB).join(SkillPathDB).filter(
+        SkillPathDB.user_id == user_id,
+        PlannerDB.status != "complete",
+        PlannerDB.due_date < date.today()
+    ).all()
+    latest_due = db.query(PlannerDB.due_date).join(SkillPathDB).filter(
+        SkillPathDB.user_id == user_id
+    ).order_by(PlannerDB.due_date.desc()).first()
+    start_date = latest_due[0] + timedelta(days=1)
+    for i, task in enumerate(missed_tasks):
+        new_due = start_date + timedelta(days=i)
+        task.due_date = new_due
+        task.week = new_due.isocalendar()[1]
+        db.add(task)
+    db.commit()
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        main.engine.dispose()
+        shutil.copy(SEED_PATH, RUN_PATH)
+        db = main.SessionLocal()
+        try:
+            started = time.perf_counter()
+            fn(db)
+            best = min(best, time.perf_counter() - started)
+        finally:
+            db.close()
+    return best * 1000
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=12000, help="tasks per skill path")
+    parser.add_argument("--paths", type=int, default=3)
+    parser.add_argument("--per-day", type=int, default=1, help="daily capacity for the new code")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    big = seed(args.tasks, args.paths)
+    user = SimpleNamespace(id=1)
+    cases = {
+        "shift": (
+            lambda db: old_shift(db, 1, 1),
+            lambda db: main.shift_week_pending(db, main.ShiftPendingTasksRequest(skill_path_id=1, week=1, per_day=args.per_day), user),
+        ),
+        "shift (big week)": (
+            lambda db: old_shift(db, big, 1),
+            lambda db: main.shift_week_pending(db, main.ShiftPendingTasksRequest(skill_path_id=big, week=1, per_day=args.per_day), user),
+        ),
+        "recalculate": (
+            lambda db: old_recalculate(db, 1),
+            lambda db: main.recalculate_roadmap(1, per_day=args.per_day, db=db),
+        ),
+    }
+    print(f"{args.paths + 1} paths x {args.tasks} tasks, best of {args.repeat}, capacity {args.per_day}/day (new)\n")
+    print(f"{'':<18}{'old ms':>10}{'new ms':>10}{'speedup':>10}")
+    for name, (old, new) in cases.items():
+        old_ms, new_ms = timed(old, args.repeat), timed(new, args.repeat)
+        print(f"{name:<18}{old_ms:>10.1f}{new_ms:>10.1f}{old_ms / new_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,144 @@
+"""Read and write throughput of the default SQLite setup vs SQLite production mode.
+
+Usage (from backend/):
+    python benchmarks/bench_sqlite_mode.py [--seconds S] [--readers R] [--writers W]
+
+Each mode gets a fresh database file with planner-shaped data. Reader threads
+repeat the GET /planner query (a path's tasks plus its progress row); writer
+threads repeat what PATCH /planner/{id} does (update one task, bump the path's
+counters, commit). Both modes use the engines from sqlite_mode.create_engines,
+so "default" is the single shared engine the app used before. The default mix
+is read-heavy like the app's traffic; under it the rollback journal lets the
+readers' shared locks starve the writers.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_mode import create_engines  # noqa: E402
+
+PATHS = 200
+TASKS_PER_PATH = 84  # 12 weeks x 7 days
+STATUSES = ("pending", "complete", "deferred")
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE planner (id INTEGER PRIMARY KEY, skill_path_id INTEGER, week INTEGER NOT NULL, "
+            "description TEXT NOT NULL, status VARCHAR(32), due_date DATE, rescheduled_to DATE)"
+        ))
+        conn.execute(text("CREATE INDEX ix_planner_path_status ON planner (skill_path_id, status)"))
+        conn.execute(text(
+            "CREATE TABLE path_progress (skill_path_id INTEGER PRIMARY KEY, total INTEGER NOT NULL, "
+            "complete INTEGER NOT NULL, pending INTEGER NOT NULL, deferred INTEGER NOT NULL, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO planner (skill_path_id, week, description, status, due_date) "
+            "VALUES (:p, :w, :d, 'pending', '2026-01-01')"
+        ), [
+            {"p": p, "w": t // 7 + 1, "d": f"Task {t} of path {p}: " + "practice " * 12}
+            for p in range(1, PATHS + 1) for t in range(TASKS_PER_PATH)
+        ])
+        conn.execute(text(
+            "INSERT INTO path_progress VALUES (:p, :n, 0, :n, 0, CURRENT_TIMESTAMP)"
+        ), [{"p": p, "n": TASKS_PER_PATH} for p in range(1, PATHS + 1)])
+
+
+def read_once(engine, rng):
+    path_id = rng.randint(1, PATHS)
+    with Session(engine) as db:
+        db.execute(text("SELECT * FROM planner WHERE skill_path_id = :p"), {"p": path_id}).all()
+        db.execute(text("SELECT * FROM path_progress WHERE skill_path_id = :p"), {"p": path_id}).first()
+
+
+def write_once(engine, rng):
+    task_id = rng.randint(1, PATHS * TASKS_PER_PATH)
+    with Session(engine) as db:
+        path_id, old = db.execute(text("SELECT skill_path_id, status FROM planner WHERE id = :id"), {"id": task_id}).first()
+        new = rng.choice([s for s in STATUSES if s != old])
+        db.execute(text("UPDATE planner SET status = :s WHERE id = :id"), {"s": new, "id": task_id})
+        db.execute(text(
+            f"UPDATE path_progress SET {old} = {old} - 1, {new} = {new} + 1, updated_at = CURRENT_TIMESTAMP "
+            "WHERE skill_path_id = :p"
+        ), {"p": path_id})
+        db.commit()
+
+
+def run(production, seconds, readers, writers):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        writer_engine, reader_engine = create_engines(url, production=production)
+        seed(writer_engine)
+        counts = {"reads": 0, "writes": 0, "locked": 0}
+        latencies = {"reads": [], "writes": []}
+        lock = threading.Lock()
+        stop = time.perf_counter() + seconds
+
+        def worker(kind, engine, op, seed_value):
+            rng = random.Random(seed_value)
+            while time.perf_counter() < stop:
+                started = time.perf_counter()
+                try:
+                    op(engine, rng)
+                except OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    with lock:
+                        counts["locked"] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                with lock:
+                    counts[kind] += 1
+                    latencies[kind].append(elapsed)
+
+        threads = [threading.Thread(target=worker, args=("reads", reader_engine, read_once, i)) for i in range(readers)]
+        threads += [threading.Thread(target=worker, args=("writes", writer_engine, write_once, 1000 + i)) for i in range(writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer_engine.dispose()
+        reader_engine.dispose()
+
+    def p99(values):
+        return sorted(values)[int(len(values) * 0.99)] * 1000 if values else float("nan")
+
+    return {
+        "reads/s": counts["reads"] / seconds,
+        "writes/s": counts["writes"] / seconds,
+        "read p99 ms": p99(latencies["reads"]),
+        "write p99 ms": p99(latencies["writes"]),
+        "locked errors": counts["locked"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.readers} reader and {args.writers} writer threads, {args.seconds:g}s per mode\n")
+    results = {
+        "default": run(False, args.seconds, args.readers, args.writers),
+        "production": run(True, args.seconds, args.readers, args.writers),
+    }
+    print(f"{'':<16}" + "".join(f"{mode:>14}" for mode in results))
+    for metric in results["default"]:
+        print(f"{metric:<16}" + "".join(f"{r[metric]:>14.1f}" for r in results.values()))
+
+
+if __name__ == "__main__":
+    main()
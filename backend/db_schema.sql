@@ -1,3 +1,7 @@
+-- The schema is managed by Alembic: migrations/ is the source of truth and the
+-- backend applies it on startup. This file lists the same tables for reference;
+-- where the two differ the migrations win. Change a migration first, then this file.
+
 -- Users table
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
@@ -14,12 +18,30 @@ CREATE TABLE IF NOT EXISTS skill_paths (
     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
     title VARCHAR(256) NOT NULL,
     description TEXT,
-    data TEXT, -- JSON string of roadmap weeks/goals
+    data TEXT, -- JSON string of the roadmap, minus its weeks (roadmap_weeks/roadmap_goals)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     status VARCHAR(32) DEFAULT 'current',
     started_on DATE DEFAULT CURRENT_DATE
 );
 
+-- Roadmap weeks and their goals (migrations/versions/0003_roadmap_weeks.py)
+CREATE TABLE IF NOT EXISTS roadmap_weeks (
+    id SERIAL PRIMARY KEY,
+    skill_path_id INTEGER NOT NULL REFERENCES skill_paths(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL, -- index in the roadmap's "weeks" list
+    week INTEGER,
+    extra TEXT -- JSON of the week's other keys
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_roadmap_weeks_path_position ON roadmap_weeks (skill_path_id, position);
+
+CREATE TABLE IF NOT EXISTS roadmap_goals (
+    id SERIAL PRIMARY KEY,
+    week_id INTEGER NOT NULL REFERENCES roadmap_weeks(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    content TEXT NOT NULL -- JSON of the goal
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_roadmap_goals_week_position ON roadmap_goals (week_id, position);
+
 -- Planner table (weekly tasks)
 CREATE TABLE IF NOT EXISTS planner (
     id SERIAL PRIMARY KEY,
@@ -66,4 +88,82 @@ CREATE TABLE IF NOT EXISTS user_progress (
     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
     current_skills TEXT[] DEFAULT '{}', -- Array of skill tags/strings
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+-- path_progress table (per-path task counters kept in step with planner)
+CREATE TABLE IF NOT EXISTS path_progress (
+    skill_path_id INTEGER PRIMARY KEY REFERENCES skill_paths(id) ON DELETE CASCADE,
+    total INTEGER NOT NULL,
+    complete INTEGER NOT NULL,
+    pending INTEGER NOT NULL,
+    deferred INTEGER NOT NULL,
+    updated_at TIMESTAMP
+);
+
+-- jobs table (background jobs with a lease; see "Background Jobs" in main.py)
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(32) PRIMARY KEY, -- uuid4 hex
+    kind VARCHAR(64) NOT NULL, -- skill_path_planner, quiz_bank, ai_recalculate, market_snapshot
+    user_id INTEGER REFERENCES users(id),
+    skill_path_id INTEGER REFERENCES skill_paths(id),
+    status VARCHAR(32), -- queued, running, complete, failed
+    payload TEXT, -- JSON string
+    progress TEXT, -- JSON string
+    attempts INTEGER,
+    max_attempts INTEGER,
+    error TEXT,
+    run_after TIMESTAMP,
+    lease_expires_at TIMESTAMP,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status);
+
+-- quiz_bank table (pre-generated questions per skill path and completed-task set)
+CREATE TABLE IF NOT EXISTS quiz_bank (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    skill_path_id INTEGER REFERENCES skill_paths(id),
+    task_set_hash VARCHAR(64) NOT NULL,
+    question_id INTEGER REFERENCES questions(id),
+    created_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_quiz_bank_user_id ON quiz_bank (user_id);
+CREATE INDEX IF NOT EXISTS ix_quiz_bank_skill_path_id ON quiz_bank (skill_path_id);
+CREATE INDEX IF NOT EXISTS ix_quiz_bank_path_hash ON quiz_bank (skill_path_id, task_set_hash);
+
+-- url_liveness table (resource link check results)
+CREATE TABLE IF NOT EXISTS url_liveness (
+    url VARCHAR PRIMARY KEY,
+    available BOOLEAN NOT NULL,
+    status_code INTEGER, -- NULL when the check itself failed
+    reason TEXT,
+    checked_at TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_url_liveness_checked_at ON url_liveness (checked_at);
+
+-- job_market_snapshots table (Adzuna stats per skill and location)
+CREATE TABLE IF NOT EXISTS job_market_snapshots (
+    id SERIAL PRIMARY KEY,
+    skill VARCHAR NOT NULL,
+    location VARCHAR NOT NULL,
+    posting_count INTEGER,
+    salary_count INTEGER,
+    salary_mean DOUBLE PRECISION,
+    salary_p25 DOUBLE PRECISION,
+    salary_p50 DOUBLE PRECISION,
+    salary_p90 DOUBLE PRECISION,
+    salary_sketch TEXT, -- JSON string of the quantile sketch
+    pages_fetched INTEGER,
+    fetched_at TIMESTAMP,
+    created_at TIMESTAMP,
+    last_requested_at TIMESTAMP -- migrations/versions/0005_market_last_requested.py
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_job_market_skill_location ON job_market_snapshots (skill, location);
+
+-- Indexes for the hot query paths (migrations/versions/0002_hot_query_indexes.py, 0004_planner_day_index.py)
+CREATE INDEX IF NOT EXISTS ix_planner_path_status ON planner (skill_path_id, status);
+CREATE INDEX IF NOT EXISTS ix_planner_path_week ON planner (skill_path_id, week);
+CREATE INDEX IF NOT EXISTS ix_planner_due_date ON planner (due_date);
+CREATE INDEX IF NOT EXISTS ix_planner_path_day ON planner (skill_path_id, coalesce(rescheduled_to, due_date), id);
+CREATE INDEX IF NOT EXISTS ix_skill_paths_user_id ON skill_paths (user_id);
+CREATE INDEX IF NOT EXISTS ix_user_quiz_attempts_user_id ON user_quiz_attempts (user_id);
@@ -0,0 +1,107 @@
+"""Check that the hot queries are answered from indexes.
+
+Usage (from backend/):
+    python explain_hot_queries.py [DATABASE_URL]
+
+Without an argument the migrations are applied to a throwaway SQLite file.
+Each query below is built the same way the endpoints build it and run through
+EXPLAIN QUERY PLAN; a plan step that scans a whole table (or sorts a keyset
+page instead of reading it in index order) is reported and the command exits
+with status 1, so it can run in CI after every migration change.
+"""
+import os
+import re
+import sys
+import tempfile
+from datetime import date
+
+_tmpdir = None
+if len(sys.argv) > 1:
+    os.environ["DATABASE_URL"] = sys.argv[1]
+else:
+    _tmpdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir.name, 'explain.db')}"
+os.environ.setdefault("JOB_WORKER_ENABLED", "0")
+
+from sqlalchemy import func, text  # noqa: E402
+from main import SessionLocal, engine, current_bank_generations, QuizBankDB, PLANNER_DAY, PlannerDB, SkillPathDB, UserQuizAttempt, RoadmapWeekDB, RoadmapGoalDB  # noqa: E402
+
+# "SCAN t" and "SCAN t USING [COVERING] INDEX i" both visit every row of t;
+# "SEARCH t USING INDEX i (col=?)" is the good case. Scans of a materialized
+# subquery (anon_N) only read rows it already found through an index.
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(?!anon_\d)(\S+)")
+# Keyset pages read LIMIT rows in index order; a sort step means every row
+# left in the range is read and sorted for each page.
+PAGED = {"calendar page for a path"}
+
+
+def hot_queries(db):
+    today = date.today()
+    bank = current_bank_generations(db, 1)
+    return {
+        "planner tasks for a path": db.query(PlannerDB).filter_by(skill_path_id=1),
+        "planner tasks for a path by status": db.query(PlannerDB.description).filter_by(skill_path_id=1, status="complete"),
+        "planner tasks for a path and week": db.query(PlannerDB).filter_by(skill_path_id=1, week=3),
+        "progress recount": db.query(PlannerDB.skill_path_id, PlannerDB.status, func.count(PlannerDB.id)).filter(
+            PlannerDB.skill_path_id.in_([1, 2, 3])
+        ).group_by(PlannerDB.skill_path_id, PlannerDB.status),
+        "skill paths for a user": db.query(SkillPathDB).filter_by(user_id=1),
+        "owned skill path": db.query(SkillPathDB).filter_by(id=1, user_id=1),
+        "owned planner task": db.query(PlannerDB).join(SkillPathDB).filter(PlannerDB.id == 1, SkillPathDB.user_id == 1),
+        "weekly tasks for a user": db.query(PlannerDB).join(SkillPathDB).filter(SkillPathDB.user_id == 1, PlannerDB.week == 3),
+        "missed tasks for a user": db.query(PlannerDB).join(SkillPathDB).filter(
+            SkillPathDB.user_id == 1, PlannerDB.status != "complete", PlannerDB.due_date < today
+        ),
+        "latest due date for a user": db.query(func.max(PlannerDB.due_date)).join(SkillPathDB).filter(
+            SkillPathDB.user_id == 1
+        ),
+        "latest due date for a path": db.query(func.max(PlannerDB.due_date)).filter(PlannerDB.skill_path_id == 1),
+        "open task load for a user": db.query(PlannerDB.due_date, func.count(PlannerDB.id)).join(SkillPathDB).filter(
+            SkillPathDB.user_id == 1, PlannerDB.status != "complete", PlannerDB.due_date >= today
+        ).group_by(PlannerDB.due_date),
+        "tasks due in a date range": db.query(PlannerDB).filter(PlannerDB.due_date >= today, PlannerDB.due_date < today),
+        "calendar page for a path": db.query(PlannerDB).filter(
+            PlannerDB.skill_path_id == 1, PLANNER_DAY >= today, PLANNER_DAY <= today
+        ).order_by(PLANNER_DAY, PlannerDB.id).limit(201),
+        "current quiz bank for a user": db.query(QuizBankDB.question_id).join(
+            bank, (QuizBankDB.skill_path_id == bank.c.skill_path_id) & (QuizBankDB.task_set_hash == bank.c.task_set_hash)
+        ),
+        "quiz attempts for a user": db.query(UserQuizAttempt).filter(UserQuizAttempt.user_id == 1),
+        "roadmap weeks for paths": db.query(RoadmapWeekDB).filter(RoadmapWeekDB.skill_path_id.in_([1, 2, 3])),
+        "roadmap week by number": db.query(RoadmapWeekDB).filter_by(skill_path_id=1, week=3),
+        "roadmap goals for weeks": db.query(RoadmapGoalDB).filter(RoadmapGoalDB.week_id.in_([1, 2, 3])),
+    }
+
+
+def explain(db, query):
+    compiled = query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()]
+
+
+def main():
+    if engine.dialect.name != "sqlite":
+        print(f"EXPLAIN QUERY PLAN checks need SQLite, not {engine.dialect.name}")
+        return 2
+    db = SessionLocal()
+    failures = 0
+    try:
+        for name, query in hot_queries(db).items():
+            plan = explain(db, query)
+            scans = [step for step in plan if FULL_SCAN.match(step)]
+            if name in PAGED:
+                scans += [step for step in plan if step.startswith("USE TEMP B-TREE FOR ORDER BY")]
+            print(f"{'FAIL' if scans else 'ok  '} {name}")
+            for step in plan:
+                print(f"       {step}")
+            failures += bool(scans)
+    finally:
+        db.close()
+    if failures:
+        print(f"{failures} hot queries fall back to a full table scan or sort")
+        return 1
+    print("All hot queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
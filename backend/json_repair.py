@@ -0,0 +1,317 @@
+import json
+import re
+
+# --- Tolerant streaming JSON parser ---
+# A single left-to-right pass over LLM output that builds Python values as it
+# goes. It accepts the usual ways models break JSON (code fences and prose
+# around the payload, single quotes, trailing or missing commas, unquoted
+# keys/literals, comments, truncated output) without any regex backtracking,
+# so the cost is linear in the input size. Text can be fed in arbitrary chunks
+# and completed values are reported as soon as their closing bracket arrives.
+
+_WHITESPACE = " \t\r\n"
+_BARE_TERMINATORS = ",:{}[]\"\n"
+_SINGLE_QUOTE_ENDERS = ",:}]"
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "'": "'"}
+# Runs of ordinary characters are copied in one slice; these find where they end
+_STRING_SPECIAL = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+_SEEK_SPECIAL = re.compile(r"[{\[]")
+_VALUE_SPECIAL = re.compile(r"[^ \t\r\n,:]")
+_SHORT_TOKEN = 32
+_DEEP = object()  # path marker for values nested deeper than emit_depth
+_LITERALS = {"true": True, "false": False, "null": None, "none": None}
+
+
+def _bare_value(token):
+    token = token.strip()
+    lowered = token.lower()
+    if lowered in _LITERALS:
+        return _LITERALS[lowered]
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+class _Frame:
+    __slots__ = ("value", "path", "key")
+
+    def __init__(self, value, path):
+        self.value = value
+        self.path = path
+        self.key = None  # pending object key; unused for arrays
+
+
+class StreamingJSONParser:
+    """Incremental repairing parser.
+
+    `feed()` returns a list of `(path, value)` pairs for every value that was
+    completed by the chunk and sits at most `emit_depth` levels below the root,
+    e.g. `(("weeks", 0), {...})`. `finish()` closes anything left open and
+    returns the root value.
+    """
+
+    def __init__(self, emit_depth=2):
+        self.emit_depth = emit_depth
+        self.root = None
+        self.done = False
+        self.truncated = False
+        self._stack = []
+        self._events = []
+        self._state = "seek"
+        self._buf = []
+        self._quote = '"'
+        self._pending = []  # whitespace seen after a possible closing single quote
+        self._unicode = []
+        self._surrogates = False
+
+    # -- value assembly --
+    def _attach(self, value, is_container):
+        """Place a value into the current container and return its path (None if dropped)."""
+        if not self._stack:
+            self.root = value
+            return ()
+        frame = self._stack[-1]
+        if isinstance(frame.value, list):
+            frame.value.append(value)
+            step = len(frame.value) - 1
+        elif frame.key is None:
+            # A scalar in key position is the key; a container there is malformed
+            if not is_container:
+                frame.key = value if isinstance(value, str) else json.dumps(value)
+            return None
+        else:
+            step = frame.key
+            frame.key = None
+            frame.value[step] = value
+        # Values nested inside a dropped container are dropped too. Paths are only
+        # built down to emit_depth so deeply nested input stays linear.
+        if frame.path is None or frame.path is _DEEP:
+            return frame.path
+        if len(frame.path) >= self.emit_depth:
+            return _DEEP
+        return frame.path + (step,)
+
+    def _complete(self, path, value):
+        if path is None or path is _DEEP:
+            return
+        if len(path) <= self.emit_depth:
+            self._events.append((path, value))
+        if not path:
+            self.done = True
+            self._state = "done"
+
+    def _open(self, container):
+        if self._state == "seek":
+            self._state = "value"
+        self._stack.append(_Frame(container, self._attach(container, True)))
+
+    def _close(self, kind):
+        # Pop up to the nearest container of the matching kind; ignore stray closers
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if isinstance(self._stack[depth].value, kind):
+                break
+        else:
+            return
+        while len(self._stack) > depth:
+            frame = self._stack.pop()
+            self._complete(frame.path, frame.value)
+
+    def _scalar(self, value):
+        if not self._stack:
+            return
+        self._complete(self._attach(value, False), value)
+
+    # -- character handling --
+    def feed(self, chunk):
+        i, n = 0, len(chunk)
+        while i < n and self._state != "done":
+            if self._state == "string":
+                match = _STRING_SPECIAL[self._quote].search(chunk, i)
+                end = match.start() if match else n
+                if end > i:
+                    self._buf.append(chunk[i:end])
+                    i = end
+                    continue
+            elif self._state == "value":
+                match = _VALUE_SPECIAL.search(chunk, i)
+                if not match:
+                    break
+                i = match.start()
+            elif self._state == "seek":
+                match = _SEEK_SPECIAL.search(chunk, i)
+                if not match:
+                    break
+                i = match.start()
+            self._step(chunk[i])
+            i += 1
+        events, self._events = self._events, []
+        return events
+
+    def _step(self, ch):
+        state = self._state
+        if state == "string":
+            if ch == self._quote:
+                if self._quote == "'":
+                    self._state = "squote_end"
+                    return
+                self._end_string()
+            elif ch == "\\":
+                self._state = "escape"
+            else:
+                self._buf.append(ch)
+        elif state == "escape":
+            if ch == "u":
+                self._unicode = []
+                self._state = "unicode"
+            else:
+                self._buf.append(_ESCAPES.get(ch, ch))
+                self._state = "string"
+        elif state == "unicode":
+            self._unicode.append(ch)
+            if len(self._unicode) == 4:
+                try:
+                    code = int("".join(self._unicode), 16)
+                    self._surrogates = self._surrogates or 0xD800 <= code <= 0xDFFF
+                    self._buf.append(chr(code))
+                except ValueError:
+                    self._buf.append("\\u" + "".join(self._unicode))
+                self._state = "string"
+        elif state == "squote_end":
+            # A single quote only closes the string if structure follows it;
+            # otherwise it was an apostrophe ("it's") and belongs to the text.
+            if ch in _WHITESPACE:
+                self._pending.append(ch)
+            elif ch in _SINGLE_QUOTE_ENDERS:
+                self._pending = []
+                self._end_string()
+                self._step(ch)
+            else:
+                self._buf.append("'")
+                self._buf.extend(self._pending)
+                self._pending = []
+                self._state = "string"
+                self._step(ch)
+        elif state == "bare":
+            if ch == ":" and self._stack and self._stack[-1].key is not None:
+                # Colon inside an unquoted value, e.g. a bare URL
+                self._buf.append(ch)
+            elif ch in _BARE_TERMINATORS:
+                self._end_bare()
+                self._step(ch)
+            elif ch in _WHITESPACE and len(self._buf) <= _SHORT_TOKEN and not isinstance(_bare_value("".join(self._buf)), str):
+                # A number or literal ends at whitespace ("[1 2 3]"); other bare text may contain spaces
+                self._end_bare()
+            elif ch == "/" and self._buf[-1] in _WHITESPACE:
+                self._end_bare()
+                self._state = "slash"
+            else:
+                self._buf.append(ch)
+        elif state == "value":
+            self._step_value(ch)
+        elif state == "slash":
+            if ch == "/":
+                self._state = "line_comment"
+            elif ch == "*":
+                self._state = "block_comment"
+            else:
+                self._state = "bare"
+                self._buf = ["/"]
+                self._step(ch)
+        elif state == "line_comment":
+            if ch == "\n":
+                self._state = "value"
+        elif state == "block_comment":
+            if ch == "*":
+                self._state = "block_comment_star"
+        elif state == "block_comment_star":
+            self._state = "value" if ch == "/" else ("block_comment_star" if ch == "*" else "block_comment")
+        elif state == "seek":
+            # Skip prose and code fences until the payload starts
+            if ch == "{":
+                self._open({})
+            elif ch == "[":
+                self._open([])
+
+    def _step_value(self, ch):
+        if ch in _WHITESPACE or ch == "," or ch == ":":
+            return
+        if ch == "{":
+            self._open({})
+        elif ch == "[":
+            self._open([])
+        elif ch == "}":
+            self._close(dict)
+        elif ch == "]":
+            self._close(list)
+        elif ch == '"' or ch == "'":
+            self._quote = ch
+            self._buf = []
+            self._state = "string"
+        elif ch == "/":
+            self._state = "slash"
+        elif ch == "`":
+            # Closing code fence right after a truncated payload
+            return
+        else:
+            self._buf = [ch]
+            self._state = "bare"
+
+    def _end_string(self):
+        value = "".join(self._buf)
+        if self._surrogates:
+            # Recombine escaped surrogate pairs (e.g. an emoji written as two \\u escapes)
+            self._surrogates = False
+            try:
+                value = value.encode("utf-16", "surrogatepass").decode("utf-16")
+            except UnicodeError:
+                pass
+        self._buf = []
+        self._state = "value"
+        self._scalar(value)
+
+    def _end_bare(self):
+        token = "".join(self._buf)
+        self._buf = []
+        self._state = "value"
+        if token.strip():
+            self._scalar(_bare_value(token))
+
+    def finish(self):
+        """Close whatever is still open and return the root value."""
+        if self._state == "squote_end":
+            self._end_string()
+        elif self._state == "bare":
+            self._end_bare()
+        elif self._state in ("string", "escape", "unicode"):
+            # A string cut off mid-way is dropped rather than guessed at
+            self._buf = []
+            self._state = "value"
+            self.truncated = True
+        if self._stack:
+            self.truncated = True
+            while self._stack:
+                frame = self._stack.pop()
+                if frame.path == ():
+                    self.done = True
+        self._events = []
+        if self.root is None:
+            raise ValueError("No JSON object or array found in response")
+        return self.root
+
+
+def repair_json(text, return_truncated=False):
+    """Parse (and repair) the first JSON object or array in `text`.
+
+    With return_truncated, returns `(value, truncated)`: truncated is True when
+    the text ended inside a string or container that had to be closed, i.e. the
+    value is incomplete.
+    """
+    parser = StreamingJSONParser(emit_depth=0)
+    parser.feed(text)
+    value = parser.finish()
+    return (value, parser.truncated) if return_truncated else value
@@ -0,0 +1,364 @@
+import asyncio
+import codecs
+import os
+import urllib.parse
+from datetime import datetime, timedelta
+import httpx
+from sqlalchemy import and_, or_
+
+# --- Resource link checking ---
+# Validates LLM-suggested resource URLs concurrently over one shared connection
+# pool. A global cap and a per-host cap keep us from hammering any single site,
+# and check_all() returns whatever has been confirmed when its deadline hits.
+# Results are remembered in a liveness store: fresh entries answer directly,
+# stale ones are still served while a background sweeper re-checks them.
+# Checks that failed without an HTTP answer (timeouts, connection errors) are
+# kept only for LINK_ERROR_TTL, so a network blip doesn't hide a good link for
+# the whole negative TTL.
+# Pages are never downloaded in full: only the first LINK_CHECK_MAX_BYTES are
+# streamed (with a Range hint) and scanned once for all error phrases.
+LINK_CHECK_TIMEOUT = float(os.getenv("LINK_CHECK_TIMEOUT", "5"))
+LINK_CHECK_CONCURRENCY = int(os.getenv("LINK_CHECK_CONCURRENCY", "20"))
+LINK_CHECK_PER_HOST = int(os.getenv("LINK_CHECK_PER_HOST", "4"))
+LINK_CHECK_DEADLINE = float(os.getenv("LINK_CHECK_DEADLINE", "8"))
+LINK_CHECK_MAX_BYTES = int(os.getenv("LINK_CHECK_MAX_BYTES", str(64 * 1024)))
+MIN_PAGE_CHARS = 100
+LINK_POSITIVE_TTL = int(os.getenv("LINK_POSITIVE_TTL", str(7 * 24 * 3600)))
+LINK_NEGATIVE_TTL = int(os.getenv("LINK_NEGATIVE_TTL", str(24 * 3600)))
+LINK_ERROR_TTL = int(os.getenv("LINK_ERROR_TTL", str(15 * 60)))  # failed checks with no HTTP status
+LINK_MAX_STALE = int(os.getenv("LINK_MAX_STALE", str(30 * 24 * 3600)))
+LINK_SWEEP_INTERVAL = float(os.getenv("LINK_SWEEP_INTERVAL", "60"))
+LINK_SWEEP_BATCH = int(os.getenv("LINK_SWEEP_BATCH", "50"))
+
+PLAYLIST_ERROR_PHRASES = [
+    "this playlist does not exist",
+    "playlist unavailable",
+    "this playlist is private",
+    "no videos found"
+]
+YT_ERROR_PHRASES = [
+    "this video isn't available anymore",
+    "video unavailable",
+    "this video is private",
+    "has been removed",
+    "is not available in your country"
+]
+# Common and platform-specific error phrases in the HTML (case-insensitive, partial match)
+ERROR_PHRASES = [
+    # Generic
+    "not found", "404", "unavailable", "error", "page not found", "does not exist", "removed", "private",
+    # Coursera
+    "course not found", "page not found", "this course is no longer available", "enrollments are closed", "we were not able to find the page you're looking for.",
+    # Udemy
+    "course not found", "sorry, this course is no longer available", "this course is unavailable", "udemy.com home page",
+    # Amazon
+    "currently unavailable", "the web address you entered is not a functioning page", "out of print", "no longer available", "looking for something? we're sorry. the web address you entered is not a functioning page on our site"
+]
+
+
+class PhraseMatcher:
+    """Finds any of a set of phrases in text that arrives in chunks.
+
+    Phrases that contain a shorter phrase are dropped (the shorter one always
+    matches first), and each chunk is searched together with the tail of the
+    previous one so phrases spanning a chunk boundary are still found.
+    `scan()` takes and returns that tail as its state.
+    """
+
+    def __init__(self, phrases):
+        unique = sorted(dict.fromkeys(p.lower() for p in phrases), key=len)
+        self.phrases = []
+        for phrase in unique:
+            if not any(shorter in phrase for shorter in self.phrases):
+                self.phrases.append(phrase)
+        self._overlap = max((len(p) for p in self.phrases), default=1) - 1
+
+    def scan(self, text, state=""):
+        """Return (first matched phrase or None, state) for lowercase `text`."""
+        window = state + text
+        for phrase in self.phrases:
+            if phrase in window:
+                return phrase, ""
+        return None, window[-self._overlap:] if self._overlap else ""
+
+    def search(self, text):
+        return self.scan(text.lower())[0]
+
+
+PLAYLIST_MATCHER = PhraseMatcher(PLAYLIST_ERROR_PHRASES)
+YT_MATCHER = PhraseMatcher(YT_ERROR_PHRASES)
+ERROR_MATCHER = PhraseMatcher(ERROR_PHRASES)
+
+
+class LivenessStore:
+    """URL liveness results kept in the app database (see UrlLivenessDB in main.py).
+
+    Lookups use read_session_factory when given (the read-only pool in SQLite
+    production mode), so only record() takes the writer.
+    """
+
+    def __init__(self, session_factory, model, positive_ttl=LINK_POSITIVE_TTL, negative_ttl=LINK_NEGATIVE_TTL,
+                 max_stale=LINK_MAX_STALE, error_ttl=LINK_ERROR_TTL, read_session_factory=None):
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory or session_factory
+        self.model = model
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.max_stale = max_stale
+
+    def _ttl(self, available, status_code):
+        if available:
+            return self.positive_ttl
+        # No status code means the check itself failed (timeout, connection error)
+        return self.negative_ttl if status_code is not None else self.error_ttl
+
+    def lookup(self, urls):
+        """Return {url: (available, fresh)} for known URLs not older than max_stale."""
+        now = datetime.utcnow()
+        db = self.read_session_factory()
+        try:
+            rows = db.query(self.model).filter(self.model.url.in_(urls)).all()
+        finally:
+            db.close()
+        known = {}
+        for row in rows:
+            age = (now - row.checked_at).total_seconds()
+            if age <= self.max_stale:
+                known[row.url] = (row.available, age <= self._ttl(row.available, row.status_code))
+        return known
+
+    def record(self, results):
+        """Store {url: (available, status_code, reason)}."""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            for url, (available, status_code, reason) in results.items():
+                db.merge(self.model(url=url, available=available, status_code=status_code, reason=reason, checked_at=now))
+            db.commit()
+        finally:
+            db.close()
+
+    def stale_urls(self, limit):
+        now = datetime.utcnow()
+        db = self.read_session_factory()
+        try:
+            rows = db.query(self.model.url).filter(or_(
+                and_(self.model.available.is_(True), self.model.checked_at < now - timedelta(seconds=self.positive_ttl)),
+                and_(self.model.available.is_(False), self.model.status_code.isnot(None),
+                     self.model.checked_at < now - timedelta(seconds=self.negative_ttl)),
+                and_(self.model.available.is_(False), self.model.status_code.is_(None),
+                     self.model.checked_at < now - timedelta(seconds=self.error_ttl))
+            )).order_by(self.model.checked_at).limit(limit).all()
+        finally:
+            db.close()
+        return [url for (url,) in rows]
+
+
+class LinkChecker:
+    def __init__(self, max_concurrency=LINK_CHECK_CONCURRENCY, per_host=LINK_CHECK_PER_HOST, timeout=LINK_CHECK_TIMEOUT, store=None, max_bytes=LINK_CHECK_MAX_BYTES):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.store = store
+        self.max_bytes = max_bytes
+        self.live_checks = 0
+        self.bytes_read = 0
+        self.store_hits = 0
+        self._client = None
+        self._global = None
+        self._hosts = {}
+        self._stale = set()
+        self._wake = None
+
+    def _get_client(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+        return self._client
+
+    def _limits(self, url):
+        """(global, per-host) semaphores for `url`; take the host one first so
+        requests queued behind a busy host don't hold global slots."""
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrency)
+        host = urllib.parse.urlparse(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._global, self._hosts[host]
+
+    async def _get(self, url):
+        global_limit, host_limit = self._limits(url)
+        async with host_limit, global_limit:
+            resp = await self._get_client().get(url)
+            self.bytes_read += resp.num_bytes_downloaded
+            return resp
+
+    async def _scan(self, url, matcher, ok_statuses=None):
+        """Stream at most max_bytes of `url` through `matcher`.
+
+        Returns (status_code, matched phrase or None, page has enough text).
+        Stops reading at the first match; the Range header lets servers that
+        honour it send less in the first place, others are simply cut off.
+        """
+        global_limit, host_limit = self._limits(url)
+        async with host_limit, global_limit:
+            headers = {"Range": f"bytes=0-{self.max_bytes - 1}"}
+            async with self._get_client().stream("GET", url, headers=headers) as resp:
+                status = 200 if resp.status_code == 206 else resp.status_code
+                if ok_statuses is not None and status not in ok_statuses:
+                    return status, None, False
+                decoder = codecs.getincrementaldecoder(resp.charset_encoding or "utf-8")(errors="replace")
+                state, seen, head, phrase = "", 0, "", None
+                try:
+                    async for chunk in resp.aiter_bytes():
+                        chunk = chunk[:self.max_bytes - seen]
+                        seen += len(chunk)
+                        text = decoder.decode(chunk, final=seen >= self.max_bytes).lower()
+                        if len(head.strip()) < MIN_PAGE_CHARS:
+                            head += text
+                        phrase, state = matcher.scan(text, state)
+                        if phrase is not None or seen >= self.max_bytes:
+                            break
+                finally:
+                    self.bytes_read += resp.num_bytes_downloaded
+                return status, phrase, len(head.strip()) >= MIN_PAGE_CHARS
+
+    async def is_resource_available(self, url):
+        """Check if a resource URL is available, consulting the liveness store first."""
+        results = await self.check_all([url], deadline=None)
+        return results.get(url, False)
+
+    async def _check(self, url):
+        """Live check (YouTube: oEmbed API + HTML, playlists: HTML, others: status 200 and not a known error page).
+
+        Returns (available, status_code, reason).
+        """
+        try:
+            # YouTube playlist check
+            if ("youtube.com/playlist?list=" in url):
+                status, phrase, has_text = await self._scan(url, PLAYLIST_MATCHER)
+                if phrase:
+                    print(f"YouTube playlist unavailable: {url}")
+                    return False, status, f"error phrase '{phrase}'"
+                if not has_text:
+                    print(f"YouTube playlist very short/empty: {url}")
+                    return False, status, "empty page"
+                return True, status, "ok"
+            # YouTube video check via oEmbed API and HTML fallback
+            if ("youtube.com/watch" in url or "youtu.be/" in url):
+                # Normalize to full YouTube URL
+                if "youtu.be/" in url:
+                    video_id = url.split("youtu.be/")[-1].split("?")[0]
+                    yt_url = f"https://www.youtube.com/watch?v={video_id}"
+                else:
+                    # Extract video_id from v= param if present
+                    parsed = urllib.parse.urlparse(url)
+                    query = urllib.parse.parse_qs(parsed.query)
+                    video_id = query.get("v", [None])[0]
+                    if video_id:
+                        yt_url = f"https://www.youtube.com/watch?v={video_id}"
+                    else:
+                        yt_url = url
+                oembed_url = f"https://www.youtube.com/oembed?url={urllib.parse.quote(yt_url)}&format=json"
+                resp = await self._get(oembed_url)
+                if resp.status_code == 200:
+                    return True, resp.status_code, "ok (oembed)"
+                # Fallback: check HTML for error phrases
+                status, phrase, has_text = await self._scan(yt_url, YT_MATCHER)
+                if phrase:
+                    print(f"YouTube unavailable: {url}")
+                    return False, status, f"error phrase '{phrase}'"
+                if not has_text:
+                    print(f"YouTube very short/empty: {url}")
+                    return False, status, "empty page"
+                return True, status, "ok"
+            # Other resources: check status and HTML content
+            status, phrase, has_text = await self._scan(url, ERROR_MATCHER, ok_statuses=(200,))
+            if status != 200:
+                print(f"Resource not 200: {url}")
+                return False, status, f"http {status}"
+            if phrase:
+                print(f"Resource error phrase '{phrase}' found: {url}")
+                return False, status, f"error phrase '{phrase}'"
+            if not has_text:
+                print(f"Resource very short/empty: {url}")
+                return False, status, "empty page"  # Very short/empty page
+            return True, status, "ok"
+        except Exception as e:
+            print(f"Resource check exception for {url}: {e}")
+            return False, None, f"exception: {e}"
+
+    async def _check_live(self, urls, deadline):
+        tasks = {asyncio.ensure_future(self._check(url)): url for url in urls}
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"Link check deadline hit: {len(pending)} of {len(urls)} URLs unconfirmed")
+        results = {tasks[task]: task.result() for task in done}
+        self.live_checks += len(results)
+        if self.store is not None and results:
+            await asyncio.to_thread(self.store.record, results)
+        return results
+
+    async def check_all(self, urls, deadline=LINK_CHECK_DEADLINE):
+        """Check URLs concurrently; returns {url: available} for checks finished within `deadline`."""
+        unique = list(dict.fromkeys(urls))
+        if not unique:
+            return {}
+        available = {}
+        if self.store is not None:
+            known = await asyncio.to_thread(self.store.lookup, unique)
+            for url, (is_up, fresh) in known.items():
+                available[url] = is_up
+                if not fresh:
+                    # Serve the stale answer now; the sweeper re-checks it shortly
+                    self._stale.add(url)
+            self.store_hits += len(known)
+            if self._stale and self._wake is not None:
+                self._wake.set()
+        to_check = [url for url in unique if url not in available]
+        if to_check:
+            for url, (is_up, _, _) in (await self._check_live(to_check, deadline)).items():
+                available[url] = is_up
+        return available
+
+    async def sweep_once(self):
+        """Re-check stale URLs: those served stale since the last sweep plus the oldest in the store."""
+        urls = set(self._stale)
+        self._stale.clear()
+        if self.store is not None:
+            urls.update(await asyncio.to_thread(self.store.stale_urls, LINK_SWEEP_BATCH))
+        if urls:
+            await self._check_live(list(urls), deadline=None)
+        return len(urls)
+
+    async def sweep_forever(self, interval=LINK_SWEEP_INTERVAL):
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await self.sweep_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Link sweeper error: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def stats(self):
+        return {"live_checks": self.live_checks, "store_hits": self.store_hits, "bytes_read": self.bytes_read, "pending_revalidation": len(self._stale)}
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+link_checker = LinkChecker()
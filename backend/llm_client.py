@@ -0,0 +1,169 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import httpx
+from resilience import CircuitBreaker, Resilience
+
+# --- Groq LLM client ---
+# One shared async client per process so every call site reuses the same
+# keep-alive connection pool instead of opening a fresh socket per request.
+GROQ_CHAT_URL = os.getenv("GROQ_CHAT_URL", "https://api.groq.com/openai/v1/chat/completions")
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") != "0"
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_DEFAULT_DEADLINE = float(os.getenv("LLM_DEFAULT_DEADLINE", "60"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _timeout(read_timeout):
+    return httpx.Timeout(read_timeout, connect=LLM_CONNECT_TIMEOUT)
+
+
+class LLMClient:
+    def __init__(self, base_url=GROQ_CHAT_URL):
+        self.base_url = base_url
+        self._client = None
+
+    def _get_client(self):
+        # Created lazily so the pool binds to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=LLM_HTTP2 and _http2_available(),
+                timeout=_timeout(LLM_READ_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return self._client
+
+    def _headers(self):
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise RuntimeError("GROQ_API_KEY is not set in the environment. Please add it to your .env file.")
+        return {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        }
+
+    async def chat(self, messages, model=DEFAULT_MODEL, max_tokens=800, temperature=0.7, timeout=None):
+        """Send a chat completion request and return the first choice's content."""
+        payload = {
+            'model': model,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature
+        }
+        client = self._get_client()
+        response = await client.post(
+            self.base_url,
+            headers=self._headers(),
+            json=payload,
+            timeout=_timeout(timeout) if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
+        response.raise_for_status()
+        data = response.json()
+        if 'choices' not in data or not data['choices']:
+            raise ValueError('No choices returned from Groq API')
+        return data['choices'][0]['message']['content']
+
+    async def stream_chat(self, messages, model=DEFAULT_MODEL, max_tokens=800, temperature=0.7, timeout=None):
+        """Request a streamed completion and yield content deltas as they arrive."""
+        payload = {
+            'model': model,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'stream': True
+        }
+        client = self._get_client()
+        async with client.stream(
+            "POST",
+            self.base_url,
+            headers=self._headers(),
+            json=payload,
+            timeout=_timeout(timeout) if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        ) as response:
+            response.raise_for_status()
+            # OpenAI-compatible server-sent events: "data: {...}" lines, ending with "data: [DONE]"
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get('choices') or []
+                if choices:
+                    delta = (choices[0].get('delta') or {}).get('content')
+                    if delta:
+                        yield delta
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+def prompt_fingerprint(messages, model, max_tokens, temperature, kind="text"):
+    raw = json.dumps([kind, model, max_tokens, temperature, messages], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Share one in-flight call among all concurrent callers with the same key."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            # Run as its own task so a disconnecting caller doesn't cancel the call for everyone
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.calls += 1
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self.coalesced += 1
+        result = await asyncio.shield(task)
+        # Each caller gets its own copy so in-place edits don't leak between requests
+        return copy.deepcopy(result)
+
+    def _finished(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every waiter went away
+
+    def stats(self):
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+llm = LLMClient()
+llm_flight = SingleFlight()
+groq_resilience = Resilience(
+    "groq",
+    max_retries=LLM_MAX_RETRIES,
+    default_deadline=LLM_DEFAULT_DEADLINE,
+    breaker=CircuitBreaker(failure_threshold=LLM_BREAKER_THRESHOLD, reset_timeout=LLM_BREAKER_RESET),
+)
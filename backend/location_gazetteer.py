@@ -0,0 +1,180 @@
+import asyncio
+import gzip
+import json
+import os
+import time
+import httpx
+
+# --- Location gazetteer ---
+# Job locations are fetched once (the Adzuna location tree, one level at a
+# time with every node of a level requested concurrently, plus GeoNames
+# cities), written to a small gzipped JSON file and loaded into an in-memory
+# prefix trie. Lookups walk at most len(query) nodes and return a result list
+# precomputed at build time.
+GAZETTEER_FORMAT_VERSION = 1
+LOCATION_GAZETTEER_PATH = os.getenv("LOCATION_GAZETTEER_PATH", "./data/job_locations.json.gz")
+LOCATION_GAZETTEER_MAX_AGE = int(os.getenv("LOCATION_GAZETTEER_MAX_AGE", str(30 * 24 * 3600)))
+LOCATION_TREE_DEPTH = int(os.getenv("LOCATION_TREE_DEPTH", "3"))
+LOCATION_FETCH_FANOUT = int(os.getenv("LOCATION_FETCH_FANOUT", "8"))
+LOCATION_SUGGEST_LIMIT = 10
+GEONAMES_USERNAME = os.getenv("GEONAMES_USERNAME", "sakshi_thorat")
+GEONAMES_URL = "http://api.geonames.org/searchJSON"
+GEONAMES_TIMEOUT = float(os.getenv("GEONAMES_TIMEOUT", "10"))
+
+
+def location_tag(name):
+    return name.lower().replace(' ', '-')
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.top = []  # indexes into LocationTrie.entries, best first
+
+
+class LocationTrie:
+    """Prefix trie over location names; every word of a name is a valid prefix start."""
+
+    def __init__(self, entries, limit=LOCATION_SUGGEST_LIMIT):
+        self.entries = entries  # [{"tag", "display_name"}], in rank order
+        self.limit = limit
+        self.root = _Node()
+        names = [entry["display_name"].lower().replace(",", " ").split() for entry in entries]
+        # Whole-name matches rank ahead of matches on a later word, so "del"
+        # lists Delhi before New Delhi, which is still found by "new d" and "del"
+        for index, words in enumerate(names):
+            self._insert(" ".join(words), index)
+        for index, words in enumerate(names):
+            for start in range(1, len(words)):
+                self._insert(" ".join(words[start:]), index)
+
+    def _insert(self, key, index):
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            if len(node.top) < self.limit and index not in node.top:
+                node.top.append(index)
+
+    def suggest(self, prefix, limit=None):
+        node = self.root
+        for ch in " ".join(prefix.lower().split()):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [self.entries[i] for i in node.top[:limit or self.limit]]
+
+
+async def fetch_adzuna_tree(adzuna, max_depth=LOCATION_TREE_DEPTH):
+    """Walk the Adzuna location tree breadth first, one concurrent batch of requests per level."""
+    semaphore = asyncio.Semaphore(LOCATION_FETCH_FANOUT)
+
+    async def fetch(tag):
+        async with semaphore:
+            return await adzuna.locations(tag)
+
+    flat = []
+    frontier = ["1"]
+    for depth in range(1, max_depth + 1):
+        levels = await asyncio.gather(*(fetch(tag) for tag in frontier))
+        frontier = []
+        for results in levels:
+            for loc in results:
+                flat.append({"tag": loc.get("tag"), "display_name": loc.get("display_name")})
+                if depth < max_depth:
+                    frontier.extend(sub["tag"] for sub in loc.get("locations") or [] if sub.get("tag"))
+        if not frontier:
+            break
+    return flat
+
+
+async def fetch_geonames_cities():
+    params = {"country": "IN", "featureClass": "P", "maxRows": 1000, "username": GEONAMES_USERNAME}
+    async with httpx.AsyncClient(timeout=GEONAMES_TIMEOUT) as client:
+        resp = await client.get(GEONAMES_URL, params=params)
+    if resp.status_code != 200:
+        return []
+    return [
+        {"tag": location_tag(city["name"]), "display_name": city["name"]}
+        for city in resp.json().get("geonames", []) if city.get("name")
+    ]
+
+
+class Gazetteer:
+    def __init__(self, path=LOCATION_GAZETTEER_PATH, max_age=LOCATION_GAZETTEER_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.trie = None
+        self.built_at = None
+        self._lock = None
+        self._refresh = None
+
+    def _read(self):
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != GAZETTEER_FORMAT_VERSION:
+            return None
+        return data
+
+    def _write(self, entries, built_at):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Rows as [tag, display_name] pairs keep the file compact; write then rename so readers never see a partial file
+        data = {"version": GAZETTEER_FORMAT_VERSION, "built_at": built_at, "locations": [[e["tag"], e["display_name"]] for e in entries]}
+        tmp_path = self.path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def _load(self, entries, built_at):
+        self.trie = LocationTrie(entries)
+        self.built_at = built_at
+
+    async def build(self, adzuna):
+        tree, cities = await asyncio.gather(fetch_adzuna_tree(adzuna), fetch_geonames_cities(), return_exceptions=True)
+        entries, seen = [], set()
+        for source in (tree, cities):
+            if isinstance(source, Exception):
+                print(f"Location source failed: {source}")
+                continue
+            for entry in source:
+                if entry.get("tag") and entry.get("display_name") and entry["tag"] not in seen:
+                    seen.add(entry["tag"])
+                    entries.append(entry)
+        if not entries:
+            raise RuntimeError("No locations could be fetched")
+        built_at = time.time()
+        await asyncio.to_thread(self._write, entries, built_at)
+        self._load(entries, built_at)
+        return len(entries)
+
+    async def get(self, adzuna):
+        """Return the trie, loading the file or building it on first use; refreshes old data in the background."""
+        if self.trie is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self.trie is None:
+                    data = await asyncio.to_thread(self._read)
+                    if data is not None:
+                        self._load([{"tag": t, "display_name": n} for t, n in data["locations"]], data["built_at"])
+                    else:
+                        await self.build(adzuna)
+        if time.time() - self.built_at > self.max_age and (self._refresh is None or self._refresh.done()):
+            self._refresh = asyncio.create_task(self._rebuild(adzuna))
+        return self.trie
+
+    async def _rebuild(self, adzuna):
+        try:
+            await self.build(adzuna)
+        except Exception as e:
+            # Keep serving the old data; the next request tries again
+            print(f"Location gazetteer refresh failed: {e}")
+
+
+gazetteer = Gazetteer()
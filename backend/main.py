@@ -3,15 +3,16 @@ load_dotenv()
 
 from fastapi import FastAPI, Request, HTTPException, Depends, Header, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 import os
-import requests
 import firebase_admin
 from firebase_admin import auth as firebase_auth, credentials
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Text, Date, DateTime, func, TIMESTAMP, JSON
-from sqlalchemy.orm import sessionmaker, relationship, Session, declarative_base
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Date, DateTime, func, TIMESTAMP, JSON, Boolean, Float, Index, or_, and_
+from sqlalchemy.orm import sessionmaker, relationship, Session, declarative_base, selectinload
+from sqlalchemy.exc import NoResultFound, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi.concurrency import run_in_threadpool
 import json as pyjson
 import json
 from datetime import date, datetime, timedelta
@@ -24,8 +25,23 @@ import bcrypt
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse
 from fastapi import APIRouter
-import re
-import urllib.parse
+import asyncio
+import heapq
+import itertools
+import uuid
+import hashlib
+import math
+from contextlib import asynccontextmanager
+from llm_client import llm, llm_flight, groq_resilience, prompt_fingerprint
+from link_checker import link_checker, LivenessStore
+from response_cache import roadmap_cache, make_cache_key, normalize_text
+from quantile_sketch import QuantileSketch
+from adzuna_client import adzuna
+from location_gazetteer import gazetteer
+from resource_catalog import resource_catalog, merge_resources, CATALOG_CATEGORIES, CATALOG_MIN_HITS, CATALOG_RESULT_LIMIT
+from json_repair import StreamingJSONParser, repair_json
+from sqlite_mode import create_engines, create_async_engines
+from scheduling import spread_dates, apply_dates, SCHEDULE_DAILY_CAPACITY, SCHEDULE_CAPACITY_SET
 
 # --- Database Setup ---
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./mapmyroute.db")
@@ -44,8 +60,11 @@ if DATABASE_URL.startswith("sqlite:///"):
             print(f"Permission denied for {db_dir}, using current directory")
             DATABASE_URL = "sqlite:///./mapmyroute.db"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# `engine` takes every write; GET handlers read through `read_engine`, which is a
+# separate pooled read-only engine in SQLite production mode (sqlite_mode.py)
+engine, read_engine = create_engines(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info={"read_only": read_engine is not engine})
 Base = declarative_base()
 
 # --- Models ---
@@ -62,12 +81,13 @@ class UserDB(Base):
 class SkillPathDB(Base):
     __tablename__ = "skill_paths"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     title = Column(String)
     description = Column(Text)
-    data = Column(Text)  # JSON string of roadmap weeks/goals
+    data = Column(Text)  # JSON string of the roadmap, minus its weeks (roadmap_weeks/roadmap_goals)
     created_at = Column(DateTime, default=datetime.utcnow)
     user = relationship("UserDB", back_populates="skill_paths")
+    weeks = relationship("RoadmapWeekDB", order_by="RoadmapWeekDB.position", cascade="all, delete-orphan")
 
 class PlannerDB(Base):
     __tablename__ = "planner"
@@ -76,10 +96,47 @@ class PlannerDB(Base):
     week = Column(Integer, nullable=False)
     description = Column(Text, nullable=False)
     status = Column(String(32), default="pending")  # pending, complete, deferred
-    due_date = Column(Date)
+    due_date = Column(Date, index=True)
     rescheduled_to = Column(Date)  # new column for rescheduling
     skill_path = relationship("SkillPathDB")
 
+# Both lead with skill_path_id, so they also serve lookups by path alone
+Index("ix_planner_path_status", PlannerDB.skill_path_id, PlannerDB.status)
+Index("ix_planner_path_week", PlannerDB.skill_path_id, PlannerDB.week)
+# The calendar day of a task: where it was rescheduled to, else its due date
+PLANNER_DAY = func.coalesce(PlannerDB.rescheduled_to, PlannerDB.due_date)
+# Serves GET /planner/range: a seek per path on the day, in (day, id) order
+Index("ix_planner_path_day", PlannerDB.skill_path_id, PLANNER_DAY, PlannerDB.id)
+
+class RoadmapWeekDB(Base):
+    __tablename__ = "roadmap_weeks"
+    id = Column(Integer, primary_key=True)
+    skill_path_id = Column(Integer, ForeignKey("skill_paths.id"), nullable=False)
+    position = Column(Integer, nullable=False)  # index in the roadmap's "weeks" list
+    week = Column(Integer)  # the week's "week" number
+    extra = Column(Text)  # JSON of the week's other keys (or the whole entry if it isn't an object)
+    goals = relationship("RoadmapGoalDB", order_by="RoadmapGoalDB.position", cascade="all, delete-orphan")
+
+Index("ix_roadmap_weeks_path_position", RoadmapWeekDB.skill_path_id, RoadmapWeekDB.position, unique=True)
+
+class RoadmapGoalDB(Base):
+    __tablename__ = "roadmap_goals"
+    id = Column(Integer, primary_key=True)
+    week_id = Column(Integer, ForeignKey("roadmap_weeks.id"), nullable=False)
+    position = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)  # JSON of the goal (usually a string)
+
+Index("ix_roadmap_goals_week_position", RoadmapGoalDB.week_id, RoadmapGoalDB.position, unique=True)
+
+class PathProgressDB(Base):
+    __tablename__ = "path_progress"
+    skill_path_id = Column(Integer, ForeignKey("skill_paths.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    complete = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    deferred = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 class Quiz(Base):
     __tablename__ = "quizzes"
     id = Column(Integer, primary_key=True, index=True)
@@ -100,7 +157,7 @@ class Question(Base):
 class UserQuizAttempt(Base):
     __tablename__ = "user_quiz_attempts"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer)
+    user_id = Column(Integer, index=True)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"))
     answers = Column(JSON)
     score = Column(Integer)
@@ -113,16 +170,172 @@ class UserProgress(Base):
     current_skills = Column(Text, default="[]")  # JSON string for SQLite compatibility
     updated_at = Column(DateTime, default=datetime.utcnow)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+class JobDB(Base):
+    __tablename__ = "jobs"
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    kind = Column(String(64), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    skill_path_id = Column(Integer, ForeignKey("skill_paths.id"))
+    status = Column(String(32), default="queued", index=True)  # queued, running, complete, failed
+    payload = Column(Text)  # JSON string of job input
+    progress = Column(Text, default="{}")  # JSON string: {week: pending|complete}
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    error = Column(Text)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    lease_expires_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class QuizBankDB(Base):
+    __tablename__ = "quiz_bank"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    skill_path_id = Column(Integer, ForeignKey("skill_paths.id"), index=True)
+    task_set_hash = Column(String(64), nullable=False)  # hash of the completed-task descriptions
+    question_id = Column(Integer, ForeignKey("questions.id"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+Index("ix_quiz_bank_path_hash", QuizBankDB.skill_path_id, QuizBankDB.task_set_hash)
+
+class UrlLivenessDB(Base):
+    __tablename__ = "url_liveness"
+    url = Column(String, primary_key=True)
+    available = Column(Boolean, nullable=False)
+    status_code = Column(Integer)
+    reason = Column(Text)
+    checked_at = Column(DateTime, nullable=False, index=True)
+
+class JobMarketSnapshotDB(Base):
+    __tablename__ = "job_market_snapshots"
+    id = Column(Integer, primary_key=True, index=True)
+    skill = Column(String, nullable=False)  # normalized (lowercase, single spaces)
+    location = Column(String, nullable=False)
+    posting_count = Column(Integer)
+    salary_count = Column(Integer, default=0)
+    salary_mean = Column(Float)
+    salary_p25 = Column(Float)
+    salary_p50 = Column(Float)
+    salary_p90 = Column(Float)
+    salary_sketch = Column(Text)  # JSON QuantileSketch over the sampled postings
+    pages_fetched = Column(Integer, default=0)
+    fetched_at = Column(DateTime)  # None until the first ingest
+    last_requested_at = Column(DateTime)  # last endpoint read (bumped at most once per ingest interval)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
-def get_db():
+Index("ux_job_market_skill_location", JobMarketSnapshotDB.skill, JobMarketSnapshotDB.location, unique=True)
+
+# --- Migrations ---
+# The schema is owned by the Alembic revisions in migrations/. Startup brings
+# the database to head (a no-op when it is current); set DB_AUTO_MIGRATE=0 to
+# run `alembic upgrade head` as a separate deploy step instead.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+def run_migrations(bind=engine):
+    from alembic import command
+    from alembic.config import Config
+    cfg = Config(ALEMBIC_INI)
+    with bind.begin() as connection:
+        cfg.attributes["connection"] = connection
+        cfg.attributes["target_metadata"] = Base.metadata
+        command.upgrade(cfg, "head")
+
+if DB_AUTO_MIGRATE:
+    run_migrations()
+
+link_checker.store = LivenessStore(SessionLocal, UrlLivenessDB, read_session_factory=ReadSessionLocal)
+
+# Async generators so the session is closed on the event loop: a sync teardown
+# needs a threadpool slot, and with every slot blocked waiting for the single
+# writer connection (SQLite production mode) the request holding it could never
+# give it back. For the same reason sync write handlers don't declare a
+# response_model: FastAPI validates it in the threadpool before the teardown.
+async def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+async def get_read_db(write_db: Session = Depends(get_db)):
+    # With a single engine, reads share the request's session so a request never holds two connections
+    if read_engine is engine:
+        yield write_db
+        return
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def release_connection(db):
+    """End the session's transaction so its pooled connection is free during a long await.
+
+    Loaded objects keep their state (no expiry) and the session checks out a
+    connection again on its next query. In SQLite production mode the writer is
+    a single connection, so holding it across an LLM or API call would stall
+    every other mutation.
+    """
+    expire, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire
+
+# --- Async database layer ---
+# Async endpoints and background jobs keep their queries in plain functions
+# taking a Session and call them through run_db, never directly on the event
+# loop. With DB_ASYNC=1 (the default) run_db runs them on an AsyncSession
+# (aiosqlite / asyncpg) via run_sync, so a request waiting on the database
+# holds no thread; DB_ASYNC=0 runs the same functions on the sync sessions in
+# the threadpool. In SQLite production mode there is no async writer: writer
+# sessions are the sync single-connection writer (in the threadpool), so one
+# connection does all the writing, and only reads use the async engine.
+DB_ASYNC = os.getenv("DB_ASYNC", "1") != "0"
+AsyncSessionLocal = AsyncReadSessionLocal = None
+async_engine = async_read_engine = None
+if DB_ASYNC:
+    async_engine, async_read_engine = create_async_engines(DATABASE_URL)
+    # Objects outlive the run_db call that loaded them, so commits must not expire them
+    if async_engine is not None:
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False, info={"read_only": async_read_engine is not async_engine})
+
+async def get_async_db(sync_db: Session = Depends(get_db)):
+    """AsyncSession for run_db, or the request's sync session when writes stay sync."""
+    if AsyncSessionLocal is None:
+        yield sync_db
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(sync_db: Session = Depends(get_read_db)):
+    if AsyncReadSessionLocal is None:
+        yield sync_db
+        return
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def writer_session():
+    """A writer session outside a request (the job worker and schedulers); use it through run_db."""
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_db(db, fn, *args, **kwargs):
+    """Call fn(session, *args, **kwargs) without blocking the event loop."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
 # Initialize Firebase Admin SDK (only once)
 if not firebase_admin._apps:
     cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -164,21 +377,11 @@ class TokenRequest(BaseModel):
 
 # --- Auth (Firebase) ---
 @app.post("/auth/firebase")
-def firebase_auth_endpoint(body: TokenRequest, db: Session = Depends(get_db)):
+async def firebase_auth_endpoint(body: TokenRequest, db: AsyncSession = Depends(get_async_db)):
     try:
-        decoded = firebase_auth.verify_id_token(body.token)
+        decoded = await run_in_threadpool(firebase_auth.verify_id_token, body.token)
         # Get or create user in DB
-        user = db.query(UserDB).filter_by(uid=decoded["uid"]).first()
-        if not user:
-            user = UserDB(
-                uid=decoded["uid"],
-                email=decoded.get("email"),
-                name=decoded.get("name"),
-                picture=decoded.get("picture")
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+        user = await run_db(db, firebase_user, decoded)
         return {
             "uid": user.uid,
             "email": user.email,
@@ -188,57 +391,161 @@ def firebase_auth_endpoint(body: TokenRequest, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Invalid Firebase token: {str(e)}")
 
-def call_groq(messages, model="llama-3.3-70b-versatile", max_tokens=800, temperature=0.7):
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("GROQ_API_KEY is not set in the environment. Please add it to your .env file.")
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
-    payload = {
-        'model': model,
-        'messages': messages,
-        'max_tokens': max_tokens,
-        'temperature': temperature
-    }
+@app.on_event("shutdown")
+async def close_http_clients():
+    await llm.aclose()
+    await link_checker.aclose()
+    await adzuna.aclose()
+
+@app.on_event("shutdown")
+async def dispose_async_engines():
+    for async_db_engine in {async_engine, async_read_engine} - {None}:
+        await async_db_engine.dispose()
+
+# Overall deadline (seconds, including retries) for each LLM call site
+LLM_DEADLINES = {
+    "roadmap": 60,
+    "daily_tasks": 25,
+    "regenerate_week": 45,
+    "suggestions": 20,
+    "resources": 45,
+    "weekly_plan": 30,
+    "quiz": 25,
+    "ai_recalculate": 60,
+}
+
+async def groq_chat(messages, model, max_tokens, temperature, timeout, site):
+    """One Groq request with retries and the circuit breaker; not coalesced."""
     try:
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload, timeout=60)
-        response.raise_for_status()
-        data = response.json()
-        if 'choices' not in data or not data['choices']:
-            raise ValueError('No choices returned from Groq API')
-        return data['choices'][0]['message']['content']
+        return await groq_resilience.call(
+            lambda: llm.chat(messages, model=model, max_tokens=max_tokens, temperature=temperature, timeout=timeout),
+            site=site,
+            deadline=LLM_DEADLINES.get(site)
+        )
     except Exception as e:
         print(f"Groq API error: {str(e)}")
         print(f"Groq API response: {getattr(e, 'response', None)}")
         raise
 
-def parse_json_from_response(text):
+# call_groq and call_groq_json each coalesce once, on their own key, around
+# groq_chat: every Groq request is one llm_flight call and every shared wait
+# one coalesced hit.
+async def call_groq(messages, model="llama-3.3-70b-versatile", max_tokens=800, temperature=0.7, timeout=None, site="default"):
+    # Identical prompts already in flight share a single Groq request
+    key = prompt_fingerprint(messages, model, max_tokens, temperature)
+    return await llm_flight.do(key, lambda: groq_chat(messages, model, max_tokens, temperature, timeout, site))
+
+async def call_groq_json(messages, model="llama-3.3-70b-versatile", max_tokens=800, temperature=0.7, timeout=None, site="default", return_truncated=False):
+    """call_groq + parse_json_from_response; concurrent identical prompts share the parsed result."""
+    key = prompt_fingerprint(messages, model, max_tokens, temperature, kind="json")
+
+    async def run():
+        content = await groq_chat(messages, model, max_tokens, temperature, timeout, site)
+        return parse_json_from_response(content, return_truncated=True)
+    value, truncated = await llm_flight.do(key, run)
+    return (value, truncated) if return_truncated else value
+
+@app.get("/llm/stats")
+def get_llm_stats():
+    return {"single_flight": llm_flight.stats(), "groq": groq_resilience.stats()}
+
+def parse_json_from_response(text, return_truncated=False):
+    """Parse a model reply; with return_truncated, returns `(value, truncated)`.
+
+    A truncated reply is closed up so it still parses, but the value is partial:
+    use it for the one response, never cache or store it.
+    """
+    # Fast path: well-formed JSON, optionally inside a markdown code block
     try:
-        # Try to extract JSON from markdown/code block if present
         if '```json' in text:
-            text = text.split('```json')[1].split('```')[0].strip()
+            value = json.loads(text.split('```json')[1].split('```')[0].strip())
         elif '```' in text:
-            text = text.split('```')[1].split('```')[0].strip()
-        return json.loads(text)
+            value = json.loads(text.split('```')[1].split('```')[0].strip())
+        else:
+            value = json.loads(text)
+        return (value, False) if return_truncated else value
     except Exception as e:
-        print(f"Error parsing JSON: {str(e)}")
-        print(f"Raw text: {text}")
-        # Try to clean/truncate and re-parse
-        try:
-            cleaned = clean_json_string(text)
-            return json.loads(cleaned)
-        except Exception:
-            try:
-                truncated = truncate_to_last_complete_json(text)
-                return json.loads(truncated)
-            except Exception:
-                raise
+        print(f"Error parsing JSON, repairing: {str(e)}")
+    # Single-pass tolerant parse of the raw reply (fences, quotes, commas, truncation)
+    value, truncated = repair_json(text, return_truncated=True)
+    print(f"Repaired JSON reply{' (truncated, value is partial)' if truncated else ''}")
+    return (value, truncated) if return_truncated else value
+
+# Maximum number of weekly breakdown calls in flight for a single request
+DAILY_TASKS_FANOUT = int(os.getenv("DAILY_TASKS_FANOUT", "6"))
+
+def fallback_daily_tasks(goals):
+    # Evenly distribute goals or repeat if not enough
+    return [goals[i % len(goals)] if goals else f"Task {i+1}" for i in range(7)]
+
+async def generate_daily_tasks(week_num, goals, semaphore=None):
+    """Use AI to break a week's goals down into 7 daily tasks (Monday to Sunday)."""
+    prompt = (
+        f"Given these goals for Week {week_num}: {goals}, break them down into 7 daily tasks (one for each day, Monday to Sunday). "
+        "Respond as a JSON list of 7 strings."
+    )
+    messages = [
+        {"role": "system", "content": "You are an expert learning coach."},
+        {"role": "user", "content": prompt}
+    ]
+    try:
+        if semaphore is not None:
+            async with semaphore:
+                daily_tasks = await call_groq_json(messages, model="llama-3.3-70b-versatile", site="daily_tasks")
+        else:
+            daily_tasks = await call_groq_json(messages, model="llama-3.3-70b-versatile", site="daily_tasks")
+        if not isinstance(daily_tasks, list) or len(daily_tasks) != 7:
+            raise ValueError("AI did not return 7 daily tasks.")
+        return daily_tasks
+    except Exception:
+        return fallback_daily_tasks(goals)
+
+async def generate_daily_tasks_for_weeks(weeks, fanout=DAILY_TASKS_FANOUT):
+    """Break down all weeks concurrently; results come back in the same order as `weeks`."""
+    semaphore = asyncio.Semaphore(max(1, fanout))
+    return await asyncio.gather(*[
+        generate_daily_tasks(week.get('week'), week.get('goals', []), semaphore)
+        for week in weeks
+    ])
+
+def planner_rows_for_week(skill_path_id, week_num, daily_tasks, week_start):
+    # Assign due dates for each day (Monday-Sunday)
+    return [
+        {
+            "skill_path_id": skill_path_id,
+            "week": week_num,
+            "description": daily_task,
+            "status": "pending",
+            "due_date": week_start + timedelta(days=i)
+        } for i, daily_task in enumerate(daily_tasks)
+    ]
 
 # --- AI Roadmap Generation (Groq) ---
 @app.post("/roadmap/generate", response_model=RoadmapResponse)
-def generate_roadmap(req: RoadmapRequest):
+async def generate_roadmap(req: RoadmapRequest):
+    # Serve identical (normalized) requests from the response cache
+    cache_key = roadmap_cache_key(req)
+    # The disk tier is sqlite3; keep its reads and commits off the event loop
+    cached = await asyncio.to_thread(roadmap_cache.get, cache_key)
+    if cached is not None:
+        return RoadmapResponse(**cached)
+    messages = roadmap_messages(req)
+    try:
+        parsed, truncated = await call_groq_json(messages, model="llama-3.3-70b-versatile", site="roadmap", return_truncated=True)
+        roadmap = RoadmapResponse(**parsed)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Groq API error: {str(e)}")
+    # Only complete, validated responses are cached; a truncated one is served once
+    if truncated:
+        print(f"Roadmap reply for {req.topic!r} was truncated; not caching it")
+    else:
+        await asyncio.to_thread(roadmap_cache.set, cache_key, roadmap.dict())
+    return roadmap
+
+def roadmap_cache_key(req):
+    return make_cache_key(req.topic, req.level, req.time, req.duration, req.goal)
+
+def roadmap_messages(req):
     # Add goal to the prompt if provided
     goal_part = f" The end goal is: {req.goal}." if req.goal else ""
     prompt = (
@@ -253,32 +560,115 @@ def generate_roadmap(req: RoadmapRequest):
         {"role": "system", "content": "You are an expert learning path generator."},
         {"role": "user", "content": prompt}
     ]
-    try:
-        content = call_groq(messages, model="llama-3.3-70b-versatile")
-        parsed = parse_json_from_response(content)
-        return RoadmapResponse(**parsed)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Groq API error: {str(e)}")
+    return messages
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/roadmap/generate/stream")
+async def generate_roadmap_stream(req: RoadmapRequest):
+    """Server-Sent Events variant of /roadmap/generate.
+
+    Emits `meta` (title, description), then one `week` event per completed week,
+    then `done` with the full validated roadmap (or `error`). A reply cut off
+    mid-stream still ends in `done`, but is not cached.
+    """
+    cache_key = roadmap_cache_key(req)
+
+    async def events():
+        cached = await asyncio.to_thread(roadmap_cache.get, cache_key)
+        if cached is not None:
+            yield sse_event("meta", {"title": cached["title"], "description": cached["description"]})
+            for week in cached["weeks"]:
+                yield sse_event("week", week)
+            yield sse_event("done", cached)
+            return
+        parser = StreamingJSONParser(emit_depth=2)
+        meta = {}
+        meta_sent = False
+        try:
+            stream = groq_resilience.stream(
+                lambda: llm.stream_chat(roadmap_messages(req), model="llama-3.3-70b-versatile"),
+                site="roadmap_stream"
+            )
+            async for delta in stream:
+                for path, value in parser.feed(delta):
+                    if path in (("title",), ("description",)):
+                        meta[path[0]] = value
+                        if not meta_sent and "title" in meta and "description" in meta:
+                            meta_sent = True
+                            yield sse_event("meta", meta)
+                    elif len(path) == 2 and path[0] == "weeks":
+                        try:
+                            week = RoadmapWeek(**value)
+                        except Exception:
+                            continue  # Skip malformed weeks; the final validation reports them
+                        if not meta_sent:
+                            meta_sent = True
+                            yield sse_event("meta", meta)
+                        yield sse_event("week", week.dict())
+            roadmap = RoadmapResponse(**parser.finish())
+        except Exception as e:
+            print(f"Groq streaming error: {str(e)}")
+            yield sse_event("error", {"detail": f"Groq API error: {str(e)}"})
+            return
+        if not meta_sent:
+            yield sse_event("meta", {"title": roadmap.title, "description": roadmap.description})
+        if parser.truncated:
+            print(f"Streamed roadmap for {req.topic!r} was truncated; not caching it")
+        else:
+            await asyncio.to_thread(roadmap_cache.set, cache_key, roadmap.dict())
+        yield sse_event("done", roadmap.dict())
 
-def get_current_user(authorization: str = Header(...), db: Session = Depends(get_db)):
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/roadmap/cache/stats")
+def get_roadmap_cache_stats():
+    return roadmap_cache.stats()
+
+def firebase_user(db, decoded):
+    """Get or create the user for a verified Firebase token.
+
+    A read-only session can't create one and returns None for a first sign-in;
+    the caller repeats the call on a writer session.
+    """
+    user = db.query(UserDB).filter_by(uid=decoded["uid"]).first()
+    if not user and not db.info.get("read_only"):
+        db.add(UserDB(
+            uid=decoded["uid"],
+            email=decoded.get("email"),
+            name=decoded.get("name"),
+            picture=decoded.get("picture")
+        ))
+        db.commit()
+        user = db.query(UserDB).filter_by(uid=decoded["uid"]).first()
+    return user
+
+def token_user(db, decoded=None, user_id=None):
+    user = firebase_user(db, decoded) if decoded is not None else db.query(UserDB).filter_by(id=user_id).first()
+    # Don't sit on a pooled connection for the rest of the request
+    release_connection(db)
+    return user
+
+async def get_current_user(
+    authorization: str = Header(...),
+    db: AsyncSession = Depends(get_async_read_db),
+    write_db: AsyncSession = Depends(get_async_db)  # only used (and connected) on a first sign-in
+):
     """Accept both Firebase and JWT tokens. Try Firebase first, then JWT."""
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid auth header")
     token = authorization.split(" ", 1)[1]
-    # Try Firebase first
+    # Try Firebase first (verification can fetch Google's signing keys, so not on the event loop)
     try:
-        decoded = firebase_auth.verify_id_token(token)
-        user = db.query(UserDB).filter_by(uid=decoded["uid"]).first()
-        if not user:
-            user = UserDB(
-                uid=decoded["uid"],
-                email=decoded.get("email"),
-                name=decoded.get("name"),
-                picture=decoded.get("picture")
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+        decoded = await run_in_threadpool(firebase_auth.verify_id_token, token)
+        user = await run_db(db, token_user, decoded=decoded)
+        if user is None:
+            user = await run_db(write_db, token_user, decoded=decoded)
         return user
     except Exception:
         # If Firebase fails, try JWT
@@ -287,89 +677,275 @@ def get_current_user(authorization: str = Header(...), db: Session = Depends(get
             user_id = payload.get("user_id")
             if user_id is None:
                 raise HTTPException(status_code=401, detail="Invalid token")
-            user = db.query(UserDB).filter_by(id=user_id).first()
+            user = await run_db(db, token_user, user_id=user_id)
             if not user:
                 raise HTTPException(status_code=401, detail="User not found")
             return user
         except Exception:
             raise HTTPException(status_code=401, detail="Invalid token")
 
+# --- Roadmap storage ---
+# A skill path's roadmap JSON is stored in three parts: skill_paths.data keeps
+# everything except the "weeks" list, each week is a roadmap_weeks row and each
+# of its goals a roadmap_goals row. roadmap_data puts the JSON back together in
+# the shape the API has always returned, so list endpoints can skip the weeks
+# and a single-week edit rewrites only that week's goals.
+
+def is_week_number(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def roadmap_goal_rows(goals):
+    return [RoadmapGoalDB(position=i, content=pyjson.dumps(goal)) for i, goal in enumerate(goals)]
+
+def roadmap_week_rows(weeks):
+    """RoadmapWeekDB rows (with their goals) for a roadmap's "weeks" list."""
+    rows = []
+    for position, week in enumerate(weeks):
+        if not isinstance(week, dict):
+            rows.append(RoadmapWeekDB(position=position, extra=pyjson.dumps(week)))
+            continue
+        number, goals = week.get("week"), week.get("goals")
+        # A week number or goals list that doesn't fit the columns stays in `extra` as given
+        extra = {
+            k: v for k, v in week.items()
+            if not (k == "week" and is_week_number(number)) and not (k == "goals" and isinstance(goals, list))
+        }
+        rows.append(RoadmapWeekDB(
+            position=position,
+            week=number if is_week_number(number) else None,
+            extra=pyjson.dumps(extra) if extra else None,
+            goals=roadmap_goal_rows(goals) if isinstance(goals, list) else []
+        ))
+    return rows
+
+def roadmap_week_dict(week):
+    extra = pyjson.loads(week.extra) if week.extra is not None else {}
+    if not isinstance(extra, dict):
+        return extra
+    result = {"week": week.week} if week.week is not None else {}
+    result["goals"] = [pyjson.loads(goal.content) for goal in week.goals]
+    result.update(extra)
+    return result
+
+def roadmap_data(path):
+    """The roadmap JSON as the API returns it (loads the path's weeks and goals)."""
+    if path.data is None:
+        return None
+    data = pyjson.loads(str(path.data))
+    if isinstance(data, dict) and "weeks" not in data:
+        data["weeks"] = [roadmap_week_dict(week) for week in path.weeks]
+    return data
+
+def clear_roadmap_weeks(db, skill_path_id):
+    """Delete a path's week and goal rows with two statements."""
+    week_ids = db.query(RoadmapWeekDB.id).filter(RoadmapWeekDB.skill_path_id == skill_path_id)
+    db.query(RoadmapGoalDB).filter(RoadmapGoalDB.week_id.in_(week_ids.scalar_subquery())).delete(synchronize_session=False)
+    db.query(RoadmapWeekDB).filter(RoadmapWeekDB.skill_path_id == skill_path_id).delete(synchronize_session=False)
+
+def set_roadmap(db, path, data):
+    """Store a roadmap JSON for `path`, replacing any weeks it had."""
+    weeks = []
+    if isinstance(data, dict) and isinstance(data.get("weeks"), list):
+        weeks = data["weeks"]
+        data = {k: v for k, v in data.items() if k != "weeks"}
+    path.data = pyjson.dumps(data)
+    if path.id is not None:
+        clear_roadmap_weeks(db, path.id)
+        db.expire(path, ["weeks"])
+    path.weeks = roadmap_week_rows(weeks)
+
+def with_roadmap(query):
+    """Eager-load the weeks and goals of the queried paths (two extra queries in total)."""
+    return query.options(selectinload(SkillPathDB.weeks).selectinload(RoadmapWeekDB.goals))
+
+# --- Path progress ---
+# path_progress holds per-path task counters. Every planner write updates them
+# before its commit, so they change in the same transaction as the tasks:
+# single-task writes apply a delta, bulk writes recount the affected paths.
+PROGRESS_STATUSES = ("complete", "pending", "deferred")
+
+def count_path_tasks(db, path_ids):
+    """{path_id: counter values} counted from planner in one grouped query."""
+    counts = {pid: {"total": 0, "complete": 0, "pending": 0, "deferred": 0} for pid in path_ids}
+    rows = db.query(PlannerDB.skill_path_id, PlannerDB.status, func.count(PlannerDB.id)).filter(
+        PlannerDB.skill_path_id.in_(path_ids)
+    ).group_by(PlannerDB.skill_path_id, PlannerDB.status).all()
+    for pid, status, n in rows:
+        counts[pid]["total"] += n
+        if status in PROGRESS_STATUSES:
+            counts[pid][status] += n
+    return counts
+
+def recount_path_progress(db, path_ids):
+    """Recompute the counters of the given paths from planner (one grouped query)."""
+    path_ids = {pid for pid in path_ids if pid is not None}
+    if not path_ids:
+        return
+    db.flush()
+    counts = count_path_tasks(db, path_ids)
+    existing = {p.skill_path_id: p for p in db.query(PathProgressDB).filter(PathProgressDB.skill_path_id.in_(path_ids)).all()}
+    now = datetime.utcnow()
+    for pid, values in counts.items():
+        progress = existing.get(pid)
+        if progress is None:
+            progress = PathProgressDB(skill_path_id=pid)
+            db.add(progress)
+        for field, value in values.items():
+            setattr(progress, field, value)
+        progress.updated_at = now
+    db.flush()
+
+def progress_delta(removed=None, added=None, into=None):
+    """Counter changes for one task going from status `removed` to `added` (None = no task), summed into `into`."""
+    delta = into if into is not None else {}
+    if removed == added:
+        return delta
+    changes = {"total": (added is not None) - (removed is not None)}
+    for status in PROGRESS_STATUSES:
+        changes[status] = (added == status) - (removed == status)
+    for field, n in changes.items():
+        delta[field] = delta.get(field, 0) + n
+    return delta
+
+def bump_path_progress(db, path_id, removed=None, added=None, delta=None):
+    """Apply one task change: `removed` is the status it had, `added` the status it has now (None = no task).
+
+    A `delta` from progress_delta applies several summed changes in the same single UPDATE.
+    """
+    if delta is None:
+        delta = progress_delta(removed, added)
+    updates = {}
+    for field, n in delta.items():
+        if n:
+            column = getattr(PathProgressDB, field)
+            updates[column] = column + n
+    if not updates:
+        return
+    updates[PathProgressDB.updated_at] = datetime.utcnow()
+    # Atomic increments, so concurrent writes to one path don't lose updates
+    updated = db.query(PathProgressDB).filter_by(skill_path_id=path_id).update(updates, synchronize_session=False)
+    if not updated:
+        recount_path_progress(db, [path_id])
+
+def path_progress_map(db, path_ids):
+    """{skill_path_id: PathProgressDB} in one query; paths without counters yet are backfilled."""
+    path_ids = set(path_ids)
+    if not path_ids:
+        return {}
+    found = {p.skill_path_id: p for p in db.query(PathProgressDB).filter(PathProgressDB.skill_path_id.in_(path_ids)).all()}
+    missing = path_ids - set(found)
+    if missing and db.info.get("read_only"):
+        # A read-only session counts them without storing; the next write to the path backfills the row
+        found.update({pid: PathProgressDB(skill_path_id=pid, **values) for pid, values in count_path_tasks(db, missing).items()})
+    elif missing:
+        recount_path_progress(db, missing)
+        db.commit()
+        found.update({p.skill_path_id: p for p in db.query(PathProgressDB).filter(PathProgressDB.skill_path_id.in_(missing)).all()})
+    return found
+
+def check_path_progress(db, fix=False):
+    """Compare every path's counters with a fresh count; returns the mismatches (and repairs them if `fix`)."""
+    actual = {}
+    for pid, status, n in db.query(PlannerDB.skill_path_id, PlannerDB.status, func.count(PlannerDB.id)).group_by(
+        PlannerDB.skill_path_id, PlannerDB.status
+    ).all():
+        counts = actual.setdefault(pid, {"total": 0, "complete": 0, "pending": 0, "deferred": 0})
+        counts["total"] += n
+        if status in PROGRESS_STATUSES:
+            counts[status] += n
+    stored = {p.skill_path_id: p for p in db.query(PathProgressDB).all()}
+    path_ids = {pid for (pid,) in db.query(SkillPathDB.id).all()}
+    mismatches = []
+    for pid in sorted(path_ids | set(stored)):
+        expected = actual.get(pid, {"total": 0, "complete": 0, "pending": 0, "deferred": 0})
+        row = stored.get(pid)
+        if pid not in path_ids:
+            mismatches.append({"skill_path_id": pid, "problem": "orphaned counters"})
+        elif row is None:
+            mismatches.append({"skill_path_id": pid, "problem": "missing counters", "expected": expected})
+        else:
+            got = {field: getattr(row, field) for field in expected}
+            if got != expected:
+                mismatches.append({"skill_path_id": pid, "problem": "counts differ", "expected": expected, "stored": got})
+    if fix and mismatches:
+        orphaned = [m["skill_path_id"] for m in mismatches if m["problem"] == "orphaned counters"]
+        if orphaned:
+            db.query(PathProgressDB).filter(PathProgressDB.skill_path_id.in_(orphaned)).delete(synchronize_session=False)
+        recount_path_progress(db, [m["skill_path_id"] for m in mismatches if m["skill_path_id"] not in orphaned])
+        db.commit()
+    return mismatches
+
+def rebuild_path_progress(db):
+    """Recount every path from scratch; returns the number of paths."""
+    path_ids = [pid for (pid,) in db.query(SkillPathDB.id).all()]
+    db.query(PathProgressDB).delete(synchronize_session=False)
+    recount_path_progress(db, path_ids)
+    db.commit()
+    return len(path_ids)
+
 # --- Skill Paths CRUD ---
-@app.get("/skill-paths")
-def list_skill_paths(user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
-    paths = db.query(SkillPathDB).filter_by(user_id=user.id).all()
+def skill_paths_with_progress(db, user, include_data=True):
+    query = db.query(SkillPathDB).filter_by(user_id=user.id)
+    paths = (with_roadmap(query) if include_data else query).all()
+    counters = path_progress_map(db, [p.id for p in paths])
     result = []
     for p in paths:
         # Calculate progress
-        total = db.query(PlannerDB).filter_by(skill_path_id=p.id).count()
-        completed = db.query(PlannerDB).filter_by(skill_path_id=p.id, status="complete").count()
+        total = counters[p.id].total
+        completed = counters[p.id].complete
         progress = int((completed / total) * 100) if total else 0
-        result.append({
+        item = {
             "id": p.id,
             "title": str(p.title),
             "description": str(p.description),
-            "data": pyjson.loads(str(p.data)) if p.data is not None else None,
             "created_at": p.created_at,
             "progress": progress
-        })
+        }
+        if include_data:
+            item["data"] = roadmap_data(p)
+        result.append(item)
     return result
 
+@app.get("/skill-paths")
+async def list_skill_paths(
+    include_data: bool = Query(True),  # false leaves out each path's roadmap "data"
+    user: UserDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await run_db(db, skill_paths_with_progress, user, include_data)
+
 class SkillPathCreate(BaseModel):
     title: str
     description: Optional[str] = None
     data: dict  # roadmap weeks/goals
 
-@app.post("/skill-paths")
-def create_skill_path(body: SkillPathCreate, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+def insert_skill_path(db, user_id, body):
     path = SkillPathDB(
-        user_id=user.id,
+        user_id=user_id,
         title=body.title,
-        description=body.description,
-        data=pyjson.dumps(body.data)
+        description=body.description
     )
+    set_roadmap(db, path, body.data)
     db.add(path)
     db.commit()
     db.refresh(path)
+    return path
 
-    # Automatically create planner tasks for each week, using AI to break down into 7 daily tasks
-    weeks = body.data.get('weeks', [])
-    start_date = date.today()
-    for week in weeks:
-        week_num = week.get('week')
-        goals = week.get('goals', [])
-        # Use AI to break down the week's goals into 7 daily tasks
-        prompt = (
-            f"Given these goals for Week {week_num}: {goals}, break them down into 7 daily tasks (one for each day, Monday to Sunday). "
-            "Respond as a JSON list of 7 strings."
-        )
-        messages = [
-            {"role": "system", "content": "You are an expert learning coach."},
-            {"role": "user", "content": prompt}
-        ]
-        try:
-            content = call_groq(messages, model="llama-3.3-70b-versatile")
-            daily_tasks = parse_json_from_response(content)
-            if not isinstance(daily_tasks, list) or len(daily_tasks) != 7:
-                raise ValueError("AI did not return 7 daily tasks.")
-        except Exception as e:
-            # Fallback: evenly distribute goals or repeat if not enough
-            daily_tasks = []
-            for i in range(7):
-                daily_tasks.append(goals[i % len(goals)] if goals else f"Task {i+1}")
-        # Assign due dates for each day (Monday-Sunday)
-        week_start = start_date + timedelta(weeks=week_num-1)
-        for i, daily_task in enumerate(daily_tasks):
-            due_date = week_start + timedelta(days=i)
-            task = PlannerDB(
-                skill_path_id=path.id,
-                week=week_num,
-                description=daily_task,
-                due_date=due_date
-            )
-            db.add(task)
+def insert_planner_rows(db, skill_path_id, rows):
+    if rows:
+        db.bulk_insert_mappings(PlannerDB, rows)
+    recount_path_progress(db, [skill_path_id])
     db.commit()
 
-    return {
+@app.post("/skill-paths")
+async def create_skill_path(
+    body: SkillPathCreate,
+    background: bool = Query(False),
+    user: UserDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    path = await run_db(db, insert_skill_path, user.id, body)
+    result = {
         "id": path.id,
         "title": path.title,
         "description": path.description,
@@ -377,14 +953,217 @@ def create_skill_path(body: SkillPathCreate, user: UserDB = Depends(get_current_
         "created_at": path.created_at
     }
 
-@app.get("/skill-paths/{id}")
-def get_skill_path(id: int, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
-    path = db.query(SkillPathDB).filter_by(id=id, user_id=user.id).first()
+    weeks = body.data.get('weeks', [])
+    start_date = date.today()
+    if background:
+        # Opt-in: return the path right away and let the job worker build the planner
+        job = await run_db(db, enqueue_skill_path_job, user.id, path.id, weeks, start_date)
+        result["job_id"] = job.id
+        return result
+
+    # Automatically create planner tasks for each week, using AI to break down into 7 daily tasks.
+    # All weeks are generated concurrently and written with a single bulk insert.
+    await run_db(db, release_connection)
+    all_daily_tasks = await generate_daily_tasks_for_weeks(weeks)
+    rows = []
+    for week, daily_tasks in zip(weeks, all_daily_tasks):
+        week_num = week.get('week')
+        week_start = start_date + timedelta(weeks=week_num-1)
+        rows.extend(planner_rows_for_week(path.id, week_num, daily_tasks, week_start))
+    await run_db(db, insert_planner_rows, path.id, rows)
+    return result
+
+# --- Background Jobs ---
+# Jobs live in the `jobs` table so they survive restarts. A worker claims a job by
+# taking a lease; if the process dies mid-job the lease expires and the job is picked
+# up again (at-least-once), so every job handler must be safe to re-run.
+JOB_WORKER_ENABLED = os.getenv("JOB_WORKER_ENABLED", "1") != "0"
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", "10"))
+
+def enqueue_skill_path_job(db, user_id, skill_path_id, weeks, start_date):
+    job = JobDB(
+        kind="skill_path_planner",
+        user_id=user_id,
+        skill_path_id=skill_path_id,
+        payload=pyjson.dumps({"weeks": weeks, "start_date": start_date.isoformat()}),
+        progress=pyjson.dumps({str(w.get("week")): "pending" for w in weeks}),
+        max_attempts=JOB_MAX_ATTEMPTS
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def claim_next_job(db):
+    now = datetime.utcnow()
+    # A lease that expired on its last attempt means the job kept taking its worker down
+    failed = db.query(JobDB).filter(
+        JobDB.status == "running",
+        JobDB.lease_expires_at < now,
+        JobDB.attempts >= JobDB.max_attempts
+    ).update({
+        "status": "failed",
+        "error": "Lease expired on the last attempt",
+        "lease_expires_at": None,
+        "updated_at": now
+    }, synchronize_session=False)
+    if failed:
+        db.commit()
+    job = db.query(JobDB).filter(or_(
+        and_(JobDB.status == "queued", JobDB.run_after <= now),
+        and_(JobDB.status == "running", JobDB.lease_expires_at < now, JobDB.attempts < JobDB.max_attempts)
+    )).order_by(JobDB.created_at).first()
+    if not job:
+        return None
+    # Conditional update so two workers can never claim the same job
+    claimed = db.query(JobDB).filter(
+        JobDB.id == job.id,
+        JobDB.status == job.status,
+        JobDB.attempts == job.attempts
+    ).update({
+        "status": "running",
+        "attempts": job.attempts + 1,
+        "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+        "updated_at": now
+    }, synchronize_session=False)
+    db.commit()
+    if not claimed:
+        return None
+    db.refresh(job)
+    return job
+
+def skill_path_job_input(db, job):
+    """(payload, progress) of a planner job whose skill path still exists."""
+    if not db.query(SkillPathDB.id).filter_by(id=job.skill_path_id).first():
+        raise ValueError("Skill path no longer exists")
+    payload, progress = pyjson.loads(job.payload), pyjson.loads(job.progress or "{}")
+    release_connection(db)
+    return payload, progress
+
+def store_job_week(db, job, week_num, daily_tasks, week_start, progress):
+    # Replace the week's rows so a re-run never duplicates tasks
+    db.query(PlannerDB).filter_by(skill_path_id=job.skill_path_id, week=week_num).delete(synchronize_session=False)
+    db.bulk_insert_mappings(PlannerDB, planner_rows_for_week(job.skill_path_id, week_num, daily_tasks, week_start))
+    recount_path_progress(db, [job.skill_path_id])
+    progress[str(week_num)] = "complete"
+    job.progress = pyjson.dumps(progress)
+    job.updated_at = datetime.utcnow()
+    release_connection(db)
+
+async def run_skill_path_job(job, db):
+    payload, progress = await run_db(db, skill_path_job_input, job)
+    start_date = date.fromisoformat(payload["start_date"])
+    # Weeks finished by an earlier attempt are not regenerated
+    weeks = [w for w in payload["weeks"] if progress.get(str(w.get("week"))) != "complete"]
+    semaphore = asyncio.Semaphore(max(1, DAILY_TASKS_FANOUT))
+    # A session runs one operation at a time; weeks finishing together take turns
+    db_lock = asyncio.Lock()
+
+    async def run_week(week):
+        week_num = week.get("week")
+        daily_tasks = await generate_daily_tasks(week_num, week.get("goals", []), semaphore)
+        week_start = start_date + timedelta(weeks=week_num-1)
+        async with db_lock:
+            await run_db(db, store_job_week, job, week_num, daily_tasks, week_start, progress)
+
+    # Let every week settle before reporting a failure so no write races the rollback
+    results = await asyncio.gather(*[run_week(w) for w in weeks], return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        raise errors[0]
+
+JOB_HANDLERS = {
+    "skill_path_planner": run_skill_path_job,
+}
+
+def finish_job(db, job, error=None):
+    """Record a job's outcome; a failed attempt is queued for a retry until it was the last one."""
+    if error is None:
+        job.status = "complete"
+        job.error = None
+    else:
+        db.rollback()
+        print(f"Job {job.id} attempt {job.attempts} failed: {error}")
+        job.error = str(error)
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+        else:
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=JOB_RETRY_DELAY * job.attempts)
+    job.lease_expires_at = None
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+async def process_job(job, db):
+    # claim_next_job hands back a loaded job, so its kind is read without a query
+    error = None
+    try:
+        await JOB_HANDLERS[job.kind](job, db)
+    except Exception as e:
+        error = e
+    await run_db(db, finish_job, job, error)
+
+async def job_worker_loop():
+    while True:
+        job = None
+        try:
+            async with writer_session() as db:
+                job = await run_db(db, claim_next_job)
+                if job:
+                    await process_job(job, db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Job worker error: {e}")
+        if not job:
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+LINK_SWEEPER_ENABLED = os.getenv("LINK_SWEEPER_ENABLED", "1") != "0"
+_background_tasks = []
+
+@app.on_event("startup")
+async def start_background_workers():
+    if JOB_WORKER_ENABLED:
+        _background_tasks.append(asyncio.create_task(job_worker_loop()))
+    if LINK_SWEEPER_ENABLED:
+        # Revalidates stale URL liveness entries
+        _background_tasks.append(asyncio.create_task(link_checker.sweep_forever()))
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    for task in _background_tasks:
+        task.cancel()
+
+@app.get("/jobs/{id}")
+def get_job(id: str, user: UserDB = Depends(get_current_user), db: Session = Depends(get_read_db)):
+    job = db.query(JobDB).filter_by(id=id, user_id=user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    progress = pyjson.loads(job.progress or "{}")
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "skill_path_id": job.skill_path_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "progress": progress,
+        "weeks_complete": sum(1 for v in progress.values() if v == "complete"),
+        "weeks_total": len(progress),
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
+def owned_skill_path(db, id, user):
+    path = with_roadmap(db.query(SkillPathDB).filter_by(id=id, user_id=user.id)).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
     # Defensive: ensure data is valid JSON and has weeks as a list
     try:
-        data = pyjson.loads(str(path.data)) if path.data is not None else None
+        data = roadmap_data(path)
         if not data or not isinstance(data, dict) or "weeks" not in data or not isinstance(data["weeks"], list):
             data = {"weeks": []}
     except Exception:
@@ -397,14 +1176,17 @@ def get_skill_path(id: int, user: UserDB = Depends(get_current_user), db: Sessio
         "created_at": path.created_at
     }
 
+@app.get("/skill-paths/{id}")
+async def get_skill_path(id: int, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    return await run_db(db, owned_skill_path, id, user)
+
 class SkillPathUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     data: Optional[dict] = None
 
-@app.put("/skill-paths/{id}")
-def update_skill_path(id: int, body: SkillPathUpdate, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
-    path = db.query(SkillPathDB).filter_by(id=id, user_id=user.id).first()
+def apply_skill_path_update(db, id, body, user):
+    path = with_roadmap(db.query(SkillPathDB).filter_by(id=id, user_id=user.id)).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
     if body.title is not None:
@@ -412,26 +1194,36 @@ def update_skill_path(id: int, body: SkillPathUpdate, user: UserDB = Depends(get
     if body.description is not None:
         setattr(path, "description", body.description)
     if body.data is not None:
-        setattr(path, "data", pyjson.dumps(body.data))
-    db.commit()
-    db.refresh(path)
-    return {
+        set_roadmap(db, path, body.data)
+    # Built before the commit expires the freshly loaded weeks
+    result = {
         "id": path.id,
         "title": str(path.title),
         "description": str(path.description),
-        "data": pyjson.loads(str(path.data)) if path.data is not None else None,
+        "data": roadmap_data(path),
         "created_at": path.created_at
     }
+    db.commit()
+    return result
 
-@app.delete("/skill-paths/{id}")
-def delete_skill_path(id: int, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.put("/skill-paths/{id}")
+async def update_skill_path(id: int, body: SkillPathUpdate, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_db(db, apply_skill_path_update, id, body, user)
+
+def remove_skill_path(db, id, user):
     path = db.query(SkillPathDB).filter_by(id=id, user_id=user.id).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
+    db.query(PathProgressDB).filter_by(skill_path_id=path.id).delete(synchronize_session=False)
+    clear_roadmap_weeks(db, path.id)
     db.delete(path)
     db.commit()
     return {"message": "Skill path deleted"}
 
+@app.delete("/skill-paths/{id}")
+async def delete_skill_path(id: int, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_db(db, remove_skill_path, id, user)
+
 # --- Planner CRUD ---
 class PlannerTaskCreate(BaseModel):
     skill_path_id: int
@@ -445,8 +1237,7 @@ class PlannerTaskUpdate(BaseModel):
     due_date: Optional[date] = None
     rescheduled_to: Optional[date] = None
 
-@app.get("/planner")
-def get_planner(skill_path_id: int, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+def planner_tasks(db, skill_path_id, user):
     # Only allow access to user's own skill paths
     path = db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user.id).first()
     if not path:
@@ -462,8 +1253,11 @@ def get_planner(skill_path_id: int, user: UserDB = Depends(get_current_user), db
         } for t in tasks
     ]
 
-@app.get("/planner/week", response_model=List[dict])
-def get_weekly_tasks(date: date = Query(...), user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/planner")
+async def get_planner(skill_path_id: int, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    return await run_db(db, planner_tasks, skill_path_id, user)
+
+def weekly_tasks(db, date, user):
     # Get all tasks for the week containing the given date
     week_number = date.isocalendar()[1]
     tasks = db.query(PlannerDB).join(SkillPathDB).filter(
@@ -482,8 +1276,76 @@ def get_weekly_tasks(date: date = Query(...), user: UserDB = Depends(get_current
         } for t in tasks
     ]
 
-@app.post("/planner", response_model=dict)
-def create_planner_task(body: PlannerTaskCreate, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/planner/week", response_model=List[dict])
+async def get_weekly_tasks(date: date = Query(...), user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    return await run_db(db, weekly_tasks, date, user)
+
+# --- Planner calendar ---
+# GET /planner/range returns a user's tasks across all paths between two
+# dates, grouped by day. A task sits on rescheduled_to when set, else on its
+# due_date (PLANNER_DAY), and tasks without either are left out. Pages are
+# keyset-paginated on (day, id): next_cursor names the last task returned and
+# is passed back as `after`, so a year-long calendar loads page by page
+# without OFFSET scans. ix_planner_path_day orders a single path's tasks, not
+# the user's, so each path is read with its own LIMITed range seek and the
+# per-path pages are merged here. A day can continue on the next page;
+# clients merge entries with the same date.
+PLANNER_RANGE_PAGE = int(os.getenv("PLANNER_RANGE_PAGE", "200"))
+PLANNER_RANGE_PAGE_MAX = int(os.getenv("PLANNER_RANGE_PAGE_MAX", "1000"))
+
+def range_cursor(day, task_id):
+    return f"{day.isoformat()}:{task_id}"
+
+def parse_range_cursor(cursor):
+    day, sep, task_id = cursor.partition(":")
+    try:
+        if not sep:
+            raise ValueError(cursor)
+        return date.fromisoformat(day), int(task_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def planner_range(db, start, end, user, limit=PLANNER_RANGE_PAGE, after=None):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    cursor = parse_range_cursor(after) if after is not None else None
+    pages = []
+    for (path_id,) in db.query(SkillPathDB.id).filter(SkillPathDB.user_id == user.id).all():
+        query = db.query(PlannerDB, PLANNER_DAY).filter(
+            PlannerDB.skill_path_id == path_id,
+            PLANNER_DAY >= start,
+            PLANNER_DAY <= end
+        )
+        if cursor is not None:
+            after_day, after_id = cursor
+            query = query.filter(PLANNER_DAY >= after_day, or_(PLANNER_DAY > after_day, PlannerDB.id > after_id))
+        # One extra row tells whether another page follows
+        pages.append(query.order_by(PLANNER_DAY, PlannerDB.id).limit(limit + 1).all())
+    rows = list(itertools.islice(heapq.merge(*pages, key=lambda row: (row[1], row[0].id)), limit + 1))
+    more = len(rows) > limit
+    rows = rows[:limit]
+    days = []
+    for task, day in rows:
+        if not days or days[-1]["date"] != day:
+            days.append({"date": day, "tasks": []})
+        days[-1]["tasks"].append(planner_task_dict(task))
+    return {
+        "days": days,
+        "next_cursor": range_cursor(rows[-1][1], rows[-1][0].id) if more else None
+    }
+
+@app.get("/planner/range")
+async def get_planner_range(
+    start: date = Query(...),
+    end: date = Query(...),
+    limit: int = Query(PLANNER_RANGE_PAGE, ge=1, le=PLANNER_RANGE_PAGE_MAX),
+    after: Optional[str] = Query(None),  # next_cursor of the previous page
+    user: UserDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    return await run_db(db, planner_range, start, end, user, limit, after)
+
+def add_planner_task(db, body, user):
     # Only allow creating tasks for user's own skill paths
     path = db.query(SkillPathDB).filter_by(id=body.skill_path_id, user_id=user.id).first()
     if not path:
@@ -495,6 +1357,7 @@ def create_planner_task(body: PlannerTaskCreate, user: UserDB = Depends(get_curr
         due_date=body.due_date
     )
     db.add(task)
+    bump_path_progress(db, task.skill_path_id, added=task.status or "pending")
     db.commit()
     db.refresh(task)
     return {
@@ -508,16 +1371,21 @@ def create_planner_task(body: PlannerTaskCreate, user: UserDB = Depends(get_curr
     }
 
 
+@app.post("/planner")
+async def create_planner_task(body: PlannerTaskCreate, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_db(db, add_planner_task, body, user)
+
 # PATCH single planner task (existing logic)
-@app.patch("/planner/{id}", response_model=dict)
-def patch_planner_task(id: int, body: PlannerTaskUpdate, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+def apply_planner_task_update(db, id, body, user):
     task = db.query(PlannerDB).join(SkillPathDB).filter(PlannerDB.id==id, SkillPathDB.user_id==user.id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    old_status = task.status
     if body.description is not None:
         setattr(task, "description", body.description)
     if body.status is not None:
         setattr(task, "status", body.status)
+        bump_path_progress(db, task.skill_path_id, removed=old_status, added=body.status)
     if body.due_date is not None:
         setattr(task, "due_date", body.due_date)
     if body.rescheduled_to is not None:
@@ -527,21 +1395,15 @@ def patch_planner_task(id: int, body: PlannerTaskUpdate, user: UserDB = Depends(
 
     # Automatically update user progress if task is marked complete
     if body.status == "complete":
+        # Refresh the path's quiz question bank in the background
+        enqueue_quiz_bank_job(db, user.id, task.skill_path_id)
         skill_path = db.query(SkillPathDB).filter_by(id=task.skill_path_id).first()
         if skill_path:
-            skill_tag = skill_path.title
-            progress = db.query(UserProgress).filter_by(user_id=user.id).first()
-            if progress:
-                # Parse current_skills from JSON string
-                current_skills = pyjson.loads(progress.current_skills) if progress.current_skills else []
-                if skill_tag not in current_skills:
-                    current_skills.append(skill_tag)
-                    progress.current_skills = pyjson.dumps(current_skills)
-                    progress.updated_at = datetime.utcnow()
-            else:
-                progress = UserProgress(user_id=user.id, current_skills=pyjson.dumps([skill_tag]))
-                db.add(progress)
+            add_current_skills(db, user.id, [skill_path.title])
             db.commit()
+    return planner_task_dict(task)
+
+def planner_task_dict(task):
     return {
         "id": task.id,
         "skill_path_id": task.skill_path_id,
@@ -552,68 +1414,166 @@ def patch_planner_task(id: int, body: PlannerTaskUpdate, user: UserDB = Depends(
         "rescheduled_to": task.rescheduled_to
     }
 
+def add_current_skills(db, user_id, skill_tags):
+    """Record skills the user has started on in their UserProgress row (not committed)."""
+    progress = db.query(UserProgress).filter_by(user_id=user_id).first()
+    if progress:
+        # Parse current_skills from JSON string
+        current_skills = pyjson.loads(progress.current_skills) if progress.current_skills else []
+        new_skills = [tag for tag in skill_tags if tag not in current_skills]
+        if new_skills:
+            progress.current_skills = pyjson.dumps(current_skills + new_skills)
+            progress.updated_at = datetime.utcnow()
+    else:
+        progress = UserProgress(user_id=user_id, current_skills=pyjson.dumps(list(skill_tags)))
+        db.add(progress)
+
+# --- Batch planner updates ---
+# The dashboard ticks off many tasks at once. PATCH /planner/batch checks
+# ownership for the whole batch in one query, writes tasks that receive the
+# same values with one UPDATE, sums the counter changes per path and runs the
+# completion side effects (quiz bank refresh, UserProgress) once, all in a
+# single transaction.
+PLANNER_BATCH_MAX = int(os.getenv("PLANNER_BATCH_MAX", "500"))
+PLANNER_UPDATE_FIELDS = ("description", "status", "due_date", "rescheduled_to")
+
+class PlannerTaskBatchUpdate(PlannerTaskUpdate):
+    id: int
+
+class PlannerBatchRequest(BaseModel):
+    updates: List[PlannerTaskBatchUpdate] = Field(..., max_length=PLANNER_BATCH_MAX)
+
+def apply_planner_batch(db, updates, user):
+    """Apply task updates in one transaction; returns one result per update, in request order."""
+    ids = {u.id for u in updates}
+    current = {
+        task_id: (path_id, status)
+        for task_id, path_id, status in db.query(PlannerDB.id, PlannerDB.skill_path_id, PlannerDB.status).join(SkillPathDB).filter(
+            PlannerDB.id.in_(ids), SkillPathDB.user_id == user.id
+        ).all()
+    } if ids else {}
+    # Several updates to one task merge in order, later values winning
+    changes = {}
+    for u in updates:
+        if u.id in current:
+            changes.setdefault(u.id, {}).update(
+                {field: getattr(u, field) for field in PLANNER_UPDATE_FIELDS if getattr(u, field) is not None}
+            )
+    groups = {}
+    for task_id, values in changes.items():
+        if values:
+            groups.setdefault(tuple(sorted(values.items())), []).append(task_id)
+    for values, task_ids in groups.items():
+        db.query(PlannerDB).filter(PlannerDB.id.in_(task_ids)).update(dict(values), synchronize_session=False)
+
+    deltas = {}
+    for task_id, values in changes.items():
+        if "status" in values:
+            path_id, old_status = current[task_id]
+            progress_delta(old_status, values["status"], into=deltas.setdefault(path_id, {}))
+    for path_id, delta in deltas.items():
+        bump_path_progress(db, path_id, delta=delta)
+
+    completed_paths = {current[task_id][0] for task_id, values in changes.items() if values.get("status") == "complete"}
+    if completed_paths:
+        for path_id in sorted(completed_paths):
+            enqueue_quiz_bank_job(db, user.id, path_id, commit=False)
+        titles = [title for (title,) in db.query(SkillPathDB.title).filter(SkillPathDB.id.in_(completed_paths)).order_by(SkillPathDB.id)]
+        add_current_skills(db, user.id, titles)
+    db.commit()
+
+    tasks = {t.id: t for t in db.query(PlannerDB).filter(PlannerDB.id.in_(changes)).all()} if changes else {}
+    results = []
+    for u in updates:
+        task = tasks.get(u.id)
+        if task is None:
+            results.append({"id": u.id, "ok": False, "status_code": 404, "detail": "Task not found"})
+        else:
+            results.append({"id": u.id, "ok": True, "task": planner_task_dict(task)})
+    return {"updated": len(tasks), "results": results}
+
+# Declared before /planner/{id} so "batch" isn't parsed as a task id
+@app.patch("/planner/batch")
+async def patch_planner_tasks(body: PlannerBatchRequest, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_db(db, apply_planner_batch, body.updates, user)
+
+@app.patch("/planner/{id}")
+async def patch_planner_task(id: int, body: PlannerTaskUpdate, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_db(db, apply_planner_task_update, id, body, user)
+
 # --- Batch shift endpoint for pending tasks in current week ---
 from pydantic import conint
 
 class ShiftPendingTasksRequest(BaseModel):
     skill_path_id: int
     week: conint(ge=1)
+    per_day: Optional[conint(ge=1)] = None  # defaults to SCHEDULE_DAILY_CAPACITY
 
-@app.post("/planner/shift_pending", response_model=dict)
-def shift_pending_tasks(
-    body: ShiftPendingTasksRequest = Body(...),
-    user: UserDB = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+def open_task_load(db, user_id, start, per_day=None):
+    """{due_date: open tasks} across the user's paths, for days from `start` on.
+
+    Empty unless a capacity was set (per_day or SCHEDULE_DAILY_CAPACITY), so the
+    default keeps the one-task-per-day spacing whatever other paths have due.
+    """
+    if not (per_day or SCHEDULE_CAPACITY_SET):
+        return {}
+    return dict(db.query(PlannerDB.due_date, func.count(PlannerDB.id)).join(SkillPathDB).filter(
+        SkillPathDB.user_id == user_id,
+        PlannerDB.status != "complete",
+        PlannerDB.due_date >= start
+    ).group_by(PlannerDB.due_date).all())
+
+def shift_week_pending(db, body, user):
     # Only allow shifting for user's own skill path
     path = db.query(SkillPathDB).filter_by(id=body.skill_path_id, user_id=user.id).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
-    # Get all tasks for the week
-    week_tasks = db.query(PlannerDB).filter_by(skill_path_id=body.skill_path_id, week=body.week).all()
+    week_tasks = db.query(PlannerDB.id, PlannerDB.status).filter_by(
+        skill_path_id=body.skill_path_id, week=body.week
+    ).order_by(PlannerDB.id).all()
     if not week_tasks:
         return {"shifted": 0, "message": "No tasks found for this week."}
     # Only shift incomplete (not 'complete') tasks
-    pending_tasks = [t for t in week_tasks if t.status != 'complete']
-    if not pending_tasks:
+    pending_ids = [task_id for task_id, status in week_tasks if status != 'complete']
+    if not pending_ids:
         return {"shifted": 0, "message": "All tasks in the current week are complete. No pending tasks to shift."}
-    # Find the latest due_date among all tasks in this skill path
-    all_tasks = db.query(PlannerDB).filter_by(skill_path_id=body.skill_path_id).all()
-    latest_due = None
-    for t in all_tasks:
-        if t.due_date and (latest_due is None or t.due_date > latest_due):
-            latest_due = t.due_date
-    if not latest_due:
-        latest_due = date.today()
-    # Shift each pending task to the next available day
-    shifted = 0
-    for t in pending_tasks:
-        latest_due = latest_due + timedelta(days=1)
-        t.due_date = latest_due
-        db.add(t)
+    # Pending tasks move to the days after the path's latest due date
+    latest_due = db.query(func.max(PlannerDB.due_date)).filter(PlannerDB.skill_path_id == body.skill_path_id).scalar()
+    start = (latest_due or date.today()) + timedelta(days=1)
+    dates = spread_dates(len(pending_ids), start, body.per_day or SCHEDULE_DAILY_CAPACITY, open_task_load(db, user.id, start, body.per_day))
+    shifted = apply_dates(db, PlannerDB, pending_ids, dates)
     db.commit()
     return {"shifted": shifted, "message": f"Shifted {shifted} pending tasks to future dates."}
 
-@app.delete("/planner/{id}")
-def delete_planner_task(id: int, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+@app.post("/planner/shift_pending")
+async def shift_pending_tasks(
+    body: ShiftPendingTasksRequest = Body(...),
+    user: UserDB = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await run_db(db, shift_week_pending, body, user)
+
+def remove_planner_task(db, id, user):
     task = db.query(PlannerDB).join(SkillPathDB).filter(PlannerDB.id==id, SkillPathDB.user_id==user.id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     db.delete(task)
+    bump_path_progress(db, task.skill_path_id, removed=task.status)
     db.commit()
     return {"message": "Task deleted"}
 
+@app.delete("/planner/{id}")
+async def delete_planner_task(id: int, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    return await run_db(db, remove_planner_task, id, user)
+
 # --- Progress Analytics ---
-@app.get("/analytics")
-def get_analytics(skill_path_id: int, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
+def path_analytics(db, skill_path_id, user):
     # Only allow access to user's own skill paths
     path = db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user.id).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
-    total = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id).scalar()
-    completed = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id, status="complete").scalar()
-    pending = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id, status="pending").scalar()
-    deferred = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id, status="deferred").scalar()
+    counters = path_progress_map(db, [skill_path_id])[skill_path_id]
+    total, completed, pending, deferred = counters.total, counters.complete, counters.pending, counters.deferred
     percent_complete = (completed / total * 100) if total else 0
     # Dummy time spent (could be tracked per task in future)
     time_spent = completed * 2  # e.g., 2 hours per completed task
@@ -626,16 +1586,24 @@ def get_analytics(skill_path_id: int, user: UserDB = Depends(get_current_user),
         "time_spent_hours": time_spent
     }
 
-@app.get("/analytics/suggestions")
-def get_analytics_suggestions(skill_path_id: int, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
-    # Get analytics data
+@app.get("/analytics")
+async def get_analytics(skill_path_id: int, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    return await run_db(db, path_analytics, skill_path_id, user)
+
+def path_counters(db, skill_path_id, user):
     path = db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user.id).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
-    total = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id).scalar()
-    completed = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id, status="complete").scalar()
-    pending = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id, status="pending").scalar()
-    deferred = db.query(func.count()).select_from(PlannerDB).filter_by(skill_path_id=skill_path_id, status="deferred").scalar()
+    counters = path_progress_map(db, [skill_path_id])[skill_path_id]
+    # Nothing else to read; the LLM call below shouldn't hold the connection
+    release_connection(db)
+    return counters
+
+@app.get("/analytics/suggestions")
+async def get_analytics_suggestions(skill_path_id: int, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    # Get analytics data
+    counters = await run_db(db, path_counters, skill_path_id, user)
+    total, completed, pending, deferred = counters.total, counters.complete, counters.pending, counters.deferred
     percent_complete = (completed / total * 100) if total else 0
     time_spent = completed * 2  # e.g., 2 hours per completed task
 
@@ -645,199 +1613,107 @@ def get_analytics_suggestions(skill_path_id: int, user: UserDB = Depends(get_cur
         f"{percent_complete:.1f}% complete, {time_spent} hours spent. "
         "Give me 3 specific, actionable suggestions to improve my learning progress."
     )
-    api_key = os.getenv("GROQ_API_KEY")
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": "You are an expert learning coach."},
-            {"role": "user", "content": prompt}
-        ],
-        "max_tokens": 300,
-        "temperature": 0.7
-    }
+    messages = [
+        {"role": "system", "content": "You are an expert learning coach."},
+        {"role": "user", "content": prompt}
+    ]
     try:
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=30
-        )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"]
+        content = await call_groq(messages, model="llama-3.3-70b-versatile", max_tokens=300, timeout=30, site="suggestions")
         return {"suggestions": content}
     except Exception as e:
         return {"suggestions": [], "error": str(e)}
 
-def is_resource_available(url):
-    """Check if a resource URL is available (YouTube: oEmbed API + HTML, playlists: HTML, others: status 200 and not a known error page)."""
+# --- Resource Library ---
+async def available_only(resources):
+    """Drop resources whose link is known to be dead (answered from the liveness store when fresh)."""
+    if not resources:
+        return []
+    available = await link_checker.check_all([r["url"] for r in resources])
+    return [r for r in resources if available.get(r["url"])]
+
+async def catalog_search(topic):
+    return await available_only(await asyncio.to_thread(resource_catalog.search, topic))
+
+async def catalog_search_grouped(topic):
+    grouped = await asyncio.to_thread(resource_catalog.search_grouped, topic)
+    alive = {r["url"] for r in await available_only([r for hits in grouped.values() for r in hits])}
+    return {category: [r for r in hits if r["url"] in alive] for category, hits in grouped.items()}
+
+def catalog_is_sufficient(grouped):
+    # Enough well-rated hits overall, and the core categories are all covered
+    total = sum(len(hits) for hits in grouped.values())
+    return total >= CATALOG_MIN_HITS and all(grouped[c] for c in ("videos", "articles", "courses"))
+
+_ingest_tasks = set()
+
+async def ingest_validated_resources(topic, grouped):
+    """Validate categorized LLM resources and add the live ones to the catalog."""
     try:
-        import urllib.parse
-        # YouTube playlist check
-        if ("youtube.com/playlist?list=" in url):
-            resp = requests.get(url, timeout=5)
-            html = resp.text.lower()
-            playlist_error_phrases = [
-                "this playlist does not exist",
-                "playlist unavailable",
-                "this playlist is private",
-                "no videos found"
-            ]
-            for phrase in playlist_error_phrases:
-                if phrase in html:
-                    print(f"YouTube playlist unavailable: {url}")
-                    return False
-            if len(html.strip()) < 100:
-                print(f"YouTube playlist very short/empty: {url}")
-                return False
-            return True
-        # YouTube video check via oEmbed API and HTML fallback
-        if ("youtube.com/watch" in url or "youtu.be/" in url):
-            # Normalize to full YouTube URL
-            if "youtu.be/" in url:
-                video_id = url.split("youtu.be/")[-1].split("?")[0]
-                yt_url = f"https://www.youtube.com/watch?v={video_id}"
-            else:
-                # Extract video_id from v= param if present
-                parsed = urllib.parse.urlparse(url)
-                query = urllib.parse.parse_qs(parsed.query)
-                video_id = query.get("v", [None])[0]
-                if video_id:
-                    yt_url = f"https://www.youtube.com/watch?v={video_id}"
-                else:
-                    yt_url = url
-            oembed_url = f"https://www.youtube.com/oembed?url={urllib.parse.quote(yt_url)}&format=json"
-            resp = requests.get(oembed_url, timeout=5)
-            if resp.status_code == 200:
-                return True
-            # Fallback: check HTML for error phrases
-            resp2 = requests.get(yt_url, timeout=5)
-            html = resp2.text.lower()
-            yt_error_phrases = [
-                "this video isn't available anymore",
-                "video unavailable",
-                "this video is private",
-                "has been removed",
-                "is not available in your country"
-            ]
-            for phrase in yt_error_phrases:
-                if phrase in html:
-                    print(f"YouTube unavailable: {url}")
-                    return False
-            if len(html.strip()) < 100:
-                print(f"YouTube very short/empty: {url}")
-                return False
-            return True
-        # Other resources: check status and HTML content
-        resp = requests.get(url, timeout=5)
-        if resp.status_code != 200:
-            print(f"Resource not 200: {url}")
-            return False
-        # Check for common and platform-specific error phrases in the HTML (case-insensitive, partial match)
-        error_phrases = [
-            # Generic
-            "not found", "404", "unavailable", "error", "page not found", "does not exist", "removed", "private",
-            # Coursera
-            "course not found", "page not found", "this course is no longer available", "enrollments are closed", "we were not able to find the page you're looking for.",
-            # Udemy
-            "course not found", "sorry, this course is no longer available", "this course is unavailable", "udemy.com home page",
-            # Amazon
-            "currently unavailable", "the web address you entered is not a functioning page", "out of print", "no longer available", "looking for something? we're sorry. the web address you entered is not a functioning page on our site"
-        ]
-        html = resp.text.lower()
-        if len(html.strip()) < 100:
-            print(f"Resource very short/empty: {url}")
-            return False  # Very short/empty page
-        for phrase in error_phrases:
-            if phrase in html:
-                print(f"Resource error phrase '{phrase}' found: {url}")
-                return False
-        return True
+        for category, resources in grouped.items():
+            live = await available_only([r for r in resources if r.get("url")])
+            await asyncio.to_thread(resource_catalog.add, topic, live, category)
     except Exception as e:
-        print(f"Resource check exception for {url}: {e}")
-        return False
+        print("Resource catalog ingest error:", e)
+
+def schedule_resource_ingest(topic, grouped):
+    # Runs after the response is sent so link checks don't add latency
+    task = asyncio.create_task(ingest_validated_resources(topic, grouped))
+    _ingest_tasks.add(task)
+    task.add_done_callback(_ingest_tasks.discard)
 
-# --- Resource Library ---
 @app.get("/resources")
-def get_resources(topic: Optional[str] = None):
-    import os, requests
-    api_key = os.getenv("GROQ_API_KEY")
+async def get_resources(topic: Optional[str] = None):
     if not topic or not topic.strip():
         return {"resources": []}
+    topic = topic.strip()
+    cached = []
+    try:
+        cached = await catalog_search(topic)
+    except Exception as e:
+        print("Resource catalog error:", e)
+    if len(cached) >= CATALOG_MIN_HITS:
+        return {"resources": cached}
     prompt = (
         f"List the best online resources (courses, videos, articles) for learning {topic}. "
         "Include links from Udemy, YouTube, Coursera, freeCodeCamp, and other reputable sites. "
         "For each, provide: title, url, type (Free/Paid), difficulty, and platform. "
         "Respond in JSON as [{\"title\":..., \"url\":..., \"type\":..., \"difficulty\":..., \"platform\":...}]."
     )
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": "You are an expert learning resource recommender."},
-            {"role": "user", "content": prompt}
-        ],
-        "max_tokens": 800,
-        "temperature": 0.7
-    }
+    messages = [
+        {"role": "system", "content": "You are an expert learning resource recommender."},
+        {"role": "user", "content": prompt}
+    ]
     try:
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=60
-        )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"]
-        # Try to extract JSON from markdown/code block if present
-        match = re.search(r"```json\s*(.*?)```", content, re.DOTALL)
-        if match:
-            json_str = match.group(1)
-        else:
-            # Try to find first [ ... ] block
-            match = re.search(r"(\[\s*{.*?}\s*\])", content, re.DOTALL)
-            if match:
-                json_str = match.group(1)
-            else:
-                json_str = content
-        try:
-            resources = json.loads(json_str)
-        except Exception:
-            # Try to fix common JSON issues (single quotes, trailing commas)
-            json_str_fixed = json_str.replace("'", '"')
-            json_str_fixed = re.sub(r",\s*}", "}", json_str_fixed)
-            json_str_fixed = re.sub(r",\s*]", "]", json_str_fixed)
-            resources = json.loads(json_str_fixed)
+        resources = await call_groq_json(messages, model="llama-3.3-70b-versatile", max_tokens=800, timeout=60, site="resources")
         # Ensure it's a list of dicts with required keys
         if not isinstance(resources, list):
             resources = []
         else:
-            filtered = []
-            for r in resources:
-                if isinstance(r, dict) and "title" in r and "url" in r:
-                    # Filter out unavailable resource links (all platforms)
-                    if is_resource_available(r["url"]):
-                        filtered.append(r)
-            resources = filtered
-        return {"resources": resources}
+            candidates = [r for r in resources if isinstance(r, dict) and "title" in r and "url" in r]
+            # Filter out unavailable resource links (all platforms), checked concurrently;
+            # links still unconfirmed at the deadline are left out
+            resources = await available_only(candidates)
+            await asyncio.to_thread(resource_catalog.add, topic, resources)
+        return {"resources": merge_resources(cached, resources, CATALOG_RESULT_LIMIT)}
     except Exception as e:
         print("Resource fetch error:", e)
-        return {"resources": [], "error": str(e)}
+        return {"resources": cached, "error": str(e)}
+
+@app.get("/resources/link-stats")
+def get_link_stats():
+    return link_checker.stats()
+
+@app.get("/resources/catalog/stats")
+def get_resource_catalog_stats():
+    return resource_catalog.stats()
 
 # --- Export & Account ---
 @app.get("/export")
-def export_roadmap(skill_path_id: int, format: str = "pdf", user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
-    path = db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user.id).first()
+def export_roadmap(skill_path_id: int, format: str = "pdf", user: UserDB = Depends(get_current_user), db: Session = Depends(get_read_db)):
+    path = with_roadmap(db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user.id)).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
-    data = path.data
-    roadmap = pyjson.loads(str(data)) if data is not None else {}
+    roadmap = roadmap_data(path) or {}
     if format == "csv":
         output = io.StringIO()
         writer = csv.writer(output)
@@ -887,10 +1763,14 @@ def export_roadmap(skill_path_id: int, format: str = "pdf", user: UserDB = Depen
         pdf_output = io.BytesIO(pdf.output(dest='S').encode('latin1'))
         return StreamingResponse(pdf_output, media_type="application/pdf", headers={"Content-Disposition": f"attachment; filename=roadmap_{skill_path_id}.pdf"})
 
-@app.delete("/user/delete")
-def delete_account(user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
-    db.delete(user)
+def delete_user(db, user_id):
+    # user was loaded by get_current_user's session; delete this session's copy
+    db.delete(db.get(UserDB, user_id))
     db.commit()
+
+@app.delete("/user/delete")
+async def delete_account(user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    await run_db(db, delete_user, user.id)
     return {"message": "Account and all data deleted"}
 
 @app.get("/")
@@ -930,15 +1810,20 @@ class RegisterRequest(BaseModel):
     password: str
     name: Optional[str] = None
 
-@app.post("/auth/register")
-def register_user(body: RegisterRequest, db: Session = Depends(get_db)):
-    if db.query(UserDB).filter_by(email=body.email).first():
+def create_password_user(db, email, password_hash, name):
+    if db.query(UserDB).filter_by(email=email).first():
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed = bcrypt.hashpw(body.password.encode(), bcrypt.gensalt()).decode()
-    user = UserDB(email=body.email, password_hash=hashed, name=body.name)
+    user = UserDB(email=email, password_hash=password_hash, name=name)
     db.add(user)
     db.commit()
     db.refresh(user)
+    return user
+
+@app.post("/auth/register")
+async def register_user(body: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
+    # bcrypt is deliberately slow; hash off the event loop
+    hashed = (await run_in_threadpool(bcrypt.hashpw, body.password.encode(), bcrypt.gensalt())).decode()
+    user = await run_db(db, create_password_user, body.email, hashed, body.name)
     token = create_access_token({"user_id": user.id, "email": user.email})
     return {"access_token": token, "user": {"id": user.id, "email": user.email, "name": user.name}}
 
@@ -948,48 +1833,36 @@ class LoginRequest(BaseModel):
     password: str
 
 @app.post("/auth/login")
-def login_user(body: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(UserDB).filter_by(email=body.email).first()
+async def login_user(body: LoginRequest, db: AsyncSession = Depends(get_async_read_db)):
+    user = await run_db(db, lambda db: db.query(UserDB).filter_by(email=body.email).first())
     if not user or not user.password_hash:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    if not bcrypt.checkpw(body.password.encode(), user.password_hash.encode()):
+    if not await run_in_threadpool(bcrypt.checkpw, body.password.encode(), user.password_hash.encode()):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = create_access_token({"user_id": user.id, "email": user.email})
     return {"access_token": token, "user": {"id": user.id, "email": user.email, "name": user.name}}
 
-@app.post("/planner/generate-from-skill-path/{skill_path_id}")
-def generate_weekly_plan(skill_path_id: int, user: UserDB = Depends(get_current_user), db: Session = Depends(get_db)):
-    path = db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user.id).first()
+def owned_roadmap(db, skill_path_id, user_id):
+    path = with_roadmap(db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user_id)).first()
     if not path:
         raise HTTPException(status_code=404, detail="Skill path not found")
-    roadmap = pyjson.loads(str(path.data)) if path.data is not None else {}
+    roadmap = roadmap_data(path) or {}
+    release_connection(db)
+    return roadmap
+
+@app.post("/planner/generate-from-skill-path/{skill_path_id}")
+async def generate_weekly_plan(skill_path_id: int, user: UserDB = Depends(get_current_user), db: AsyncSession = Depends(get_async_read_db)):
+    roadmap = await run_db(db, owned_roadmap, skill_path_id, user.id)
     # Optionally, enhance with Groq
     prompt = (
         f"Given this skill path roadmap: {roadmap}, generate a detailed weekly planner with actionable tasks for each week. Respond in JSON as: [{{week, goals: [..]}}]"
     )
-    api_key = os.getenv("GROQ_API_KEY")
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": "You are an expert learning coach."},
-            {"role": "user", "content": prompt}
-        ],
-        "max_tokens": 800,
-        "temperature": 0.7
-    }
+    messages = [
+        {"role": "system", "content": "You are an expert learning coach."},
+        {"role": "user", "content": prompt}
+    ]
     try:
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=30
-        )
-        response.raise_for_status()
-        content = response.json()["choices"][0]["message"]["content"]
+        content = await call_groq(messages, model="llama-3.3-70b-versatile", max_tokens=800, timeout=30, site="weekly_plan")
         weekly_plan = pyjson.loads(content)
         return {"weekly_plan": weekly_plan}
     except Exception as e:
@@ -1003,24 +1876,45 @@ class RegenerateWeekRequest(BaseModel):
     week: int
     mode: str  # "deeper" or "easier"
 
+def owned_roadmap_week(db, skill_path_id, week, user_id):
+    """(path, week_row, week dict) for one week of the user's roadmap; the rows stay loaded."""
+    path = db.query(SkillPathDB).filter_by(id=skill_path_id, user_id=user_id).first()
+    if not path:
+        raise HTTPException(status_code=404, detail="Skill path not found")
+    week_row = db.query(RoadmapWeekDB).filter_by(skill_path_id=path.id, week=week).order_by(RoadmapWeekDB.position).first()
+    if not week_row:
+        raise HTTPException(status_code=404, detail="Week not found in roadmap")
+    week_obj = roadmap_week_dict(week_row)
+    release_connection(db)
+    return path, week_row, week_obj
+
+def store_regenerated_week(db, path_id, week_row, week, new_goals, daily_tasks):
+    # Update roadmap in DB: only this week's goal rows change
+    db.query(RoadmapGoalDB).filter_by(week_id=week_row.id).delete(synchronize_session=False)
+    db.bulk_insert_mappings(RoadmapGoalDB, [
+        {"week_id": week_row.id, "position": i, "content": pyjson.dumps(goal)} for i, goal in enumerate(new_goals)
+    ])
+    # A goals value that wasn't a list was kept in `extra`; the new list replaces it
+    extra = pyjson.loads(week_row.extra) if week_row.extra is not None else {}
+    if isinstance(extra, dict) and "goals" in extra:
+        del extra["goals"]
+        week_row.extra = pyjson.dumps(extra) if extra else None
+    # Remove old planner tasks for this week (same transaction, so roadmap and planner change together)
+    db.query(PlannerDB).filter_by(skill_path_id=path_id, week=week).delete(synchronize_session=False)
+    # Recreate planner tasks for the week (distribute new goals over 7 days)
+    start_date = date.today() + timedelta(weeks=week-1)
+    db.bulk_insert_mappings(PlannerDB, planner_rows_for_week(path_id, week, daily_tasks, start_date))
+    recount_path_progress(db, [path_id])
+    db.commit()
+
 @app.post("/planner/regenerate_week")
-def regenerate_week(
+async def regenerate_week(
     body: RegenerateWeekRequest = Body(...),
     user: UserDB = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Fetch the skill path and week data
-    path = db.query(SkillPathDB).filter_by(id=body.skill_path_id, user_id=user.id).first()
-    if not path:
-        raise HTTPException(status_code=404, detail="Skill path not found")
-    roadmap = pyjson.loads(str(path.data)) if path.data is not None else {}
-    week_obj = None
-    for w in roadmap.get("weeks", []):
-        if w.get("week") == body.week:
-            week_obj = w
-            break
-    if not week_obj:
-        raise HTTPException(status_code=404, detail="Week not found in roadmap")
+    path, week_row, week_obj = await run_db(db, owned_roadmap_week, body.skill_path_id, body.week, user.id)
     # Compose prompt for Groq
     if body.mode == "deeper":
         prompt = (
@@ -1037,130 +1931,19 @@ def regenerate_week(
         {"role": "user", "content": prompt}
     ]
     try:
-        content = call_groq(messages, model="llama-3.3-70b-versatile")
-        new_goals = parse_json_from_response(content)
+        new_goals = await call_groq_json(messages, model="llama-3.3-70b-versatile", site="regenerate_week")
         if not isinstance(new_goals, list):
             raise Exception("AI did not return a list")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Groq error: {str(e)}")
-    # Update roadmap in DB
-    for w in roadmap.get("weeks", []):
-        if w.get("week") == body.week:
-            w["goals"] = new_goals
-    path.data = pyjson.dumps(roadmap)
-    db.commit()
-    # Remove old planner tasks for this week
-    db.query(PlannerDB).filter_by(skill_path_id=path.id, week=body.week).delete()
-    # Recreate planner tasks for the week (distribute new goals over 7 days)
-    start_date = date.today() + timedelta(weeks=body.week-1)
-    # Use AI to break down into 7 daily tasks
-    prompt = (
-        f"Given these goals for Week {body.week}: {new_goals}, break them down into 7 daily tasks (one for each day, Monday to Sunday). "
-        "Respond as a JSON list of 7 strings."
-    )
-    messages = [
-        {"role": "system", "content": "You are an expert learning coach."},
-        {"role": "user", "content": prompt}
-    ]
-    try:
-        content = call_groq(messages, model="llama-3.3-70b-versatile")
-        daily_tasks = parse_json_from_response(content)
-        if not isinstance(daily_tasks, list) or len(daily_tasks) != 7:
-            raise Exception("AI did not return 7 daily tasks")
-    except Exception:
-        # fallback: repeat goals
-        daily_tasks = []
-        for i in range(7):
-            daily_tasks.append(new_goals[i % len(new_goals)] if new_goals else f"Task {i+1}")
-    for i, daily_task in enumerate(daily_tasks):
-        due_date = start_date + timedelta(days=i)
-        task = PlannerDB(
-            skill_path_id=path.id,
-            week=body.week,
-            description=daily_task,
-            due_date=due_date
-        )
-        db.add(task)
-    db.commit()
+    # Generate the daily tasks before touching the database, so no write lock is held across the LLM call
+    daily_tasks = await generate_daily_tasks(body.week, new_goals)
+    await run_db(db, store_regenerated_week, path.id, week_row, body.week, new_goals, daily_tasks)
     return {"week": body.week, "new_goals": new_goals}
 
 from fastapi import APIRouter
 api_router = APIRouter()
 
-def clean_json_string(json_str):
-    import re
-    # Remove markdown code block markers
-    json_str = re.sub(r"^```json|```$", "", json_str, flags=re.MULTILINE).strip()
-    # Replace single quotes with double quotes
-    json_str = json_str.replace("'", '"')
-    # Remove trailing commas before } or ]
-    json_str = re.sub(r",\s*([}\]])", r"\1", json_str)
-    # Insert missing commas between objects in arrays
-    json_str = re.sub(r"}(\s*){", r"},\1{", json_str)
-    # Remove newlines between objects in arrays
-    json_str = re.sub(r"]\s*\[", "], [", json_str)
-    # Remove any double commas
-    json_str = re.sub(r",\s*,", ",", json_str)
-    # Remove any comma before closing array
-    json_str = re.sub(r",\s*]", "]", json_str)
-    return json_str
-
-def truncate_to_last_complete_json(json_str):
-    # Find the last closing curly or square bracket
-    last_curly = json_str.rfind('}')
-    last_square = json_str.rfind(']')
-    last = max(last_curly, last_square)
-    if last != -1:
-        return json_str[:last+1], (last != len(json_str)-1)
-    return json_str, False
-
-def remove_incomplete_objects(json_str):
-    import re
-    # Always remove the last object in each array, regardless of completeness
-    def fix_array(match):
-        arr = match.group(0)
-        # Find all objects in the array
-        objects = list(re.finditer(r'\{[^\}]*\}', arr))
-        if len(objects) > 1:
-            # Remove the last object
-            last_obj = objects[-1]
-            arr = arr[:last_obj.start()] + ']'  # Remove from last object to end, close array
-            # Remove any trailing comma
-            arr = re.sub(r',\s*]', ']', arr)
-        return arr
-    # Apply to all arrays in the JSON string
-    json_str = re.sub(r'\[[^\]]*\]', fix_array, json_str, flags=re.MULTILINE)
-    return json_str
-
-def extract_valid_objects(json_str):
-    import re
-    # For each array, extract all valid {...} objects and reconstruct the array
-    def fix_array(match):
-        arr = match.group(0)
-        objs = re.findall(r'\{[^\{\}]*\}', arr)
-        return '[' + ','.join(objs) + ']'
-    # Replace each array with only its valid objects
-    json_str = re.sub(r'\[[^\]]*\]', fix_array, json_str)
-    return json_str
-
-def fallback_parse_arrays(json_str):
-    import re
-    import json
-    arrays = {}
-    for key in ['videos', 'video_tutorials', 'articles', 'courses', 'online_courses', 'books', 'tools']:
-        match = re.search(rf'"{key}"\s*:\s*(\[[^\]]*\])', json_str)
-        if match:
-            arr_str = match.group(1)
-            try:
-                arr = json.loads(arr_str)
-                arrays[key] = arr
-            except Exception:
-                arrays[key] = []
-        else:
-            arrays[key] = []
-    arrays['error'] = "Partial results: failed to parse full response, but some arrays were recovered."
-    return arrays
-
 @api_router.post("/get-resources")
 async def get_resources_api(request: Request):
     try:
@@ -1178,6 +1961,22 @@ async def get_resources_api(request: Request):
                 'tools': [],
                 'error': 'Missing required field: topic'
             })
+        default_resources = {
+            'videos': [],
+            'video_tutorials': [],
+            'articles': [],
+            'courses': [],
+            'online_courses': [],
+            'books': [],
+            'tools': []
+        }
+        cached = {}
+        try:
+            cached = await catalog_search_grouped(topic)
+        except Exception as e:
+            print("Resource catalog error:", e)
+        if cached and catalog_is_sufficient(cached):
+            return {**default_resources, **cached}
         # Prompt for platform-agnostic, ranked resources (no learning style)
         prompt = f"""
 For the topic '{topic}', curate and rank the best resources from across the entire internet. Include:
@@ -1196,68 +1995,35 @@ For each resource, provide: title, url, type (Free/Paid), platform/source, and a
 }}
 Respond in JSON only.
 """
-        api_key = os.getenv("GROQ_API_KEY")
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        data_groq = {
-            "model": "llama-3.3-70b-versatile",
-            "messages": [
-                {"role": "system", "content": "You are an expert learning resource recommender."},
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 1000,
-            "temperature": 0.7
-        }
-        import requests
+        messages = [
+            {"role": "system", "content": "You are an expert learning resource recommender."},
+            {"role": "user", "content": prompt}
+        ]
         try:
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=data_groq,
-                timeout=60
-            )
-            response.raise_for_status()
-            content = response.json()["choices"][0]["message"]["content"]
-            # Try to extract JSON from markdown/code block if present
-            match = re.search(r"```json\s*(.*?)```", content, re.DOTALL)
-            if match:
-                json_str = match.group(1)
-            else:
-                # Try to find first { ... } block
-                match = re.search(r"({\s*\"videos\".*})", content, re.DOTALL)
-                if match:
-                    json_str = match.group(1)
-                else:
-                    json_str = content
-            json_str = clean_json_string(json_str)
-            json_str, was_truncated = truncate_to_last_complete_json(json_str)
-            json_str = extract_valid_objects(json_str)
+            content = await call_groq(messages, model="llama-3.3-70b-versatile", max_tokens=1000, timeout=60, site="resources")
+            # Single-pass tolerant parse; truncation closes the last object, so entries without a url are dropped
+            parser = StreamingJSONParser()
+            parser.feed(content)
             try:
-                resources = json.loads(json_str)
+                resources = parser.finish()
             except Exception as e:
                 print("Failed to parse JSON from Groq response:", e)
                 print("Raw response was:", content)
-                # Fallback: try to parse each array individually
-                resources = fallback_parse_arrays(json_str)
-                resources['raw_response'] = content
+                resources = {'error': "Failed to parse the AI response.", 'raw_response': content}
+            was_truncated = parser.truncated
             # Ensure all keys are present and are lists (including legacy fields)
-            default_resources = {
-                'videos': [],
-                'video_tutorials': [],
-                'articles': [],
-                'courses': [],
-                'online_courses': [],
-                'books': [],
-                'tools': []
-            }
             if not isinstance(resources, dict):
-                resources = default_resources
+                resources = dict(default_resources)
             else:
                 for key in default_resources:
                     if key not in resources or not isinstance(resources[key], list):
                         resources[key] = []
+                    else:
+                        resources[key] = [r for r in resources[key] if isinstance(r, dict) and r.get('title') and r.get('url')]
+            schedule_resource_ingest(topic, {key: resources[key] for key in CATALOG_CATEGORIES})
+            # Top up what the catalog already had for this topic
+            for key, hits in cached.items():
+                resources[key] = merge_resources(hits, resources[key])
             if was_truncated:
                 resources['error'] = resources.get('error', '') + " Some results may be missing due to incomplete data from the AI."
             return resources
@@ -1288,124 +2054,247 @@ Respond in JSON only.
 app.include_router(api_router, prefix="/api")
 
 @app.get("/user/{user_id}/progress")
-def get_user_progress(user_id: int, db: Session = Depends(get_db)):
+def get_user_progress(user_id: int, db: Session = Depends(get_read_db)):
     # Example: fetch user progress from your existing tables
     # Replace with your actual logic
     progress = db.query(UserProgress).filter(UserProgress.user_id == user_id).first()
     return progress
 
-@app.get("/quiz/personalized/{user_id}")
-def get_personalized_quiz(user_id: int, db: Session = Depends(get_db)):
-    # Fetch all skill paths for the user
-    skill_paths = db.query(SkillPathDB).filter_by(user_id=user_id).all()
+# --- Quiz question bank ---
+# Questions are generated in the background whenever planner tasks are completed
+# and stored per skill path under a hash of the completed-task set, so the quiz
+# page only has to read the bank. Live generation is the fallback for users
+# whose bank is still empty.
+def completed_task_hash(descriptions):
+    return hashlib.sha256(pyjson.dumps(sorted(descriptions)).encode()).hexdigest()
+
+def correct_option_index(q):
+    # Find the index of the correct option
+    try:
+        # Try to interpret correct_option as an index
+        correct_index = int(q["correct_option"])
+        if not (0 <= correct_index < len(q["options"])):
+            raise ValueError
+        return correct_index
+    except (ValueError, TypeError):
+        # Fallback to fuzzy matching
+        correct_str = str(q["correct_option"]).strip().lower()
+        for idx, opt in enumerate(q["options"]):
+            opt_str = str(opt).strip().lower()
+            if (
+                opt_str == correct_str or
+                opt_str in correct_str or
+                correct_str in opt_str
+            ):
+                return idx
+    return None
+
+def get_or_create_quiz(db, skill_tag):
+    # Fetch or create a quiz for this skill (for quiz_id)
+    quiz_obj = db.query(Quiz).filter_by(title=skill_tag).first()
+    if not quiz_obj:
+        quiz_obj = Quiz(title=skill_tag, description=f"Auto-generated quiz for {skill_tag}")
+        db.add(quiz_obj)
+        db.commit()
+        db.refresh(quiz_obj)
+    return quiz_obj
+
+async def generate_bank_questions(db, skill_path, quiz_id, completed_descriptions):
+    """Generate questions for a skill path's completed tasks and store them in the bank.
+
+    db may be a Session or an AsyncSession; the queries go through run_db.
+    """
+    skill_tag = skill_path.title
+    prompt = (
+        f"Generate 3 quiz questions (with 4 options each, and the correct answer) for the skill: {skill_tag}. "
+        f"Base the questions on these completed tasks: {completed_descriptions}. "
+        "Respond in JSON as a list: [{question_text, options, correct_option}]. "
+        "Strictly respond with valid JSON only. Do not include any explanations, markdown, or extra text."
+    )
+    messages = [
+        {"role": "system", "content": "You are a quiz generator."},
+        {"role": "user", "content": prompt}
+    ]
+    await run_db(db, release_connection)
+    generated = await call_groq_json(messages, site="quiz")
+    if not isinstance(generated, list):
+        raise ValueError("AI did not return a list of questions")
+    valid = []
+    for q in generated:
+        if not isinstance(q, dict) or not all(k in q for k in ("question_text", "options", "correct_option")):
+            continue
+        correct_index = correct_option_index(q)
+        if correct_index is None:
+            print(f"[QUIZ WARNING] Could not find correct option for question: {q['question_text']}")
+            print(f"[QUIZ WARNING] Options: {q['options']}")
+            print(f"[QUIZ WARNING] Correct answer: {q['correct_option']}")
+            continue  # Skip this question
+        valid.append((q, correct_index))
+    return await run_db(db, store_bank_questions, skill_path, quiz_id, completed_descriptions, valid)
+
+def store_bank_questions(db, skill_path, quiz_id, completed_descriptions, valid):
+    skill_tag = skill_path.title
+    # Reuse identical questions already stored for this quiz (one lookup for all of them)
+    texts = [q["question_text"] for q, _ in valid]
+    existing = {
+        question.question_text: question
+        for question in db.query(Question).filter(
+            Question.quiz_id == quiz_id,
+            Question.skill_tag == skill_tag,
+            Question.question_text.in_(texts)
+        ).all()
+    } if texts else {}
+    questions = []
+    for q, correct_index in valid:
+        question = existing.get(q["question_text"])
+        if question is None:
+            question = Question(
+                quiz_id=quiz_id,
+                question_text=q["question_text"],
+                options=q["options"],
+                correct_option=q["correct_option"],
+                correct_option_index=correct_index,
+                skill_tag=skill_tag
+            )
+            db.add(question)
+            existing[q["question_text"]] = question
+        questions.append(question)
+    db.flush()
+    task_hash = completed_task_hash(completed_descriptions)
+    db.bulk_insert_mappings(QuizBankDB, [
+        {
+            "user_id": skill_path.user_id,
+            "skill_path_id": skill_path.id,
+            "task_set_hash": task_hash,
+            "question_id": question.id,
+            "created_at": datetime.utcnow()
+        } for question in questions
+    ])
+    # Earlier generations of the path are superseded; keep only the current one
+    db.query(QuizBankDB).filter(
+        QuizBankDB.skill_path_id == skill_path.id,
+        QuizBankDB.task_set_hash != task_hash
+    ).delete(synchronize_session=False)
+    db.commit()
+    return questions
+
+def quiz_question_dict(question):
+    return {
+        "id": question.id,
+        "question_text": question.question_text,
+        "options": question.options,
+        "skill_tag": question.skill_tag
+    }
+
+def enqueue_quiz_bank_job(db, user_id, skill_path_id, commit=True):
+    # One pending refresh per path is enough; it hashes the task set when it runs
+    pending = db.query(JobDB).filter_by(kind="quiz_bank", skill_path_id=skill_path_id, status="queued").first()
+    if pending:
+        return pending
+    job = JobDB(kind="quiz_bank", user_id=user_id, skill_path_id=skill_path_id, max_attempts=JOB_MAX_ATTEMPTS)
+    db.add(job)
+    if commit:
+        db.commit()
+    return job
+
+def completed_task_descriptions(db, skill_path_id):
+    return [
+        d for (d,) in db.query(PlannerDB.description).filter_by(skill_path_id=skill_path_id, status="complete").all()
+    ]
+
+def quiz_bank_job_input(db, job):
+    """(skill_path, quiz_id, completed_descriptions) when the path's completed tasks are not banked yet."""
+    skill_path = db.query(SkillPathDB).filter_by(id=job.skill_path_id).first()
+    if not skill_path:
+        return None
+    completed_descriptions = completed_task_descriptions(db, skill_path.id)
+    if not completed_descriptions:
+        return None
+    task_hash = completed_task_hash(completed_descriptions)
+    already_banked = db.query(QuizBankDB.id).filter_by(skill_path_id=skill_path.id, task_set_hash=task_hash).first()
+    if already_banked:
+        return None
+    # Detached, so the quiz row's commit can't expire it
+    db.expunge(skill_path)
+    quiz_id = get_or_create_quiz(db, skill_path.title).id
+    release_connection(db)
+    return skill_path, quiz_id, completed_descriptions
+
+async def run_quiz_bank_job(job, db):
+    bank_input = await run_db(db, quiz_bank_job_input, job)
+    if bank_input:
+        await generate_bank_questions(db, *bank_input)
+
+JOB_HANDLERS["quiz_bank"] = run_quiz_bank_job
+
+def current_bank_generations(db, user_id):
+    """Subquery of (skill_path_id, task_set_hash) for the newest bank generation of each of the user's paths."""
+    newest = db.query(
+        QuizBankDB.skill_path_id, func.max(QuizBankDB.id).label("id")
+    ).filter(QuizBankDB.user_id == user_id).group_by(QuizBankDB.skill_path_id).subquery()
+    return db.query(QuizBankDB.skill_path_id, QuizBankDB.task_set_hash).join(
+        newest, QuizBankDB.id == newest.c.id
+    ).subquery()
+
+def banked_quiz(db, user_id):
+    # Read the newest bank generation of every skill path in one indexed query
+    current = current_bank_generations(db, user_id)
+    rows = db.query(Question).select_from(QuizBankDB).join(
+        current, and_(
+            QuizBankDB.skill_path_id == current.c.skill_path_id,
+            QuizBankDB.task_set_hash == current.c.task_set_hash
+        )
+    ).join(
+        Question, Question.id == QuizBankDB.question_id
+    ).join(
+        SkillPathDB, SkillPathDB.id == QuizBankDB.skill_path_id
+    ).order_by(QuizBankDB.created_at.desc(), QuizBankDB.id).all()
     all_questions = []
     quiz_id_to_return = None
+    for question in rows:
+        if quiz_id_to_return is None:
+            quiz_id_to_return = question.quiz_id
+        all_questions.append(quiz_question_dict(question))
+    return {
+        "title": "Weekly Challenge",
+        "quiz_id": quiz_id_to_return,
+        "questions": all_questions
+    }
+
+def user_skill_paths(db, user_id):
+    paths = db.query(SkillPathDB).filter_by(user_id=user_id).all()
+    # Detached, so a rollback after a failed generation can't expire them
+    db.expunge_all()
+    return paths
+
+@app.get("/quiz/personalized/{user_id}")
+async def get_personalized_quiz(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    quiz = await run_db(db, banked_quiz, user_id)
+    if quiz["questions"]:
+        return quiz
+
+    # Bank is empty: generate live (and fill the bank for next time)
+    all_questions = quiz["questions"]
+    skill_paths = await run_db(db, user_skill_paths, user_id)
     for skill_path in skill_paths:
         skill_tag = skill_path.title
         print(f"[QUIZ DEBUG] Skill Path: {skill_tag}")
-        # Fetch or create a quiz for this skill (for quiz_id)
-        quiz_obj = db.query(Quiz).filter_by(title=skill_tag).first()
-        if not quiz_obj:
-            quiz_obj = Quiz(title=skill_tag, description=f"Auto-generated quiz for {skill_tag}")
-            db.add(quiz_obj)
-            db.commit()
-            db.refresh(quiz_obj)
-        quiz_id = quiz_obj.id
-        if quiz_id_to_return is None:
-            quiz_id_to_return = quiz_id
+        quiz_id = (await run_db(db, get_or_create_quiz, skill_tag)).id
+        if quiz["quiz_id"] is None:
+            quiz["quiz_id"] = quiz_id
         # Fetch completed tasks for this skill path
-        completed_tasks = db.query(PlannerDB).filter_by(skill_path_id=skill_path.id, status="complete").all()
-        completed_descriptions = [t.description for t in completed_tasks]
-        print(f"[QUIZ DEBUG] Completed Descriptions: {completed_descriptions}")
-        # Always use Groq to generate questions based on completed tasks
-        questions = []
-        if completed_descriptions:
-            prompt = (
-                f"Generate 3 quiz questions (with 4 options each, and the correct answer) for the skill: {skill_tag}. "
-                f"Base the questions on these completed tasks: {completed_descriptions}. "
-                "Respond in JSON as a list: [{question_text, options, correct_option}]. "
-                "Strictly respond with valid JSON only. Do not include any explanations, markdown, or extra text."
-            )
-            messages = [
-                {"role": "system", "content": "You are a quiz generator."},
-                {"role": "user", "content": prompt}
-            ]
-            try:
-                content = call_groq(messages)
-                try:
-                    generated = parse_json_from_response(content)
-                except Exception as e:
-                    print(f"Groq JSON parse error: {e}")
-                    print(f"Raw Groq response: {content}")
-                    # Try fallback repair/extract
-                    try:
-                        generated = fallback_parse_arrays(content)
-                        print("[QUIZ DEBUG] Used fallback_parse_arrays for Groq response.")
-                    except Exception as e2:
-                        print(f"Fallback JSON parse also failed: {e2}")
-                        continue  # Skip this skill if still broken
-                for q in generated:
-                    # Find the index of the correct option
-                    try:
-                        # Try to interpret correct_option as an index
-                        correct_index = int(q["correct_option"])
-                        if not (0 <= correct_index < len(q["options"])):
-                            raise ValueError
-                    except (ValueError, TypeError):
-                        # Fallback to fuzzy matching
-                        correct_index = None
-                        for idx, opt in enumerate(q["options"]):
-                            opt_str = str(opt).strip().lower()
-                            correct_str = str(q["correct_option"]).strip().lower()
-                            if (
-                                opt_str == correct_str or
-                                opt_str in correct_str or
-                                correct_str in opt_str
-                            ):
-                                correct_index = idx
-                                break
-                    if correct_index is None:
-                        print(f"[QUIZ WARNING] Could not find correct option for question: {q['question_text']}")
-                        print(f"[QUIZ WARNING] Options: {q['options']}")
-                        print(f"[QUIZ WARNING] Correct answer: {q['correct_option']}")
-                        continue  # Skip this question
-                    existing = db.query(Question).filter_by(
-                        quiz_id=quiz_id,
-                        question_text=q["question_text"],
-                        skill_tag=skill_tag
-                    ).first()
-                    if existing:
-                        question = existing
-                    else:
-                        question = Question(
-                            quiz_id=quiz_id,
-                            question_text=q["question_text"],
-                            options=q["options"],
-                            correct_option=q["correct_option"],
-                            correct_option_index=correct_index,
-                            skill_tag=skill_tag
-                        )
-                        db.add(question)
-                        db.commit()
-                        db.refresh(question)
-                    questions.append({
-                        "id": question.id,
-                        "question_text": question.question_text,
-                        "options": question.options,
-                        "skill_tag": question.skill_tag
-                    })
-                print(f"[QUIZ DEBUG] Generated {len(questions)} questions for skill: {skill_tag}")
-            except Exception as e:
-                print(f"Groq question generation failed: {e}")
-        else:
+        completed_descriptions = await run_db(db, completed_task_descriptions, skill_path.id)
+        if not completed_descriptions:
             print(f"[QUIZ DEBUG] No completed tasks for skill: {skill_tag}")
-        all_questions.extend(questions)
+            continue
+        try:
+            questions = await generate_bank_questions(db, skill_path, quiz_id, completed_descriptions)
+            print(f"[QUIZ DEBUG] Generated {len(questions)} questions for skill: {skill_tag}")
+            all_questions.extend(quiz_question_dict(q) for q in questions)
+        except Exception as e:
+            await run_db(db, lambda db: db.rollback())
+            print(f"Groq question generation failed: {e}")
     print(f"[QUIZ DEBUG] Total questions returned: {len(all_questions)}")
-    quiz = {
-        "title": "Weekly Challenge",
-        "quiz_id": quiz_id_to_return,
-        "questions": all_questions
-    }
     return quiz
 
 class QuizAttemptRequest(BaseModel):
@@ -1414,8 +2303,7 @@ class QuizAttemptRequest(BaseModel):
     answers: dict
     question_ids: list[int]
 
-@app.post("/quiz/attempt")
-def submit_quiz_attempt(body: QuizAttemptRequest, db: Session = Depends(get_db)):
+def record_quiz_attempt(db, body):
     user_id = body.user_id
     quiz_id = body.quiz_id
     answers = body.answers
@@ -1437,145 +2325,318 @@ def submit_quiz_attempt(body: QuizAttemptRequest, db: Session = Depends(get_db))
     db.commit()
     return {"score": score, "total": len(questions)}
 
-@app.get("/quiz/history/{user_id}")
-def get_quiz_history(user_id: int, db: Session = Depends(get_db)):
+@app.post("/quiz/attempt")
+async def submit_quiz_attempt(body: QuizAttemptRequest, db: AsyncSession = Depends(get_async_db)):
+    return await run_db(db, record_quiz_attempt, body)
+
+def quiz_attempts(db, user_id):
     attempts = db.query(UserQuizAttempt).filter(UserQuizAttempt.user_id == user_id).all()
     return attempts
 
-ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
-ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
-ADZUNA_COUNTRY = "in"  # India
-ADZUNA_BASE_URL = f"https://api.adzuna.com/v1/api/jobs/{ADZUNA_COUNTRY}/search/1"
-ADZUNA_CATEGORIES_URL = f"https://api.adzuna.com/v1/api/jobs/{ADZUNA_COUNTRY}/categories"
-ADZUNA_LOCATIONS_URL = f"https://api.adzuna.com/v1/api/jobs/{ADZUNA_COUNTRY}/locations/1"
+@app.get("/quiz/history/{user_id}")
+async def get_quiz_history(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    return await run_db(db, quiz_attempts, user_id)
 
 # Helper to call Adzuna API for job search
-def adzuna_job_search(skill, location, results=10):
-    params = {
-        "app_id": ADZUNA_APP_ID,
-        "app_key": ADZUNA_APP_KEY,
-        "results_per_page": results,
-        "what": skill,
-        "where": location,
-        "content-type": "application/json"
-    }
-    url = ADZUNA_BASE_URL + "?" + urllib.parse.urlencode(params)
-    resp = requests.get(url)
-    if resp.status_code == 200:
-        return resp.json().get("results", [])
-    return []
-
-# Helper to call Adzuna API for salary benchmarking
-def adzuna_salary_benchmark(role, location):
-    params = {
-        "app_id": ADZUNA_APP_ID,
-        "app_key": ADZUNA_APP_KEY,
-        "what": role,
-        "where": location,
-        "content-type": "application/json"
+async def adzuna_job_search(skill, location, results=10):
+    return await adzuna.search(skill, location, results)
+
+# --- Job market snapshots ---
+# Demand and salary figures are served from job_market_snapshots, one row per
+# tracked (skill, location). A scheduled job pages through Adzuna postings for
+# every tracked pair and stores the total posting count plus a salary quantile
+# sketch; endpoints read a single row. A pair seen for the first time is
+# ingested inline. The schedule refreshes the MARKET_TRACKED_* pairs plus pairs
+# requested within MARKET_RECENT_WINDOW; other pairs are dropped, so the Adzuna
+# quota spent per run stays bounded by what users actually look at.
+MARKET_SCHEDULER_ENABLED = os.getenv("MARKET_SCHEDULER_ENABLED", "1") != "0"
+MARKET_INGEST_INTERVAL = int(os.getenv("MARKET_INGEST_INTERVAL", str(6 * 3600)))
+MARKET_INGEST_PAGES = int(os.getenv("MARKET_INGEST_PAGES", "5"))
+MARKET_PAGE_SIZE = int(os.getenv("MARKET_PAGE_SIZE", "50"))
+MARKET_INGEST_FANOUT = int(os.getenv("MARKET_INGEST_FANOUT", "4"))
+MARKET_TRACKED_SKILLS = [s.strip() for s in os.getenv(
+    "MARKET_TRACKED_SKILLS", "python,javascript,java,sql,react,machine learning,data analysis,aws"
+).split(",") if s.strip()]
+MARKET_TRACKED_LOCATIONS = [s.strip() for s in os.getenv("MARKET_TRACKED_LOCATIONS", "India").split(",") if s.strip()]
+MARKET_RECENT_WINDOW = int(os.getenv("MARKET_RECENT_WINDOW", str(7 * 24 * 3600)))
+
+def posting_salary(job):
+    """Midpoint of the advertised range, or whichever bound is given."""
+    bounds = []
+    for field in ("salary_min", "salary_max"):
+        try:
+            if job.get(field) is not None:
+                bounds.append(float(job[field]))
+        except (TypeError, ValueError):
+            pass
+    return sum(bounds) / len(bounds) if bounds else None
+
+async def fetch_market_stats(skill, location):
+    """Page through postings for one pair; returns None if Adzuna gave nothing back."""
+    first = await adzuna.search_page(skill, location, 1, MARKET_PAGE_SIZE)
+    if first is None:
+        return None
+    results = first.get("results", [])
+    posting_count = first.get("count", len(results))
+    pages = min(MARKET_INGEST_PAGES, math.ceil(posting_count / MARKET_PAGE_SIZE)) if posting_count else 1
+    rest = await asyncio.gather(*(adzuna.search_page(skill, location, page, MARKET_PAGE_SIZE) for page in range(2, pages + 1)))
+    sketch = QuantileSketch()
+    for page in [first] + [p for p in rest if p]:
+        for job in page.get("results", []):
+            salary = posting_salary(job)
+            if salary is not None:
+                sketch.add(salary)
+    return {
+        "posting_count": posting_count,
+        "salary_count": sketch.count,
+        "salary_mean": sketch.mean,
+        "salary_p25": sketch.quantile(0.25),
+        "salary_p50": sketch.quantile(0.5),
+        "salary_p90": sketch.quantile(0.9),
+        "salary_sketch": pyjson.dumps(sketch.to_dict()),
+        "pages_fetched": 1 + sum(1 for p in rest if p),
     }
-    url = ADZUNA_BASE_URL + "?" + urllib.parse.urlencode(params)
-    resp = requests.get(url)
-    if resp.status_code == 200:
-        jobs = resp.json().get("results", [])
-        salaries = [j.get("salary_is_predicted") == "1" and float(j.get("salary_max", 0)) for j in jobs if j.get("salary_max")]
-        if salaries:
-            avg_salary = sum(salaries) / len(salaries)
-            return {"average_salary": avg_salary, "sample_size": len(salaries)}
-    return {"average_salary": None, "sample_size": 0}
-
-# Helper to get skill relevance score
-def adzuna_skill_relevance(skills, location, results=50):
-    skill_scores = {}
-    for skill in skills:
-        jobs = adzuna_job_search(skill, location, results)
-        skill_scores[skill] = len(jobs)
-    return skill_scores
+
+def track_market_pairs(db, pairs, requested_at=None):
+    """Return {(skill, location): snapshot row}, creating rows for pairs not tracked yet."""
+    pairs = list(dict.fromkeys((normalize_text(s), normalize_text(l)) for s, l in pairs))
+    if not pairs:
+        return {}
+
+    def load():
+        rows = db.query(JobMarketSnapshotDB).filter(
+            JobMarketSnapshotDB.skill.in_({s for s, _ in pairs}),
+            JobMarketSnapshotDB.location.in_({l for _, l in pairs})
+        ).all()
+        return {(r.skill, r.location): r for r in rows}
+
+    by_pair = load()
+    new_rows = [
+        JobMarketSnapshotDB(skill=s, location=l, last_requested_at=requested_at)
+        for s, l in pairs if (s, l) not in by_pair
+    ]
+    if new_rows:
+        db.add_all(new_rows)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another request started tracking the same pair first
+            db.rollback()
+            return track_market_pairs(db, pairs, requested_at)
+        # The commit expired every row; reload them in one query
+        by_pair = load()
+    return {pair: by_pair[pair] for pair in pairs}
+
+def store_market_stats(db, rows, results):
+    """Write fetched stats onto their rows; the rows stay loaded for the caller."""
+    now = datetime.utcnow()
+    refreshed = 0
+    for row, stats in zip(rows, results):
+        if stats is None:
+            continue
+        for field, value in stats.items():
+            setattr(row, field, value)
+        row.fetched_at = now
+        refreshed += 1
+    release_connection(db)
+    return refreshed
+
+async def refresh_market_snapshots(db, rows):
+    """Ingest the given (loaded) snapshot rows concurrently; returns how many were refreshed."""
+    semaphore = asyncio.Semaphore(max(1, MARKET_INGEST_FANOUT))
+
+    async def fetch(row):
+        async with semaphore:
+            return await fetch_market_stats(row.skill, row.location)
+
+    await run_db(db, release_connection)
+    results = await asyncio.gather(*(fetch(row) for row in rows))
+    return await run_db(db, store_market_stats, rows, results)
+
+def mark_market_pairs_requested(db, rows):
+    """Record that an endpoint read these snapshot rows; one UPDATE, at most once per ingest interval."""
+    now = datetime.utcnow()
+    due = now - timedelta(seconds=MARKET_INGEST_INTERVAL)
+    ids = [r.id for r in rows if r.last_requested_at is None or r.last_requested_at < due]
+    if ids:
+        db.query(JobMarketSnapshotDB).filter(JobMarketSnapshotDB.id.in_(ids)).update(
+            {"last_requested_at": now}, synchronize_session=False
+        )
+        db.commit()
+
+def enqueue_market_snapshot_job(db):
+    """Queue a refresh of every scheduled pair older than the ingest interval (at most one pending job)."""
+    tracked = track_market_pairs(db, [(s, l) for s in MARKET_TRACKED_SKILLS for l in MARKET_TRACKED_LOCATIONS])
+    tracked_ids = [row.id for row in tracked.values()]
+    pending = db.query(JobDB).filter(JobDB.kind == "market_snapshot", JobDB.status.in_(["queued", "running"])).first()
+    if pending:
+        return pending
+    now = datetime.utcnow()
+    scheduled = or_(
+        JobMarketSnapshotDB.id.in_(tracked_ids),
+        JobMarketSnapshotDB.last_requested_at >= now - timedelta(seconds=MARKET_RECENT_WINDOW)
+    )
+    # Pairs nobody asked for within the window stop being refreshed and are dropped;
+    # asking again ingests them inline like a new pair
+    expired = db.query(JobMarketSnapshotDB).filter(
+        JobMarketSnapshotDB.id.notin_(tracked_ids),
+        or_(
+            JobMarketSnapshotDB.last_requested_at.is_(None),
+            JobMarketSnapshotDB.last_requested_at < now - timedelta(seconds=MARKET_RECENT_WINDOW)
+        )
+    ).delete(synchronize_session=False)
+    if expired:
+        print(f"Dropped {expired} job-market pairs not requested within the window")
+        db.commit()
+    cutoff = now - timedelta(seconds=MARKET_INGEST_INTERVAL)
+    stale = db.query(JobMarketSnapshotDB.id).filter(scheduled, or_(
+        JobMarketSnapshotDB.fetched_at.is_(None), JobMarketSnapshotDB.fetched_at < cutoff
+    )).all()
+    if not stale:
+        return None
+    job = JobDB(kind="market_snapshot", payload=pyjson.dumps({"ids": [i for (i,) in stale]}), max_attempts=JOB_MAX_ATTEMPTS)
+    db.add(job)
+    db.commit()
+    return job
+
+def load_market_rows(db, ids):
+    rows = db.query(JobMarketSnapshotDB).filter(JobMarketSnapshotDB.id.in_(ids)).all()
+    release_connection(db)
+    return rows
+
+def record_market_progress(db, job, rows, started, progress):
+    for row in rows:
+        if row.fetched_at and row.fetched_at >= started:
+            progress[str(row.id)] = "complete"
+    job.progress = pyjson.dumps(progress)
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+async def run_market_snapshot_job(job, db):
+    started = datetime.utcnow()
+    # claim_next_job hands back a loaded job
+    ids = pyjson.loads(job.payload)["ids"]
+    progress = pyjson.loads(job.progress or "{}")
+    # Pairs refreshed by an earlier attempt are skipped
+    todo = [i for i in ids if progress.get(str(i)) != "complete"]
+    for start in range(0, len(todo), MARKET_INGEST_FANOUT * 4):
+        rows = await run_db(db, load_market_rows, todo[start:start + MARKET_INGEST_FANOUT * 4])
+        await refresh_market_snapshots(db, rows)
+        await run_db(db, record_market_progress, job, rows, started, progress)
+    if todo and not any(progress.get(str(i)) == "complete" for i in todo):
+        raise RuntimeError("Adzuna returned no data for any tracked pair")
+
+JOB_HANDLERS["market_snapshot"] = run_market_snapshot_job
+
+async def market_snapshot_scheduler():
+    while True:
+        try:
+            async with writer_session() as db:
+                await run_db(db, enqueue_market_snapshot_job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Market snapshot scheduler error: {e}")
+        await asyncio.sleep(min(MARKET_INGEST_INTERVAL, 3600))
+
+@app.on_event("startup")
+async def start_market_scheduler():
+    if MARKET_SCHEDULER_ENABLED:
+        _background_tasks.append(asyncio.create_task(market_snapshot_scheduler()))
+
+def requested_market_rows(db, pairs):
+    """Track and mark the requested pairs; returns their rows loaded and the connection released."""
+    rows = track_market_pairs(db, pairs, requested_at=datetime.utcnow())
+    ids = [r.id for r in rows.values()]
+    mark_market_pairs_requested(db, rows.values())
+    # The commit above expired the rows; reload them in one query
+    load_market_rows(db, ids)
+    return rows
+
+async def market_snapshots(db, skills, location):
+    """Snapshot rows for each skill at `location`; pairs never ingested are fetched now."""
+    rows = await run_db(db, requested_market_rows, [(s, location) for s in skills])
+    missing = [row for row in rows.values() if row.fetched_at is None]
+    if missing:
+        await refresh_market_snapshots(db, missing)
+    return rows
+
+def snapshot_time(row):
+    return row.fetched_at.isoformat() if row.fetched_at else None
 
 @app.get("/api/job-postings")
-def get_job_postings(skill: str, location: str = "India", results: int = 10):
+async def get_job_postings(skill: str, location: str = "India", results: int = 10):
     """Get live job postings from Adzuna for a skill and location."""
-    postings = adzuna_job_search(skill, location, results)
+    postings = await adzuna_job_search(skill, location, results)
     return {"postings": postings}
 
 @app.get("/api/salary-benchmark")
-def get_salary_benchmark(role: str, location: str = "India"):
-    """Get average salary for a role in a location from Adzuna."""
-    data = adzuna_salary_benchmark(role, location)
-    return data
+async def get_salary_benchmark(role: str, location: str = "India", db: AsyncSession = Depends(get_async_db)):
+    """Get salary figures for a role in a location from the latest job-market snapshot."""
+    row = next(iter((await market_snapshots(db, [role], location)).values()))
+    return {
+        "average_salary": row.salary_mean,
+        "sample_size": row.salary_count or 0,
+        "p25": row.salary_p25,
+        "p50": row.salary_p50,
+        "p90": row.salary_p90,
+        "fetched_at": snapshot_time(row),
+    }
 
 @app.get("/api/skill-relevance")
-def get_skill_relevance(skills: str, location: str = "India", results: int = 50):
-    """Get demand score for each skill based on job postings from Adzuna."""
-    skill_list = [s.strip() for s in skills.split(",") if s.strip()]
-    scores = adzuna_skill_relevance(skill_list, location, results)
-    return {"relevance": scores}
+async def get_skill_relevance(skills: str, location: str = "India", db: AsyncSession = Depends(get_async_db)):
+    """Get demand score (total postings) for each skill from the latest job-market snapshots."""
+    skill_list = list(dict.fromkeys(s.strip() for s in skills.split(",") if s.strip()))
+    rows = await market_snapshots(db, skill_list, location)
+    relevance = {}
+    fetched_at = {}
+    for skill in skill_list:
+        row = rows[(normalize_text(skill), normalize_text(location))]
+        relevance[skill] = row.posting_count or 0
+        fetched_at[skill] = snapshot_time(row)
+    return {"relevance": relevance, "fetched_at": fetched_at}
 
 @app.get("/api/job-categories")
-def get_job_categories():
+async def get_job_categories():
     """Get job categories from Adzuna for India."""
-    params = {
-        "app_id": ADZUNA_APP_ID,
-        "app_key": ADZUNA_APP_KEY,
-        "content-type": "application/json"
-    }
-    url = ADZUNA_CATEGORIES_URL + "?" + urllib.parse.urlencode(params)
-    resp = requests.get(url)
-    if resp.status_code == 200:
-        return resp.json().get("results", [])
-    return []
-
-def fetch_adzuna_locations(level_url=None, depth=1, max_depth=3):
-    """Recursively fetch sublocations from Adzuna up to max_depth."""
-    if not level_url:
-        level_url = ADZUNA_LOCATIONS_URL
-    params = {
-        "app_id": ADZUNA_APP_ID,
-        "app_key": ADZUNA_APP_KEY,
-        "content-type": "application/json"
-    }
-    url = level_url + "?" + urllib.parse.urlencode(params)
-    print(f"Fetching locations from: {url}")
-    resp = requests.get(url)
-    print(f"Status code: {resp.status_code}")
-    print(f"Response: {resp.text[:500]}")  # Print first 500 chars
-    if resp.status_code != 200:
-        return []
-    results = resp.json().get("results", [])
-    flat = []
-    for loc in results:
-        flat.append({"tag": loc.get("tag"), "display_name": loc.get("display_name")})
-        # If there are sublocations and we haven't reached max_depth, fetch them
-        if loc.get("locations") and depth < max_depth:
-            for sub in loc["locations"]:
-                sub_url = f"https://api.adzuna.com/v1/api/jobs/{ADZUNA_COUNTRY}/locations/{sub['tag']}"
-                flat.extend(fetch_adzuna_locations(sub_url, depth+1, max_depth))
-    return flat
+    return await adzuna.categories()
+
+@app.get("/api/adzuna/stats")
+def get_adzuna_stats():
+    return adzuna.stats()
 
 @app.get("/api/job-locations")
-def get_job_locations():
-    # Use GeoNames API for Indian cities
-    username = "sakshi_thorat"
-    url = f"http://api.geonames.org/searchJSON?country=IN&featureClass=P&maxRows=1000&username={username}"
-    resp = requests.get(url)
-    if resp.status_code == 200:
-        data = resp.json()
-        # Return a list of dicts with tag and display_name
-        return [
-            {"tag": city["name"].lower().replace(' ', '-'), "display_name": city["name"]}
-            for city in data.get("geonames", [])
-        ]
-    return []
+async def get_job_locations():
+    # Adzuna location tree + GeoNames cities, fetched once and kept in a local file
+    try:
+        trie = await gazetteer.get(adzuna)
+    except Exception as e:
+        print("Job locations unavailable:", e)
+        return []
+    return trie.entries
+
+@app.get("/api/job-locations/suggest")
+async def suggest_job_locations(q: str = "", limit: int = Query(10, ge=1, le=50)):
+    """Autocomplete location names by prefix (any word of the name)."""
+    if not q.strip():
+        return []
+    try:
+        trie = await gazetteer.get(adzuna)
+    except Exception as e:
+        print("Job locations unavailable:", e)
+        return []
+    return trie.suggest(q, limit)
 
 @app.get("/api/user-skills/{user_id}")
-def get_user_skills(user_id: int, db: Session = Depends(get_db)):
+def get_user_skills(user_id: int, db: Session = Depends(get_read_db)):
     # Get all skill paths for the user
     paths = db.query(SkillPathDB).filter_by(user_id=user_id).all()
+    counters = path_progress_map(db, [p.id for p in paths])
     acquired = []
     in_progress = []
     for p in paths:
-        total = db.query(PlannerDB).filter_by(skill_path_id=p.id).count()
-        completed = db.query(PlannerDB).filter_by(skill_path_id=p.id, status="complete").count()
+        total = counters[p.id].total
+        completed = counters[p.id].complete
         # Use the skill path title as the skill name
         skill_name = str(p.title)
         if total == 0:
@@ -1587,7 +2648,7 @@ def get_user_skills(user_id: int, db: Session = Depends(get_db)):
     return {"acquired": acquired, "in_progress": in_progress}
 
 @app.get("/roadmap/suggestions/{user_id}")
-def get_roadmap_suggestions(user_id: int, db: Session = Depends(get_db)):
+def get_roadmap_suggestions(user_id: int, db: Session = Depends(get_read_db)):
     # Find missed tasks
     missed_tasks = db.query(PlannerDB).join(SkillPathDB).filter(
         SkillPathDB.user_id == user_id,
@@ -1602,55 +2663,103 @@ def get_roadmap_suggestions(user_id: int, db: Session = Depends(get_db)):
     return {"suggestions": suggestions}
 
 @app.post("/roadmap/recalculate/{user_id}")
-def recalculate_roadmap(user_id: int, db: Session = Depends(get_db)):
+def recalculate_roadmap(user_id: int, per_day: Optional[int] = Query(None, ge=1), db: Session = Depends(get_db)):
     # Find all missed tasks (not complete, due date in the past)
-    missed_tasks = db.query(PlannerDB).join(SkillPathDB).filter(
+    missed_ids = [task_id for (task_id,) in db.query(PlannerDB.id).join(SkillPathDB).filter(
         SkillPathDB.user_id == user_id,
         PlannerDB.status != "complete",
         PlannerDB.due_date < date.today()
-    ).all()
-    if not missed_tasks:
+    ).order_by(PlannerDB.id).all()]
+    if not missed_ids:
         return {"message": "No missed tasks to reschedule."}
     # Find the latest due date among all tasks for this user
-    latest_due = db.query(PlannerDB.due_date).join(SkillPathDB).filter(
+    latest_due = db.query(func.max(PlannerDB.due_date)).join(SkillPathDB).filter(
         SkillPathDB.user_id == user_id
-    ).order_by(PlannerDB.due_date.desc()).first()
-    if latest_due and latest_due[0]:
-        start_date = latest_due[0] + timedelta(days=1)
-    else:
-        start_date = date.today()
-    # Move each missed task to a new week after the latest due date
-    for i, task in enumerate(missed_tasks):
-        # Assign to the next week (spread out missed tasks)
-        new_due = start_date + timedelta(days=i)
-        task.due_date = new_due
-        # Optionally, update week number (find the week number for new_due)
-        task.week = new_due.isocalendar()[1]
-        db.add(task)
+    ).scalar()
+    start_date = latest_due + timedelta(days=1) if latest_due else date.today()
+    # Spread the missed tasks over the days after it; week becomes the new date's week number
+    dates = spread_dates(len(missed_ids), start_date, per_day or SCHEDULE_DAILY_CAPACITY, open_task_load(db, user_id, start_date, per_day))
+    rescheduled = apply_dates(db, PlannerDB, missed_ids, dates, set_week=True)
     db.commit()
-    return {"message": f"Rescheduled {len(missed_tasks)} missed tasks to future weeks."}
-
-@app.post("/roadmap/ai-recalculate/{user_id}")
-def ai_recalculate_roadmap(user_id: int, db: Session = Depends(get_db)):
-    # Gather all skill paths for the user
-    paths = db.query(SkillPathDB).filter_by(user_id=user_id).all()
-    updated_count = 0
-    for path in paths:
-        # Load roadmap data
-        try:
-            data = pyjson.loads(str(path.data)) if path.data is not None else None
-            if not data or not isinstance(data, dict) or "weeks" not in data or not isinstance(data["weeks"], list):
-                continue
-        except Exception:
+    return {"message": f"Rescheduled {rescheduled} missed tasks to future weeks."}
+
+# Maximum number of skill paths re-planned by the LLM at the same time
+AI_RECALC_FANOUT = int(os.getenv("AI_RECALC_FANOUT", "4"))
+
+def ai_recalculate_rows(skill_path_id, weeks, today):
+    rows = []
+    for i, week in enumerate(weeks):
+        week_num = i + 1
+        if isinstance(week, list):
+            week_tasks = week
+        elif isinstance(week, dict):
+            week_tasks = week.get("tasks", [])
+        else:
             continue
-        # Get all planner tasks for this path
-        tasks = db.query(PlannerDB).filter_by(skill_path_id=path.id).all()
+        for j, desc in enumerate(week_tasks):
+            rows.append({
+                "skill_path_id": skill_path_id,
+                "week": week_num,
+                "description": desc if isinstance(desc, str) else pyjson.dumps(desc),
+                "status": "pending",
+                "due_date": today + timedelta(weeks=i, days=j)
+            })
+    return rows
+
+def ai_recalculate_inputs(db, user_id, skip=()):
+    """Plain summaries of the user's paths and their tasks, so nothing is loaded lazily during the LLM calls."""
+    paths = [p for p in db.query(SkillPathDB).filter_by(user_id=user_id).all() if p.id not in skip]
+    # Load the tasks of all paths at once instead of one query per path
+    summaries = {p.id: {"id": p.id, "title": p.title, "has_weeks": False, "tasks": []} for p in paths}
+    if summaries:
+        for (path_id,) in db.query(RoadmapWeekDB.skill_path_id).filter(
+            RoadmapWeekDB.skill_path_id.in_(list(summaries))
+        ).distinct().all():
+            summaries[path_id]["has_weeks"] = True
+        for t in db.query(PlannerDB.skill_path_id, PlannerDB.status, PlannerDB.due_date, PlannerDB.description).filter(
+            PlannerDB.skill_path_id.in_(list(summaries))
+        ).all():
+            summaries[t.skill_path_id]["tasks"].append(t)
+    release_connection(db)
+    return list(summaries.values())
+
+def store_ai_recalculated_path(db, path_id, rows):
+    # Replace all non-complete tasks in one transaction: a failure leaves the old plan intact
+    try:
+        db.query(PlannerDB).filter(
+            PlannerDB.skill_path_id == path_id,
+            PlannerDB.status != "complete"
+        ).delete(synchronize_session=False)
+        if rows:
+            db.bulk_insert_mappings(PlannerDB, rows)
+        recount_path_progress(db, [path_id])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+async def ai_recalculate_paths(db, paths, on_progress=None):
+    """Re-plan every path concurrently; each path's planner rewrite is its own transaction.
+
+    paths come from ai_recalculate_inputs; on_progress(db, result) is called through run_db.
+    """
+    today = date.today()
+    semaphore = asyncio.Semaphore(max(1, AI_RECALC_FANOUT))
+    # A session runs one operation at a time; paths finishing together take turns
+    db_lock = asyncio.Lock()
+
+    async def recalculate(path):
+        result = {"skill_path_id": path["id"], "title": path["title"], "status": "skipped", "tasks": 0}
+        # Only paths with roadmap_weeks rows are re-planned (the weeks themselves aren't needed)
+        if not path["has_weeks"]:
+            return result
+        tasks = path["tasks"]
         completed = [t for t in tasks if t.status == "complete"]
-        missed = [t for t in tasks if t.status != "complete" and t.due_date and t.due_date < date.today()]
-        pending = [t for t in tasks if t.status != "complete" and (not t.due_date or t.due_date >= date.today())]
+        missed = [t for t in tasks if t.status != "complete" and t.due_date and t.due_date < today]
+        pending = [t for t in tasks if t.status != "complete" and (not t.due_date or t.due_date >= today)]
         # Prepare a summary for AI
         prompt = (
-            f"The user is working on the skill path '{path.title}'. "
+            f"The user is working on the skill path '{path['title']}'. "
             f"Completed tasks: {len(completed)}. Missed tasks: {len(missed)}. Pending tasks: {len(pending)}. "
             f"Here are the pending and missed tasks: {[t.description for t in missed + pending]}. "
             "Please intelligently redistribute these tasks over the next weeks, compressing if the user is ahead or stretching if behind. "
@@ -1661,34 +2770,78 @@ def ai_recalculate_roadmap(user_id: int, db: Session = Depends(get_db)):
             {"role": "user", "content": prompt}
         ]
         try:
-            content = call_groq(messages, model="llama-3.3-70b-versatile")
-            weeks = parse_json_from_response(content)
+            async with semaphore:
+                weeks = await call_groq_json(messages, model="llama-3.3-70b-versatile", site="ai_recalculate")
             if not isinstance(weeks, list):
-                continue
-        except Exception:
-            continue
-        # Remove all non-complete tasks from planner
-        for t in missed + pending:
-            db.delete(t)
-        db.commit()
-        # Add new tasks from AI plan
-        today = date.today()
-        for i, week in enumerate(weeks):
-            week_num = i + 1
-            week_tasks = week if isinstance(week, list) else week.get("tasks", [])
-            for j, desc in enumerate(week_tasks):
-                due_date = today + timedelta(weeks=i, days=j)
-                task = PlannerDB(
-                    skill_path_id=path.id,
-                    week=week_num,
-                    description=desc,
-                    due_date=due_date
-                )
-                db.add(task)
-        db.commit()
-        updated_count += 1
-    return {"message": f"AI intelligently updated {updated_count} skill path(s) with a new roadmap."}
+                raise ValueError("AI did not return a list of weeks")
+        except Exception as e:
+            result["error"] = str(e)
+            return result
+        rows = ai_recalculate_rows(path["id"], weeks, today)
+        try:
+            async with db_lock:
+                await run_db(db, store_ai_recalculated_path, path["id"], rows)
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+            return result
+        result.update(status="updated", tasks=len(rows))
+        return result
+
+    async def run(path):
+        result = await recalculate(path)
+        if on_progress:
+            async with db_lock:
+                await run_db(db, on_progress, result)
+        return result
+
+    return await asyncio.gather(*[run(p) for p in paths])
+
+def enqueue_ai_recalculate_job(db, user_id, paths):
+    job = JobDB(
+        kind="ai_recalculate",
+        user_id=user_id,
+        progress=pyjson.dumps({str(p["id"]): "pending" for p in paths}),
+        max_attempts=JOB_MAX_ATTEMPTS
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+async def run_ai_recalculate_job(job, db):
+    # claim_next_job hands back a loaded job
+    progress = pyjson.loads(job.progress or "{}")
+    # Paths rewritten by an earlier attempt are left alone
+    done = {int(pid) for pid, status in progress.items() if status == "updated"}
+    paths = await run_db(db, ai_recalculate_inputs, job.user_id, done)
+
+    def on_progress(db, result):
+        progress[str(result["skill_path_id"])] = result["status"]
+        job.progress = pyjson.dumps(progress)
+        job.updated_at = datetime.utcnow()
+        release_connection(db)
+
+    results = await ai_recalculate_paths(db, paths, on_progress)
+    failed = [r for r in results if r["status"] == "failed"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} skill path(s) failed to update: {failed[0].get('error')}")
+
+JOB_HANDLERS["ai_recalculate"] = run_ai_recalculate_job
+
+@app.post("/roadmap/ai-recalculate/{user_id}")
+async def ai_recalculate_roadmap(user_id: int, background: bool = Query(False), db: AsyncSession = Depends(get_async_db)):
+    # Gather all skill paths for the user
+    paths = await run_db(db, ai_recalculate_inputs, user_id)
+    if background:
+        job = await run_db(db, enqueue_ai_recalculate_job, user_id, paths)
+        return {"message": f"Recalculating {len(paths)} skill path(s) in the background.", "job_id": job.id}
+    results = await ai_recalculate_paths(db, paths)
+    updated_count = sum(1 for r in results if r["status"] == "updated")
+    return {
+        "message": f"AI intelligently updated {updated_count} skill path(s) with a new roadmap.",
+        "paths": results
+    }
 
 @app.get("/user/me")
-def get_me(user: UserDB = Depends(get_current_user)):
+async def get_me(user: UserDB = Depends(get_current_user)):
     return {"id": user.id, "uid": user.uid, "email": user.email, "name": user.name}
\ No newline at end of file
@@ -0,0 +1,41 @@
+import os
+import sys
+from alembic import context
+from sqlalchemy import create_engine
+
+# main.py runs `upgrade head` itself on startup and hands over its engine
+# connection and metadata; from the alembic CLI we build our own engine from
+# DATABASE_URL and import the models without triggering that startup upgrade.
+config = context.config
+connection = config.attributes.get("connection")
+target_metadata = config.attributes.get("target_metadata")
+
+if target_metadata is None:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ["DB_AUTO_MIGRATE"] = "0"
+    from main import Base, DATABASE_URL
+    target_metadata = Base.metadata
+else:
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./mapmyroute.db")
+
+
+def run_migrations_offline():
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online(conn):
+    # Batch mode lets ALTERs work on SQLite by rebuilding the table
+    context.configure(connection=conn, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    run_migrations_online(connection)
+else:
+    with create_engine(DATABASE_URL).connect() as conn:
+        run_migrations_online(conn)
@@ -0,0 +1,188 @@
+"""Baseline schema
+
+The tables as Base.metadata.create_all used to build them. Databases created
+before migrations existed already have them, so each table and index is only
+created when missing; `upgrade head` then brings either kind of database to
+the same state.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(name, *columns):
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+
+def _create_index(name, table, columns, unique=False):
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+    if name not in existing:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade():
+    _create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("uid", sa.String, nullable=True),
+        sa.Column("email", sa.String),
+        sa.Column("password_hash", sa.String, nullable=True),
+        sa.Column("name", sa.String),
+        sa.Column("picture", sa.String),
+    )
+    _create_index("ix_users_id", "users", ["id"])
+    _create_index("ix_users_uid", "users", ["uid"], unique=True)
+    _create_index("ix_users_email", "users", ["email"], unique=True)
+
+    _create_table(
+        "skill_paths",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("title", sa.String),
+        sa.Column("description", sa.Text),
+        sa.Column("data", sa.Text),
+        sa.Column("created_at", sa.DateTime),
+    )
+    _create_index("ix_skill_paths_id", "skill_paths", ["id"])
+
+    _create_table(
+        "planner",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("skill_path_id", sa.Integer, sa.ForeignKey("skill_paths.id")),
+        sa.Column("week", sa.Integer, nullable=False),
+        sa.Column("description", sa.Text, nullable=False),
+        sa.Column("status", sa.String(32)),
+        sa.Column("due_date", sa.Date),
+        sa.Column("rescheduled_to", sa.Date),
+    )
+    _create_index("ix_planner_id", "planner", ["id"])
+
+    _create_table(
+        "path_progress",
+        sa.Column("skill_path_id", sa.Integer, sa.ForeignKey("skill_paths.id"), primary_key=True),
+        sa.Column("total", sa.Integer, nullable=False),
+        sa.Column("complete", sa.Integer, nullable=False),
+        sa.Column("pending", sa.Integer, nullable=False),
+        sa.Column("deferred", sa.Integer, nullable=False),
+        sa.Column("updated_at", sa.DateTime),
+    )
+
+    _create_table(
+        "quizzes",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String(255)),
+        sa.Column("description", sa.Text),
+        sa.Column("created_at", sa.TIMESTAMP),
+    )
+    _create_index("ix_quizzes_id", "quizzes", ["id"])
+
+    _create_table(
+        "questions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("quiz_id", sa.Integer, sa.ForeignKey("quizzes.id")),
+        sa.Column("question_text", sa.Text),
+        sa.Column("options", sa.JSON),
+        sa.Column("correct_option", sa.String),
+        sa.Column("correct_option_index", sa.Integer),
+        sa.Column("skill_tag", sa.String(100)),
+    )
+    _create_index("ix_questions_id", "questions", ["id"])
+
+    _create_table(
+        "user_quiz_attempts",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer),
+        sa.Column("quiz_id", sa.Integer, sa.ForeignKey("quizzes.id")),
+        sa.Column("answers", sa.JSON),
+        sa.Column("score", sa.Integer),
+        sa.Column("attempted_at", sa.TIMESTAMP),
+    )
+    _create_index("ix_user_quiz_attempts_id", "user_quiz_attempts", ["id"])
+
+    _create_table(
+        "user_progress",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("current_skills", sa.Text),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    _create_index("ix_user_progress_id", "user_progress", ["id"])
+
+    _create_table(
+        "jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("kind", sa.String(64), nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("skill_path_id", sa.Integer, sa.ForeignKey("skill_paths.id")),
+        sa.Column("status", sa.String(32)),
+        sa.Column("payload", sa.Text),
+        sa.Column("progress", sa.Text),
+        sa.Column("attempts", sa.Integer),
+        sa.Column("max_attempts", sa.Integer),
+        sa.Column("error", sa.Text),
+        sa.Column("run_after", sa.DateTime),
+        sa.Column("lease_expires_at", sa.DateTime),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    _create_index("ix_jobs_status", "jobs", ["status"])
+
+    _create_table(
+        "quiz_bank",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("skill_path_id", sa.Integer, sa.ForeignKey("skill_paths.id")),
+        sa.Column("task_set_hash", sa.String(64), nullable=False),
+        sa.Column("question_id", sa.Integer, sa.ForeignKey("questions.id")),
+        sa.Column("created_at", sa.DateTime),
+    )
+    _create_index("ix_quiz_bank_id", "quiz_bank", ["id"])
+    _create_index("ix_quiz_bank_user_id", "quiz_bank", ["user_id"])
+    _create_index("ix_quiz_bank_skill_path_id", "quiz_bank", ["skill_path_id"])
+    _create_index("ix_quiz_bank_path_hash", "quiz_bank", ["skill_path_id", "task_set_hash"])
+
+    _create_table(
+        "url_liveness",
+        sa.Column("url", sa.String, primary_key=True),
+        sa.Column("available", sa.Boolean, nullable=False),
+        sa.Column("status_code", sa.Integer),
+        sa.Column("reason", sa.Text),
+        sa.Column("checked_at", sa.DateTime, nullable=False),
+    )
+    _create_index("ix_url_liveness_checked_at", "url_liveness", ["checked_at"])
+
+    _create_table(
+        "job_market_snapshots",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("skill", sa.String, nullable=False),
+        sa.Column("location", sa.String, nullable=False),
+        sa.Column("posting_count", sa.Integer),
+        sa.Column("salary_count", sa.Integer),
+        sa.Column("salary_mean", sa.Float),
+        sa.Column("salary_p25", sa.Float),
+        sa.Column("salary_p50", sa.Float),
+        sa.Column("salary_p90", sa.Float),
+        sa.Column("salary_sketch", sa.Text),
+        sa.Column("pages_fetched", sa.Integer),
+        sa.Column("fetched_at", sa.DateTime),
+        sa.Column("created_at", sa.DateTime),
+    )
+    _create_index("ix_job_market_snapshots_id", "job_market_snapshots", ["id"])
+    _create_index("ux_job_market_skill_location", "job_market_snapshots", ["skill", "location"], unique=True)
+
+
+def downgrade():
+    for name in (
+        "job_market_snapshots", "url_liveness", "quiz_bank", "jobs", "user_progress", "user_quiz_attempts",
+        "questions", "quizzes", "path_progress", "planner", "skill_paths", "users",
+    ):
+        op.drop_table(name)
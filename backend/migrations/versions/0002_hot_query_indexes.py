@@ -0,0 +1,35 @@
+"""Indexes for the hot query paths
+
+Planner lookups by path (alone, with status, with week), the due-date scans
+behind missed-task detection, and per-user lookups of skill paths and quiz
+attempts. A separate planner.skill_path_id index is not added: both
+composites lead with skill_path_id and serve path-only lookups.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_planner_path_status", "planner", ["skill_path_id", "status"]),
+    ("ix_planner_path_week", "planner", ["skill_path_id", "week"]),
+    ("ix_planner_due_date", "planner", ["due_date"]),
+    ("ix_skill_paths_user_id", "skill_paths", ["user_id"]),
+    ("ix_user_quiz_attempts_user_id", "user_quiz_attempts", ["user_id"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,185 @@
+"""Store roadmap weeks and goals in their own tables
+
+skill_paths.data held the whole roadmap JSON. Its "weeks" list moves to
+roadmap_weeks (one row per week) and roadmap_goals (one row per goal, JSON
+encoded); data keeps the remaining keys. Blobs that aren't JSON objects with a
+"weeks" list are left untouched. The split mirrors main.set_roadmap and is
+copied here so the migration doesn't change when the app code does.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH = 500
+
+skill_paths = sa.table("skill_paths", sa.column("id", sa.Integer), sa.column("data", sa.Text))
+roadmap_weeks = sa.table(
+    "roadmap_weeks",
+    sa.column("id", sa.Integer),
+    sa.column("skill_path_id", sa.Integer),
+    sa.column("position", sa.Integer),
+    sa.column("week", sa.Integer),
+    sa.column("extra", sa.Text),
+)
+roadmap_goals = sa.table(
+    "roadmap_goals",
+    sa.column("week_id", sa.Integer),
+    sa.column("position", sa.Integer),
+    sa.column("content", sa.Text),
+)
+
+
+def _is_week_number(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _split_week(week):
+    """(week column, extra column, goals list) for one entry of "weeks"."""
+    if not isinstance(week, dict):
+        return None, json.dumps(week), []
+    number, goals = week.get("week"), week.get("goals")
+    extra = {
+        k: v for k, v in week.items()
+        if not (k == "week" and _is_week_number(number)) and not (k == "goals" and isinstance(goals, list))
+    }
+    return (
+        number if _is_week_number(number) else None,
+        json.dumps(extra) if extra else None,
+        goals if isinstance(goals, list) else [],
+    )
+
+
+def _week_dict(number, extra, goals):
+    extra = json.loads(extra) if extra is not None else {}
+    if not isinstance(extra, dict):
+        return extra
+    result = {"week": number} if number is not None else {}
+    result["goals"] = goals
+    result.update(extra)
+    return result
+
+
+def upgrade():
+    op.create_table(
+        "roadmap_weeks",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("skill_path_id", sa.Integer, sa.ForeignKey("skill_paths.id"), nullable=False),
+        sa.Column("position", sa.Integer, nullable=False),
+        sa.Column("week", sa.Integer),
+        sa.Column("extra", sa.Text),
+    )
+    op.create_index("ix_roadmap_weeks_path_position", "roadmap_weeks", ["skill_path_id", "position"], unique=True)
+    op.create_table(
+        "roadmap_goals",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("week_id", sa.Integer, sa.ForeignKey("roadmap_weeks.id"), nullable=False),
+        sa.Column("position", sa.Integer, nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+    )
+    op.create_index("ix_roadmap_goals_week_position", "roadmap_goals", ["week_id", "position"], unique=True)
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(skill_paths.c.id, skill_paths.c.data)
+            .where(skill_paths.c.id > last_id, skill_paths.c.data.isnot(None))
+            .order_by(skill_paths.c.id).limit(BATCH)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        remaining, weeks, goals = [], [], {}
+        for path_id, data in rows:
+            try:
+                roadmap = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(roadmap, dict) or not isinstance(roadmap.get("weeks"), list):
+                continue
+            remaining.append({"path_id": path_id, "new_data": json.dumps({k: v for k, v in roadmap.items() if k != "weeks"})})
+            for position, week in enumerate(roadmap["weeks"]):
+                number, extra, week_goals = _split_week(week)
+                weeks.append({"skill_path_id": path_id, "position": position, "week": number, "extra": extra})
+                goals[(path_id, position)] = week_goals
+        if not remaining:
+            continue
+        if weeks:
+            conn.execute(roadmap_weeks.insert(), weeks)
+            # Week ids come back from one query per batch rather than one RETURNING per row
+            week_ids = {
+                (path_id, position): week_id
+                for week_id, path_id, position in conn.execute(
+                    sa.select(roadmap_weeks.c.id, roadmap_weeks.c.skill_path_id, roadmap_weeks.c.position)
+                    .where(roadmap_weeks.c.skill_path_id.in_([r["path_id"] for r in remaining]))
+                ).all()
+            }
+            goal_rows = [
+                {"week_id": week_ids[key], "position": i, "content": json.dumps(goal)}
+                for key, week_goals in goals.items() for i, goal in enumerate(week_goals)
+            ]
+            if goal_rows:
+                conn.execute(roadmap_goals.insert(), goal_rows)
+        conn.execute(
+            skill_paths.update().where(skill_paths.c.id == sa.bindparam("path_id")).values(data=sa.bindparam("new_data")),
+            remaining
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(skill_paths.c.id, skill_paths.c.data)
+            .where(skill_paths.c.id > last_id, skill_paths.c.data.isnot(None))
+            .order_by(skill_paths.c.id).limit(BATCH)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        weeks = conn.execute(
+            sa.select(roadmap_weeks.c.id, roadmap_weeks.c.skill_path_id, roadmap_weeks.c.week, roadmap_weeks.c.extra)
+            .where(roadmap_weeks.c.skill_path_id.in_([r.id for r in rows]))
+            .order_by(roadmap_weeks.c.skill_path_id, roadmap_weeks.c.position)
+        ).all()
+        goals = {}
+        if weeks:
+            for week_id, content in conn.execute(
+                sa.select(roadmap_goals.c.week_id, roadmap_goals.c.content)
+                .where(roadmap_goals.c.week_id.in_([w.id for w in weeks]))
+                .order_by(roadmap_goals.c.week_id, roadmap_goals.c.position)
+            ).all():
+                goals.setdefault(week_id, []).append(json.loads(content))
+        by_path = {}
+        for week_id, path_id, number, extra in weeks:
+            by_path.setdefault(path_id, []).append(_week_dict(number, extra, goals.get(week_id, [])))
+        updates = []
+        for path_id, data in rows:
+            try:
+                roadmap = json.loads(data)
+            except ValueError:
+                continue
+            # Same rule as main.roadmap_data: an object without "weeks" gets them from the rows
+            if isinstance(roadmap, dict) and "weeks" not in roadmap:
+                roadmap["weeks"] = by_path.get(path_id, [])
+                updates.append({"path_id": path_id, "new_data": json.dumps(roadmap)})
+        if updates:
+            conn.execute(
+                skill_paths.update().where(skill_paths.c.id == sa.bindparam("path_id")).values(data=sa.bindparam("new_data")),
+                updates
+            )
+    op.drop_index("ix_roadmap_goals_week_position", table_name="roadmap_goals")
+    op.drop_table("roadmap_goals")
+    op.drop_index("ix_roadmap_weeks_path_position", table_name="roadmap_weeks")
+    op.drop_table("roadmap_weeks")
@@ -0,0 +1,29 @@
+"""Index planner tasks by calendar day
+
+GET /planner/range looks tasks up per skill path on their calendar day,
+coalesce(rescheduled_to, due_date), in (day, id) order for keyset paging.
+The expression must match main.PLANNER_DAY for the index to be used.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_planner_path_day", "planner",
+        ["skill_path_id", sa.text("coalesce(rescheduled_to, due_date)"), "id"],
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_planner_path_day", table_name="planner", if_exists=True)
@@ -0,0 +1,31 @@
+"""Track when each job-market pair was last requested
+
+The market snapshot schedule only refreshes the configured pairs plus those
+requested within MARKET_RECENT_WINDOW. Existing rows start out as requested
+now, so they get one full window before they can expire.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("job_market_snapshots") as batch:
+        batch.add_column(sa.Column("last_requested_at", sa.DateTime))
+    snapshots = sa.table("job_market_snapshots", sa.column("last_requested_at", sa.DateTime))
+    op.execute(snapshots.update().values(last_requested_at=datetime.utcnow()))
+
+
+def downgrade():
+    with op.batch_alter_table("job_market_snapshots") as batch:
+        batch.drop_column("last_requested_at")
@@ -0,0 +1,43 @@
+"""Maintenance commands for the path_progress counters.
+
+Usage (from backend/):
+    python path_progress_cli.py rebuild        # recount every skill path
+    python path_progress_cli.py check [--fix]  # report (and repair) counters that drifted
+
+`check` exits with status 1 when it finds a mismatch, so it can run from cron
+or CI against a copy of the production database.
+"""
+import argparse
+import json
+import sys
+
+from main import SessionLocal, check_path_progress, rebuild_path_progress
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild")
+    check = sub.add_parser("check")
+    check.add_argument("--fix", action="store_true", help="recount paths whose counters are wrong")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"Rebuilt progress counters for {rebuild_path_progress(db)} skill paths")
+            return 0
+        mismatches = check_path_progress(db, fix=args.fix)
+        for mismatch in mismatches:
+            print(json.dumps(mismatch))
+        if not mismatches:
+            print("All progress counters match the planner")
+            return 0
+        print(f"{len(mismatches)} skill paths {'repaired' if args.fix else 'out of sync'}")
+        return 0 if args.fix else 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+# --- Retry, backoff and circuit breaking for upstream APIs ---
+# Transient upstream failures (timeouts, connection errors, 429 and 5xx) are
+# retried with jittered exponential backoff inside a per-call deadline. A
+# per-process circuit breaker counts those failures and, once open, makes
+# callers fail immediately so they drop into their existing fallbacks instead
+# of tying up workers on a struggling upstream.
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (seconds or HTTP date); None if absent or invalid."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(error):
+    """Return (retryable, retry_after) for an exception raised by an upstream call."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status in RETRYABLE_STATUS, retry_after_seconds(error.response)
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return True, None
+    return False, None
+
+
+def settle_non_retryable(breaker, error):
+    """Tell the breaker about an error that won't be retried.
+
+    Only an HTTP status error (e.g. a 4xx) proves the upstream answered; local
+    errors (missing API key, unparsable payload...) say nothing about its
+    health, so they just free a half-open probe slot.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        breaker.record_success()
+    else:
+        breaker.release()
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"  # closed, open, half_open
+        self.failures = 0
+        self.opened_at = None
+        self.opened_count = 0
+        self._probing = False
+
+    def allow(self):
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open":
+            # Let exactly one probe request through while half open
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        if self.state == "half_open":
+            self._open()
+            return
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        # The call ended without telling us anything (e.g. it was cancelled)
+        self._probing = False
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.opened_count += 1
+        self.failures = 0
+        self._probing = False
+
+    def stats(self):
+        return {"state": self.state, "consecutive_failures": self.failures, "times_opened": self.opened_count}
+
+
+class Resilience:
+    def __init__(self, name, max_retries=3, base_delay=0.5, max_delay=8.0, default_deadline=60.0, breaker=None):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.default_deadline = default_deadline
+        self.breaker = breaker or CircuitBreaker()
+        self._sites = {}
+
+    def _site(self, site):
+        if site not in self._sites:
+            self._sites[site] = {
+                "calls": 0, "attempts": 0, "retries": 0, "failures": 0,
+                "short_circuited": 0, "deadline_exceeded": 0,
+            }
+        return self._sites[site]
+
+    def backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            # Honor the server's hint, with a little jitter so callers don't stampede together
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    async def call(self, fn, site="default", deadline=None):
+        """Run `fn()` with retries inside `deadline` seconds, guarded by the circuit breaker."""
+        stats = self._site(site)
+        stats["calls"] += 1
+        stop_at = time.monotonic() + (deadline or self.default_deadline)
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                stats["short_circuited"] += 1
+                raise CircuitOpenError(f"{self.name} circuit breaker is open")
+            attempt += 1
+            stats["attempts"] += 1
+            remaining = stop_at - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                result = await asyncio.wait_for(fn(), timeout=remaining)
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                stats["deadline_exceeded"] += 1
+                stats["failures"] += 1
+                raise
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                retryable, retry_after = classify(e)
+                if not retryable:
+                    settle_non_retryable(self.breaker, e)
+                    stats["failures"] += 1
+                    raise
+                self.breaker.record_failure()
+                delay = self.backoff(attempt, retry_after)
+                if attempt > self.max_retries or time.monotonic() + delay >= stop_at:
+                    stats["failures"] += 1
+                    raise
+                stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, gen_factory, site="default"):
+        """Guard a streaming call with the breaker; streams are not retried once started."""
+        stats = self._site(site)
+        stats["calls"] += 1
+        if not self.breaker.allow():
+            stats["short_circuited"] += 1
+            raise CircuitOpenError(f"{self.name} circuit breaker is open")
+        stats["attempts"] += 1
+        try:
+            async for item in gen_factory():
+                yield item
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
+        except Exception as e:
+            retryable, _ = classify(e)
+            if retryable:
+                self.breaker.record_failure()
+            else:
+                settle_non_retryable(self.breaker, e)
+            stats["failures"] += 1
+            raise
+        self.breaker.record_success()
+
+    def stats(self):
+        return {"breaker": self.breaker.stats(), "sites": {k: dict(v) for k, v in self._sites.items()}}
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# --- Resource catalog ---
+# Every resource that passed link validation is kept in a local SQLite table
+# with an FTS5 index over title, topic and platform. Resource endpoints answer
+# from here when a topic already has enough well-rated hits and only ask the
+# LLM to top up sparse topics.
+#
+# The catalog is its own SQLite file (RESOURCE_CATALOG_PATH), not a table in
+# the app database: FTS5 is SQLite-only while the app database may be
+# PostgreSQL. Alembic does not manage it; the schema is created here, with
+# IF NOT EXISTS. It is a rebuildable cache: losing the file only means topics
+# go back to the LLM until it refills, so it needs no backup, but it should
+# sit on persistent storage (a mounted volume on ephemeral hosts) and each
+# instance keeps its own copy.
+RESOURCE_CATALOG_PATH = os.getenv("RESOURCE_CATALOG_PATH", "./resource_catalog.db")
+CATALOG_MIN_HITS = int(os.getenv("CATALOG_MIN_HITS", "6"))
+CATALOG_MIN_RATING = float(os.getenv("CATALOG_MIN_RATING", "3.5"))
+CATALOG_MIN_SEEN = int(os.getenv("CATALOG_MIN_SEEN", "3"))  # suggestions before an unrated entry counts
+CATALOG_RESULT_LIMIT = int(os.getenv("CATALOG_RESULT_LIMIT", "15"))
+CATALOG_CATEGORY_LIMIT = int(os.getenv("CATALOG_CATEGORY_LIMIT", "6"))
+
+CATALOG_CATEGORIES = ("videos", "articles", "courses", "books", "tools")
+_STOPWORDS = {"a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "how", "learn", "learning"}
+_PLATFORM_CATEGORIES = [
+    (("youtube", "youtu.be", "vimeo"), "videos"),
+    (("udemy", "coursera", "edx", "udacity", "pluralsight", "codecademy", "khanacademy", "linkedin.com/learning", "datacamp"), "courses"),
+    (("amazon.", "oreilly", "manning", "goodreads", "books.google"), "books"),
+    (("github.com", "npmjs", "pypi.org"), "tools"),
+]
+
+
+def infer_category(resource):
+    """Guess the catalog category of a resource from its URL and platform."""
+    haystack = f"{resource.get('url', '')} {resource.get('platform', '')}".lower()
+    for needles, category in _PLATFORM_CATEGORIES:
+        if any(needle in haystack for needle in needles):
+            return category
+    return "articles"
+
+
+def parse_rating(value):
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if 0 <= rating <= 5 else None
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query requiring every meaningful token in title or topic."""
+    tokens = [t for t in re.findall(r"\w+", (text or "").lower()) if t not in _STOPWORDS]
+    if not tokens:
+        return None
+    return "{title topic} : (" + " ".join(f'"{t}"' for t in tokens) + ")"
+
+
+class ResourceCatalog:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        db_dir = os.path.dirname(path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS resources ("
+            "id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, title TEXT NOT NULL, "
+            "topic TEXT NOT NULL, category TEXT NOT NULL, platform TEXT, type TEXT, "
+            "rating REAL, data TEXT NOT NULL, seen_count INTEGER NOT NULL DEFAULT 1, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS ix_resources_category ON resources (category);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5("
+            "title, topic, platform, content='resources', content_rowid='id', tokenize='porter unicode61');"
+            # Keep the external-content FTS index in step with the table
+            "CREATE TRIGGER IF NOT EXISTS resources_ai AFTER INSERT ON resources BEGIN "
+            "INSERT INTO resources_fts (rowid, title, topic, platform) VALUES (new.id, new.title, new.topic, new.platform); END;"
+            "CREATE TRIGGER IF NOT EXISTS resources_ad AFTER DELETE ON resources BEGIN "
+            "INSERT INTO resources_fts (resources_fts, rowid, title, topic, platform) VALUES ('delete', old.id, old.title, old.topic, old.platform); END;"
+            "CREATE TRIGGER IF NOT EXISTS resources_au AFTER UPDATE ON resources BEGIN "
+            "INSERT INTO resources_fts (resources_fts, rowid, title, topic, platform) VALUES ('delete', old.id, old.title, old.topic, old.platform); "
+            "INSERT INTO resources_fts (rowid, title, topic, platform) VALUES (new.id, new.title, new.topic, new.platform); END;"
+        )
+        self._conn.commit()
+
+    def add(self, topic, resources, category=None):
+        """Upsert validated resources under `topic`; a URL seen again gains the topic and a higher seen_count."""
+        now = time.time()
+        topic = " ".join((topic or "").split())
+        rows = []
+        for r in resources:
+            if not isinstance(r, dict) or not r.get("title") or not r.get("url"):
+                continue
+            rows.append((
+                r["url"], r["title"], topic, category or infer_category(r), r.get("platform"), r.get("type"),
+                parse_rating(r.get("userRating", r.get("rating"))), json.dumps(r), now, now,
+            ))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO resources (url, title, topic, category, platform, type, rating, data, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET title = excluded.title, platform = excluded.platform, "
+                "type = excluded.type, rating = COALESCE(excluded.rating, rating), data = excluded.data, "
+                "topic = CASE WHEN instr(lower(topic), lower(excluded.topic)) > 0 THEN topic ELSE topic || ' | ' || excluded.topic END, "
+                "seen_count = seen_count + 1, updated_at = excluded.updated_at",
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def search(self, topic, category=None, limit=CATALOG_RESULT_LIMIT, min_rating=CATALOG_MIN_RATING, min_seen=CATALOG_MIN_SEEN):
+        """Best matching confident resources for `topic`: rated at least `min_rating`,
+        or unrated but suggested at least `min_seen` times."""
+        query = fts_query(topic)
+        if query is None:
+            return []
+        sql = (
+            "SELECT r.data FROM resources_fts JOIN resources r ON r.id = resources_fts.rowid "
+            "WHERE resources_fts MATCH ? AND (r.rating >= ? OR (r.rating IS NULL AND r.seen_count >= ?))"
+        )
+        params = [query, min_rating, min_seen]
+        if category:
+            sql += " AND r.category = ?"
+            params.append(category)
+        sql += " ORDER BY bm25(resources_fts, 2.0, 4.0, 0.5), r.rating DESC, r.seen_count DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            if rows:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return [json.loads(data) for (data,) in rows]
+
+    def search_grouped(self, topic, per_category=CATALOG_CATEGORY_LIMIT):
+        return {category: self.search(topic, category, per_category) for category in CATALOG_CATEGORIES}
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM resources").fetchone()[0]
+            by_category = dict(self._conn.execute("SELECT category, COUNT(*) FROM resources GROUP BY category").fetchall())
+        return {"entries": entries, "by_category": by_category, "query_hits": self.hits, "query_misses": self.misses}
+
+
+def merge_resources(primary, extra, limit=None):
+    """Catalog hits first, then new resources whose URL isn't already listed."""
+    seen = {r.get("url") for r in primary}
+    merged = list(primary) + [r for r in extra if r.get("url") not in seen]
+    return merged[:limit] if limit else merged
+
+
+resource_catalog = ResourceCatalog(RESOURCE_CATALOG_PATH)
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- Response cache ---
+# Two tiers: an in-process LRU for hot keys and a small SQLite file that
+# survives restarts. Both tiers are size bounded and every entry carries
+# its own expiry timestamp. get/set may touch the SQLite file, so async
+# callers run them in a thread (asyncio.to_thread).
+ROADMAP_CACHE_PATH = os.getenv("ROADMAP_CACHE_PATH", "./roadmap_cache.db")
+ROADMAP_CACHE_TTL = int(os.getenv("ROADMAP_CACHE_TTL", str(7 * 24 * 3600)))
+ROADMAP_CACHE_MEMORY_SIZE = int(os.getenv("ROADMAP_CACHE_MEMORY_SIZE", "256"))
+ROADMAP_CACHE_DISK_SIZE = int(os.getenv("ROADMAP_CACHE_DISK_SIZE", "5000"))
+
+
+def normalize_text(value):
+    """Lowercase and collapse whitespace so trivially different inputs share a key."""
+    if value is None:
+        return ""
+    return " ".join(str(value).lower().split())
+
+
+def make_cache_key(*parts):
+    raw = json.dumps([normalize_text(p) for p in parts])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path, ttl, memory_size, disk_size):
+        self.path = path
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        if path:
+            db_dir = os.path.dirname(path)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at ON response_cache (accessed_at)"
+            )
+            self._conn.commit()
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        value = json.loads(row[0])
+                        self._conn.execute(
+                            "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._conn.commit()
+                        self._remember(key, row[1], value)
+                        self.disk_hits += 1
+                        return value
+                    self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            # Drop expired rows, then trim least recently used rows past the size bound
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.disk_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM response_cache WHERE key IN "
+                    "(SELECT key FROM response_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+            }
+
+
+roadmap_cache = ResponseCache(
+    ROADMAP_CACHE_PATH,
+    ttl=ROADMAP_CACHE_TTL,
+    memory_size=ROADMAP_CACHE_MEMORY_SIZE,
+    disk_size=ROADMAP_CACHE_DISK_SIZE,
+)
@@ -0,0 +1,44 @@
+import os
+from datetime import timedelta
+from sqlalchemy import update
+
+# --- Rescheduling ---
+# Shift and recalculate move a set of open tasks onto the days after a start
+# date. Callers select only the task ids and the start (MAX(due_date)) with
+# indexed queries; spread_dates assigns the new dates in one pass, filling
+# each day up to a capacity, and apply_dates writes them with one executemany
+# UPDATE by primary key, so no ORM objects are loaded or flushed one at a time.
+# By default tasks are spaced one per day; only when a capacity is set (the
+# env var or a request's per_day) do open tasks of the user's other paths
+# already due on a day count against it.
+SCHEDULE_DAILY_CAPACITY = int(os.getenv("SCHEDULE_DAILY_CAPACITY", "1"))  # tasks per day
+SCHEDULE_CAPACITY_SET = "SCHEDULE_DAILY_CAPACITY" in os.environ
+
+
+def spread_dates(count, start, capacity=SCHEDULE_DAILY_CAPACITY, load=None):
+    """`count` dates from `start` on, in order, at most `capacity` tasks per day.
+
+    `load` maps a date to the tasks already due that day; full days are skipped.
+    """
+    if capacity < 1:
+        raise ValueError("capacity must be at least 1")
+    load = load or {}
+    dates = []
+    day = start
+    while len(dates) < count:
+        free = capacity - load.get(day, 0)
+        if free > 0:
+            dates.extend([day] * min(free, count - len(dates)))
+        day += timedelta(days=1)
+    return dates
+
+
+def apply_dates(db, model, ids, dates, set_week=False):
+    """Set each task's due_date (and, with set_week, `week` to its ISO week); returns the number of tasks."""
+    rows = [{"id": task_id, "due_date": due} for task_id, due in zip(ids, dates)]
+    if set_week:
+        for row in rows:
+            row["week"] = row["due_date"].isocalendar()[1]
+    if rows:
+        db.execute(update(model), rows)
+    return len(rows)
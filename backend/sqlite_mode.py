@@ -0,0 +1,93 @@
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# --- SQLite production mode ---
+# With SQLITE_PRODUCTION=1 a file-backed SQLite database runs in WAL mode, so
+# readers never block the writer, and gets two engines:
+#   - a single-connection writer: mutations queue for it inside the process
+#     instead of racing for the file lock and failing with "database is locked"
+#   - a pooled, query_only reader for GET handlers, which in WAL reads a
+#     consistent snapshot while the writer commits
+# busy_timeout covers the remaining contention (other processes, checkpoints).
+# Without the flag (or for other databases) one ordinary engine serves both.
+# create_async_engines builds the same pair on the asyncio drivers, except
+# that in production mode it returns no async writer: a second single-
+# connection writer would race the sync one for the file lock, so all writes
+# stay on the sync writer and only reads go async.
+SQLITE_PRODUCTION = os.getenv("SQLITE_PRODUCTION", "0") == "1"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))  # per connection
+SQLITE_READER_CONNECTIONS = int(os.getenv("SQLITE_READER_CONNECTIONS", "8"))  # kept open in the pool
+SQLITE_WRITER_WAIT = float(os.getenv("SQLITE_WRITER_WAIT", "30"))  # seconds a mutation waits for the writer
+
+
+def is_file_sqlite(url):
+    return url.startswith("sqlite:///") and ":memory:" not in url and url != "sqlite:///"
+
+
+def _apply_pragmas(engine, read_only):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            # Persistent in the file; readers pick it up from the database header
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        # In WAL mode NORMAL only syncs at checkpoints; a crash can lose the last commits, never corrupt
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def create_engines(url, production=SQLITE_PRODUCTION):
+    """Return (writer, reader) engines; the same engine twice unless SQLite production mode applies."""
+    if not url.startswith("sqlite"):
+        engine = create_engine(url)
+        return engine, engine
+    if not (production and is_file_sqlite(url)):
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        return engine, engine
+    writer = create_engine(
+        url, connect_args={"check_same_thread": False},
+        pool_size=1, max_overflow=0, pool_timeout=SQLITE_WRITER_WAIT,
+    )
+    _apply_pragmas(writer, read_only=False)
+    # Readers never wait for each other: past the pooled ones, extra connections open on demand
+    reader = create_engine(
+        url, connect_args={"check_same_thread": False},
+        pool_size=SQLITE_READER_CONNECTIONS, max_overflow=-1,
+    )
+    _apply_pragmas(reader, read_only=True)
+    # Switch the file to WAL before the first reader opens it
+    with writer.connect():
+        pass
+    return writer, reader
+
+
+def async_url(url):
+    """The asyncio driver URL for a sync one: aiosqlite for SQLite, asyncpg for Postgres."""
+    scheme, sep, rest = url.partition("://")
+    driver = {"sqlite": "sqlite+aiosqlite", "postgres": "postgresql+asyncpg", "postgresql": "postgresql+asyncpg",
+              "postgresql+psycopg2": "postgresql+asyncpg"}.get(scheme)
+    if driver is None:
+        raise ValueError(f"No async driver configured for {scheme} databases")
+    return driver + sep + rest
+
+
+def create_async_engines(url, production=SQLITE_PRODUCTION):
+    """Async counterpart of create_engines: (writer, reader), with the same pools and pragmas.
+
+    In SQLite production mode the writer is None; writes go through the sync
+    writer from create_engines, which stays the only connection that writes.
+    """
+    if not (production and is_file_sqlite(url)):
+        engine = create_async_engine(async_url(url))
+        return engine, engine
+    reader = create_async_engine(async_url(url), pool_size=SQLITE_READER_CONNECTIONS, max_overflow=-1)
+    _apply_pragmas(reader.sync_engine, read_only=True)
+    return None, reader
@@ -104,7 +104,7 @@ function MySkillPathsTab() {
     setError("");
     try {
       const token = await getAuthToken();
-      const res = await fetch(`${import.meta.env.VITE_API_URL}/skill-paths`, {
+      const res = await fetch(`${import.meta.env.VITE_API_URL}/skill-paths?include_data=false`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       if (!res.ok) throw new Error("Failed to fetch skill paths");
@@ -1107,7 +1107,7 @@ const Dashboard = () => {
     (async () => {
       try {
         const token = await getAuthToken();
-        const res = await fetch(`${import.meta.env.VITE_API_URL}/skill-paths`, {
+        const res = await fetch(`${import.meta.env.VITE_API_URL}/skill-paths?include_data=false`, {
           headers: { Authorization: `Bearer ${token}` }
         });
         if (!res.ok) return;
@@ -26,7 +26,7 @@ const Settings = () => {
     (async () => {
       try {
         const token = await getAuthToken();
-        const res = await fetch(`${import.meta.env.VITE_API_URL}/skill-paths`, {
+        const res = await fetch(`${import.meta.env.VITE_API_URL}/skill-paths?include_data=false`, {
           headers: { Authorization: `Bearer ${token}` }
         });
         if (!res.ok) throw new Error("Failed to fetch skill paths");